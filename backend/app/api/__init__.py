@@ -1 +1 @@
-# Package initialization
+# Package initialization
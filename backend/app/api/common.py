@@ -0,0 +1,103 @@
+"""
+Pieces shared by the admin and user routers.
+
+List endpoints answer with a ``Page`` (items plus the cursor of the next
+page), or a ``ColumnsPage`` with ``layout=columns``, and keep their pages in ``response_cache`` for
+``ADMIN_CACHE_TTL_SECONDS``, so a dashboard polling several widgets costs one
+query per page and TTL instead of one per request. Complaint pages are
+dropped on ``ComplaintCreated``/``ComplaintStatusChanged`` and property tax
+pages on ``PropertyTaxUpdated``; the TTL bounds staleness for changes made by
+other workers.
+"""
+
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Type, TypeVar, Union
+from collections import OrderedDict
+from pydantic import BaseModel
+from app.core.config import settings
+from app.services.events import ComplaintCreated, ComplaintStatusChanged, PropertyTaxUpdated, event_bus
+import threading
+import time
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class ColumnsPage(BaseModel):
+    """layout=columns: one array per field, in row order"""
+    columns: Dict[str, List[Any]]
+    count: int
+    next_cursor: Optional[str] = None
+
+
+def page_responses(item: Type[BaseModel]) -> Dict:
+    """
+    OpenAPI description of a list endpoint that returns pre-encoded bytes in
+    either layout, declared with responses= since no response_model applies
+    """
+    return {200: {"model": Union[Page[item], ColumnsPage],
+                  "description": "Page of rows, or with layout=columns one array per field"}}
+
+
+class ResponseCache:
+    def __init__(self, ttl_seconds: float = settings.ADMIN_CACHE_TTL_SECONDS, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # (namespace, params) -> (value, stored at)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.metrics = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get_or_load(self, namespace: str, params: Hashable, load: Callable[[], Any]) -> Any:
+        """Cached value for (namespace, params), else load() and remember it"""
+        key = (namespace, params)
+        if self.ttl_seconds > 0:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() - entry[1] < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.metrics["hits"] += 1
+                    return entry[0]
+        self.metrics["misses"] += 1
+        value = load()
+        if self.ttl_seconds > 0:
+            with self._lock:
+                self._entries[key] = (value, time.monotonic())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, namespace: str):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == namespace]:
+                del self._entries[key]
+            self.metrics["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = len(self._entries)
+        return {"entries": entries, "ttl_seconds": self.ttl_seconds, **self.metrics}
+
+
+response_cache = ResponseCache()
+
+
+def _on_complaint_changed(event):
+    response_cache.invalidate("complaints")
+
+
+def _on_property_tax_updated(event: PropertyTaxUpdated):
+    response_cache.invalidate("tax")
+
+
+event_bus.subscribe(ComplaintCreated, _on_complaint_changed)
+event_bus.subscribe(ComplaintStatusChanged, _on_complaint_changed)
+event_bus.subscribe(PropertyTaxUpdated, _on_property_tax_updated)
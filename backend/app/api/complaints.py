@@ -1,28 +1,72 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
-from app.db.models import engine, Complaint
-from typing import List
-
-router = APIRouter()
-
-def get_session():
-    with Session(engine) as session:
-        yield session
-
-@router.get("/admin/complaints")
-async def get_all_complaints(session: Session = Depends(get_session)):
-    """
-    Fetch all registered complaints from the SQL database.
-    """
-    statement = select(Complaint)
-    records = session.exec(statement).all()
-    return records
-
-@router.get("/admin/complaints/recent")
-async def get_recent_complaints(session: Session = Depends(get_session)):
-    """
-    Fetch the 5 most recent complaints.
-    """
-    statement = select(Complaint).order_by(Complaint.created_at.desc()).limit(5)
-    records = session.exec(statement).all()
-    return records
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from app.api.common import page_responses, response_cache
+from app.core.serialization import dumps, page_body
+from app.db.database import get_read_db
+from app.db.models import ComplaintStatus
+from app.services.complaint_listing import list_complaints, COMPLAINT_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from typing import List, Optional
+from datetime import datetime
+
+router = APIRouter()
+
+RECENT_COUNT = 5
+
+
+class ComplaintOut(BaseModel):
+    id: int
+    complaint_id: str
+    user_id: int
+    login_id: str
+    category: str
+    sub_issue: Optional[str] = None
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    status: ComplaintStatus
+    report_count: int
+    created_at: datetime
+    user_name: Optional[str] = None
+    user_mobile: Optional[str] = None
+    user_area: Optional[str] = None
+    user_ward: Optional[str] = None
+
+
+@router.get("/admin/complaints", responses=page_responses(ComplaintOut))
+def get_all_complaints(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    status: Optional[ComplaintStatus] = None,
+    category: Optional[str] = None,
+    ward: Optional[str] = Query(None, description="Ward as stored on the user, e.g. 'Ward 10'"),
+    layout: str = Query("rows", pattern="^(rows|columns)$", description="columns: one array per field"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    One page of complaints with user details, newest first.
+    """
+    try:
+        body = response_cache.get_or_load(
+            "complaints", ("page", cursor, limit, status, category, ward, layout),
+            lambda: page_body(
+                list_complaints(db, cursor=cursor, limit=limit, status=status, category=category, ward=ward),
+                layout, COMPLAINT_FIELDS,
+            ),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(body, media_type="application/json")
+
+
+@router.get("/admin/complaints/recent", response_model=List[ComplaintOut])
+def get_recent_complaints(db: Session = Depends(get_read_db)):
+    """
+    Fetch the 5 most recent complaints.
+    """
+    body = response_cache.get_or_load(
+        "complaints", ("recent",), lambda: dumps(list_complaints(db, limit=RECENT_COUNT)["items"])
+    )
+    return Response(body, media_type="application/json")
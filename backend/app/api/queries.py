@@ -1,29 +1,80 @@
-from fastapi import APIRouter
-from app.core.memory import memory
-from typing import List, Dict
-
-router = APIRouter()
-
-@router.get("/admin/queries")
-async def get_all_queries():
-    """
-    Fetch all chatbot queries and session logs for the Admin dashboard.
-    """
-    all_sessions = []
-    for user_id, data in memory.sessions.items():
-        all_sessions.append({
-            "user_id": user_id,
-            "last_active": data["last_active"],
-            "language": data["language"],
-            "message_count": len(data["history"]),
-            "recent_messages": data["history"][-5:] if data["history"] else []
-        })
-    return sorted(all_sessions, key=lambda x: x["last_active"], reverse=True)
-
-@router.get("/admin/queries/{user_id}")
-async def get_user_query_history(user_id: str):
-    """
-    Fetch full chat history for a specific user.
-    """
-    session = memory.get_session(user_id)
-    return session["history"]
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from app.api.common import Page
+from app.core.memory import memory
+from app.core.serialization import FastJSONResponse
+from app.services.complaint_listing import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from typing import List, Optional
+
+router = APIRouter()
+
+
+class ChatMessage(BaseModel):
+    role: str
+    content: str
+    at: Optional[float] = None
+
+
+class QuerySession(BaseModel):
+    user_id: str
+    last_active: float
+    language: Optional[str] = None
+    message_count: int
+    recent_messages: List[ChatMessage]
+
+
+@router.get("/admin/queries", response_model=Page[QuerySession])
+async def get_all_queries(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    Chatbot sessions for the Admin dashboard, most recently active first.
+    """
+    try:
+        page, next_cursor = memory.recent_sessions(cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({
+        "items": [
+            {
+                "user_id": user_id,
+                "last_active": data["last_active"],
+                "language": data["language"],
+                "message_count": len(data["history"]),
+                "recent_messages": list(data["history"])[-5:],
+            }
+            for user_id, data in page
+        ],
+        "next_cursor": next_cursor,
+    })
+
+
+@router.get("/admin/queries/{user_id}", response_model=List[ChatMessage])
+async def get_user_query_history(user_id: str):
+    """
+    Fetch full chat history for a specific user.
+    """
+    session = memory.find_session(user_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No chat session for this user")
+    return FastJSONResponse(list(session["history"]))
+
+
+@router.get("/admin/queries/{user_id}/transcript", response_model=Page[ChatMessage])
+def get_user_transcript(
+    user_id: str,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    A user's full chat history from the transcript log, oldest first.
+    Reads the log file, so it runs in the threadpool.
+    """
+    try:
+        page = memory.transcript(user_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail="No transcript for this user")
+    return FastJSONResponse(page)
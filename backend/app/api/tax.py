@@ -1,39 +1,119 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
-from app.db.models import engine, PropertyTax
-from app.services.pdf_service import generate_vmc_receipt
-from fastapi.responses import Response
-
-router = APIRouter()
-
-def get_session():
-    with Session(engine) as session:
-        yield session
-
-@router.get("/admin/tax")
-async def get_all_tax_records(session: Session = Depends(get_session)):
-    """
-    Fetch all property tax records from the SQL database.
-    """
-    statement = select(PropertyTax)
-    records = session.exec(statement).all()
-    return records
-
-@router.get("/admin/tax/pdf/{record_id}")
-async def download_tax_pdf(record_id: int, session: Session = Depends(get_session)):
-    """
-    Generate and download a VMC Property Tax Receipt PDF.
-    """
-    statement = select(PropertyTax).where(PropertyTax.id == record_id)
-    record = session.exec(statement).first()
-    
-    if not record:
-        return {"error": "Record not found"}
-    
-    pdf_buffer = generate_vmc_receipt(record.dict())
-    
-    return Response(
-        content=pdf_buffer.getvalue(),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename=VMC_Receipt_{record.customer_id}.pdf"}
-    )
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.api.common import page_responses, response_cache
+from app.core.serialization import page_body
+from app.db.database import get_read_db
+from app.db.models import PropertyTax, TaxStatus
+from app.services.pdf_render_pool import PdfRenderBusy, PdfRenderTimeout, pdf_render_pool
+from app.services.pdf_service import receipt_fields
+from app.services.property_import import normalize_ward
+from app.services.complaint_listing import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from typing import Dict, Optional
+from datetime import datetime
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class PropertyTaxOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    property_id: str
+    owner_name: str
+    address: str
+    amount: float
+    status: TaxStatus
+    year: int
+    receipt_no: Optional[str] = None
+    bill_no: Optional[str] = None
+    ward_number: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+# Output field name -> column, selected directly so rows need no ORM objects
+TAX_FIELDS = {name: getattr(PropertyTax, name) for name in PropertyTaxOut.model_fields}
+
+
+def list_tax_records(db: Session, cursor: Optional[str], limit: int, status: Optional[TaxStatus],
+                     year: Optional[int], ward: Optional[str]) -> Dict:
+    """One page of property tax records in id order; the cursor is the last id served"""
+    query = select(*(column.label(name) for name, column in TAX_FIELDS.items()))
+    if cursor:
+        try:
+            query = query.where(PropertyTax.id > int(cursor))
+        except ValueError:
+            raise ValueError("Invalid cursor")
+    if status:
+        query = query.where(PropertyTax.status == status)
+    if year:
+        query = query.where(PropertyTax.year == year)
+    if ward:
+        query = query.where(PropertyTax.ward_number == normalize_ward(ward))
+    rows = db.execute(query.order_by(PropertyTax.id).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1].id)
+    return {"items": [dict(row._mapping) for row in rows], "next_cursor": next_cursor}
+
+
+@router.get("/admin/tax", responses=page_responses(PropertyTaxOut))
+def get_all_tax_records(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    status: Optional[TaxStatus] = None,
+    year: Optional[int] = None,
+    ward: Optional[str] = Query(None, description="Ward number or name, e.g. 10 or 'Ward 10'"),
+    layout: str = Query("rows", pattern="^(rows|columns)$", description="columns: one array per field"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    One page of property tax records.
+    """
+    try:
+        body = response_cache.get_or_load(
+            "tax", (cursor, limit, status, year, ward, layout),
+            lambda: page_body(list_tax_records(db, cursor, limit, status, year, ward), layout, TAX_FIELDS),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(body, media_type="application/json")
+
+
+@router.get("/admin/tax/pdf/{record_id}")
+async def download_tax_pdf(record_id: int, db: Session = Depends(get_read_db)):
+    """
+    Generate and download a VMC Property Tax Receipt PDF.
+    """
+    fields = await asyncio.to_thread(_receipt_fields_for, db, record_id)
+    if fields is None:
+        raise HTTPException(status_code=404, detail="Record not found")
+
+    try:
+        pdf_path = await pdf_render_pool.render(fields)
+    except (PdfRenderBusy, PdfRenderTimeout) as e:
+        logger.warning(f"PDF for record {record_id} not ready: {e}")
+        raise HTTPException(status_code=503, detail="PDF is being generated, please retry", headers={"Retry-After": "2"})
+    except Exception as e:
+        logger.error(f"Error generating PDF for record {record_id}: {e}")
+        raise HTTPException(status_code=500, detail="Error generating PDF")
+    return FileResponse(
+        pdf_path,
+        media_type="application/pdf",
+        filename=f"VMC_Receipt_{fields['property_id']}.pdf",
+    )
+
+
+def _receipt_fields_for(db: Session, record_id: int) -> Optional[Dict]:
+    """Receipt fields of a tax record, or None; a blocking read kept off the event loop"""
+    record = db.get(PropertyTax, record_id)
+    return receipt_fields(record) if record else None
@@ -1,26 +1,44 @@
-from fastapi import APIRouter
-from app.core.memory import memory
-from typing import Dict, Any
-
-router = APIRouter()
-
-@router.get("/user/profile/{user_id}")
-async def get_user_profile(user_id: str):
-    """
-    Fetch personal dashboard data for a user.
-    """
-    session = memory.get_session(user_id)
-    return {
-        "user_id": user_id,
-        "language_preference": session["language"],
-        "history_count": len(session["history"]),
-        "status": "Active"
-    }
-
-@router.get("/user/history/{user_id}")
-async def get_personal_history(user_id: str):
-    """
-    Fetch personal chat history.
-    """
-    session = memory.get_session(user_id)
-    return session["history"]
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from app.api.queries import ChatMessage
+from app.core.memory import memory
+from app.core.serialization import FastJSONResponse
+from typing import List, Optional
+
+router = APIRouter()
+
+
+class UserProfile(BaseModel):
+    user_id: str
+    language_preference: Optional[str] = None
+    history_count: int
+    status: str
+
+
+def _session(user_id: str):
+    session = memory.find_session(user_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No chat session for this user")
+    return session
+
+
+@router.get("/user/profile/{user_id}", response_model=UserProfile)
+async def get_user_profile(user_id: str):
+    """
+    Fetch personal dashboard data for a user.
+    """
+    session = _session(user_id)
+    return {
+        "user_id": user_id,
+        "language_preference": session["language"],
+        "history_count": len(session["history"]),
+        "status": "Active"
+    }
+
+
+@router.get("/user/history/{user_id}", response_model=List[ChatMessage])
+async def get_personal_history(user_id: str):
+    """
+    Fetch personal chat history.
+    """
+    return FastJSONResponse(list(_session(user_id)["history"]))
@@ -1,61 +1,173 @@
-import os
-from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
-
-
-class Settings(BaseSettings):
-    # ===============================
-    # WhatsApp API Configuration
-    # ===============================
-    WHATSAPP_TOKEN: str = os.getenv("WHATSAPP_TOKEN", "your_whatsapp_access_token")
-    VERIFY_TOKEN: str = os.getenv("VERIFY_TOKEN", "your_verification_token")
-    PHONE_NUMBER_ID: str = os.getenv("PHONE_NUMBER_ID", "your_phone_number_id")
-
-    # ===============================
-    # Database Configuration
-    # ===============================
-    # Defaults work locally; Render/Railway override via env vars
-    DB_HOST: str = os.getenv("DB_HOST", "localhost")
-    DB_PORT: int = int(os.getenv("DB_PORT", 3306))
-    DB_USER: str = os.getenv("DB_USER", "root")
-    DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
-    DB_NAME: str = os.getenv("DB_NAME", "vmc_chatbot")
-
-    # ===============================
-    # App Configuration
-    # ===============================
-    PORT: int = int(os.getenv("PORT", 8000))
-    DEBUG: bool = os.getenv("DEBUG", "True") == "True"
-
-    # ===============================
-    # File Storage
-    # ===============================
-    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
-    PDF_DIR: str = os.getenv("PDF_DIR", "pdfs")
-
-    # ===============================
-    # CORS Configuration
-    # ===============================
-    FRONTEND_URL: str = os.getenv(
-        "FRONTEND_URL",
-        "https://vmcbot.netlify.app"
-    )
-
-    CORS_ORIGINS: str = os.getenv(
-        "CORS_ORIGINS",
-        "http://localhost:3000,"
-        "http://localhost:3001,"
-        "http://127.0.0.1:3000,"
-        "http://127.0.0.1:3001,"
-        "https://vmcbot.netlify.app"
-    )
-
-    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
-
-
-settings = Settings()
-
-
-def get_settings() -> Settings:
-    """Get settings instance"""
-    return settings
+import os
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
+
+
+class Settings(BaseSettings):
+    # ===============================
+    # WhatsApp API Configuration
+    # ===============================
+    WHATSAPP_TOKEN: str = os.getenv("WHATSAPP_TOKEN", "your_whatsapp_access_token")
+    VERIFY_TOKEN: str = os.getenv("VERIFY_TOKEN", "your_verification_token")
+    PHONE_NUMBER_ID: str = os.getenv("PHONE_NUMBER_ID", "your_phone_number_id")
+    WHATSAPP_API_URL: str = os.getenv("WHATSAPP_API_URL", "https://graph.facebook.com/v18.0")
+    # Uploaded documents (receipts) are re-sent by media ID while younger than this; Meta keeps them 30 days
+    WHATSAPP_MEDIA_TTL_HOURS: float = float(os.getenv("WHATSAPP_MEDIA_TTL_HOURS", 24 * 25))
+    WHATSAPP_MEDIA_CACHE_SIZE: int = int(os.getenv("WHATSAPP_MEDIA_CACHE_SIZE", 10000))
+
+    # ===============================
+    # Database Configuration
+    # ===============================
+    # Defaults work locally; Render/Railway override via env vars
+    DB_HOST: str = os.getenv("DB_HOST", "localhost")
+    DB_PORT: int = int(os.getenv("DB_PORT", 3306))
+    DB_USER: str = os.getenv("DB_USER", "root")
+    DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
+    DB_NAME: str = os.getenv("DB_NAME", "vmc_chatbot")
+
+    # Full SQLAlchemy URL; takes precedence over the DB_* parts above.
+    # e.g. postgresql+psycopg2://..., mysql+pymysql://..., sqlite:///./vmc.sqlite3
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    # Optional read replica for dashboard/tracking reads; empty means read from the primary
+    DATABASE_REPLICA_URL: str = os.getenv("DATABASE_REPLICA_URL", "")
+    # After a write, reads for the same login ID stay on the primary for this long
+    REPLICA_STICKY_SECONDS: float = float(os.getenv("REPLICA_STICKY_SECONDS", 30))
+
+    # Engine / pool tuning (ignored where the dialect has no pool, e.g. in-memory SQLite)
+    DB_ECHO: bool = os.getenv("DB_ECHO", "False") == "True"
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 3600))
+    # Per-statement timeout in milliseconds (0 disables); busy timeout for SQLite
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 15000))
+
+    # ===============================
+    # App Configuration
+    # ===============================
+    PORT: int = int(os.getenv("PORT", 8000))
+    DEBUG: bool = os.getenv("DEBUG", "True") == "True"
+    # Chatbot messages, one JSON file per language; re-read when changed, checked this often (0 = never)
+    LOCALES_DIR: str = os.getenv("LOCALES_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "locales"))
+    TRANSLATIONS_RELOAD_SECONDS: float = float(os.getenv("TRANSLATIONS_RELOAD_SECONDS", 10))
+    # First messages detected as en/hi/gu with this confidence skip the language menu
+    LANGUAGE_DETECT_MIN_CONFIDENCE: float = float(os.getenv("LANGUAGE_DETECT_MIN_CONFIDENCE", 0.9))
+    LANGUAGE_CACHE_SIZE: int = int(os.getenv("LANGUAGE_CACHE_SIZE", 50000))
+
+    # ===============================
+    # Chat History
+    # ===============================
+    # Recent messages kept in memory per user; sessions idle longer than the expiry are swept this often
+    CHAT_HISTORY_SIZE: int = int(os.getenv("CHAT_HISTORY_SIZE", 10))
+    CHAT_SESSION_EXPIRY_SECONDS: float = float(os.getenv("CHAT_SESSION_EXPIRY_SECONDS", 3600))
+    CHAT_SWEEP_SECONDS: float = float(os.getenv("CHAT_SWEEP_SECONDS", 60))
+    # Full transcripts, one JSONL file per user, written this often (empty dir disables)
+    TRANSCRIPT_DIR: str = os.getenv("TRANSCRIPT_DIR", "transcripts")
+    TRANSCRIPT_FLUSH_SECONDS: float = float(os.getenv("TRANSCRIPT_FLUSH_SECONDS", 2))
+
+    # ===============================
+    # File Storage
+    # ===============================
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+    PDF_DIR: str = os.getenv("PDF_DIR", "pdfs")
+    # Rendered receipts are reused until PDF_DIR grows past this, then least recently used go first
+    PDF_CACHE_MAX_MB: int = int(os.getenv("PDF_CACHE_MAX_MB", 200))
+    # Receipt ETags are answered with 304 from memory for this long before the record is re-read
+    PDF_ETAG_TTL_SECONDS: float = float(os.getenv("PDF_ETAG_TTL_SECONDS", 60))
+
+    # ===============================
+    # PDF Rendering
+    # ===============================
+    # Receipt renders run in this many worker processes per app worker (0 renders in threads)
+    PDF_RENDER_WORKERS: int = int(os.getenv("PDF_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+    # Distinct renders queued or running before new requests are turned away (503)
+    PDF_RENDER_MAX_PENDING: int = int(os.getenv("PDF_RENDER_MAX_PENDING", 64))
+    PDF_RENDER_TIMEOUT_SECONDS: float = float(os.getenv("PDF_RENDER_TIMEOUT_SECONDS", 15))
+    # Batch receipts: receipts per worker task, and the most one batch may select
+    RECEIPT_BATCH_CHUNK: int = int(os.getenv("RECEIPT_BATCH_CHUNK", 50))
+    RECEIPT_BATCH_MAX: int = int(os.getenv("RECEIPT_BATCH_MAX", 20000))
+
+    # ===============================
+    # Duplicate Complaint Detection
+    # ===============================
+    # Reports of the same sub-issue within this radius and time window
+    # are linked to the existing open complaint
+    DUPLICATE_RADIUS_METERS: float = float(os.getenv("DUPLICATE_RADIUS_METERS", 50))
+    DUPLICATE_WINDOW_HOURS: float = float(os.getenv("DUPLICATE_WINDOW_HOURS", 48))
+
+    # ===============================
+    # Dashboard Aggregates
+    # ===============================
+    # How often each worker reloads counters written by other workers
+    STATS_REFRESH_SECONDS: float = float(os.getenv("STATS_REFRESH_SECONDS", 30))
+    # Days included in the per-day breakdown of /api/stats
+    STATS_RECENT_DAYS: int = int(os.getenv("STATS_RECENT_DAYS", 30))
+    # Live complaint feed (SSE): events kept for Last-Event-ID resume, dashboards per worker,
+    # idle keepalive interval and the reconnect delay suggested to browsers
+    COMPLAINT_FEED_BUFFER: int = int(os.getenv("COMPLAINT_FEED_BUFFER", 1000))
+    COMPLAINT_FEED_MAX_CLIENTS: int = int(os.getenv("COMPLAINT_FEED_MAX_CLIENTS", 500))
+    COMPLAINT_FEED_KEEPALIVE_SECONDS: float = float(os.getenv("COMPLAINT_FEED_KEEPALIVE_SECONDS", 15))
+    COMPLAINT_FEED_RETRY_MS: int = int(os.getenv("COMPLAINT_FEED_RETRY_MS", 3000))
+    # Each worker tails complaint_events this often (its own changes are picked up at once);
+    # rows older than the retention are pruned
+    COMPLAINT_FEED_POLL_SECONDS: float = float(os.getenv("COMPLAINT_FEED_POLL_SECONDS", 1))
+    COMPLAINT_FEED_RETENTION_HOURS: float = float(os.getenv("COMPLAINT_FEED_RETENTION_HOURS", 24))
+    # Pages of the /api/admin list endpoints are reused for this long (0 disables)
+    ADMIN_CACHE_TTL_SECONDS: float = float(os.getenv("ADMIN_CACHE_TTL_SECONDS", 5))
+
+    # ===============================
+    # Complaint Archival
+    # ===============================
+    # Complaints resolved longer ago than this move to complaints_archive
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", 90))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+
+    # ===============================
+    # Property Tax Import
+    # ===============================
+    # Rows validated and upserted per transaction
+    PROPERTY_IMPORT_BATCH_SIZE: int = int(os.getenv("PROPERTY_IMPORT_BATCH_SIZE", 5000))
+
+    # ===============================
+    # Citizen Notifications
+    # ===============================
+    # Background relay that sends queued status-change WhatsApp messages (one per worker)
+    OUTBOX_RELAY_ENABLED: bool = os.getenv("OUTBOX_RELAY_ENABLED", "True") == "True"
+    OUTBOX_POLL_SECONDS: float = float(os.getenv("OUTBOX_POLL_SECONDS", 2))
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+    # A claimed row is retried by any worker if not completed within the lease
+    OUTBOX_LEASE_SECONDS: float = float(os.getenv("OUTBOX_LEASE_SECONDS", 60))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+    # Prefixed to the 10-digit mobile numbers collected at login
+    NOTIFY_COUNTRY_CODE: str = os.getenv("NOTIFY_COUNTRY_CODE", "91")
+    # Approved WhatsApp template sent with the message as its one body parameter; free-form text
+    # (empty) only reaches citizens who wrote to the bot in the last 24 hours
+    NOTIFY_TEMPLATE_NAME: str = os.getenv("NOTIFY_TEMPLATE_NAME", "")
+    NOTIFY_TEMPLATE_LANG: str = os.getenv("NOTIFY_TEMPLATE_LANG", "en")
+
+    # ===============================
+    # CORS Configuration
+    # ===============================
+    FRONTEND_URL: str = os.getenv(
+        "FRONTEND_URL",
+        "https://vmcbot.netlify.app"
+    )
+
+    CORS_ORIGINS: str = os.getenv(
+        "CORS_ORIGINS",
+        "http://localhost:3000,"
+        "http://localhost:3001,"
+        "http://127.0.0.1:3000,"
+        "http://127.0.0.1:3001,"
+        "https://vmcbot.netlify.app"
+    )
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+settings = Settings()
+
+
+def get_settings() -> Settings:
+    """Get settings instance"""
+    return settings
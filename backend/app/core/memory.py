@@ -1,37 +1,251 @@
-from typing import Dict, List, Any
-import time
-
-class SimpleMemory:
-    def __init__(self, expiry_seconds: int = 3600):
-        self.sessions: Dict[str, Dict[str, Any]] = {}
-        self.expiry_seconds = expiry_seconds
-
-    def get_session(self, user_id: str) -> Dict[str, Any]:
-        if user_id not in self.sessions:
-            self.sessions[user_id] = {
-                "history": [],
-                "last_active": time.time(),
-                "language": None
-            }
-        
-        # Check for expiry
-        session = self.sessions[user_id]
-        if time.time() - session["last_active"] > self.expiry_seconds:
-            session["history"] = []
-            session["language"] = None
-        
-        session["last_active"] = time.time()
-        return session
-
-    def update_language(self, user_id: str, language: str):
-        session = self.get_session(user_id)
-        session["language"] = language
-
-    def add_message(self, user_id: str, role: str, content: str):
-        session = self.get_session(user_id)
-        session["history"].append({"role": role, "content": content})
-        # Keep history manageable
-        if len(session["history"]) > 10:
-            session["history"].pop(0)
-
-memory = SimpleMemory()
+"""
+Chat history per user, for the admin queries and user history endpoints.
+
+The conversation router records every inbound and outbound message. Each
+session keeps its last ``CHAT_HISTORY_SIZE`` messages in a ring buffer, and
+every message is also appended to ``TRANSCRIPT_DIR/<user>.jsonl`` so the full
+history can be paged from disk. Transcript writes are buffered and flushed
+every ``TRANSCRIPT_FLUSH_SECONDS`` by a background thread, which also drops
+sessions idle for longer than ``CHAT_SESSION_EXPIRY_SECONDS``; neither costs
+anything on the message path.
+
+Sessions are also kept in an activity index: each touch appends
+(sequence number, user) to a list that is therefore sorted by recency, and
+superseded entries are skipped and compacted away later. The admin dashboard
+pages it newest first from a sequence-number cursor with ``bisect``, so a
+page costs O(page size) rather than a sort of every session, and the expiry
+sweep only visits the sessions that are actually idle.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from bisect import bisect_left
+from collections import deque
+from app.core.config import settings
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SimpleMemory:
+    def __init__(self, expiry_seconds: float = settings.CHAT_SESSION_EXPIRY_SECONDS,
+                 history_size: int = settings.CHAT_HISTORY_SIZE,
+                 transcript_dir: str = settings.TRANSCRIPT_DIR,
+                 flush_seconds: float = settings.TRANSCRIPT_FLUSH_SECONDS):
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.expiry_seconds = expiry_seconds
+        self.history_size = history_size
+        self.transcript_dir = transcript_dir
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        # Serializes flushes so a user's lines reach the file in order
+        self._flush_lock = threading.Lock()
+        # user_id -> transcript lines not yet written
+        self._pending: Dict[str, List[str]] = {}
+        # Activity index: touch sequence numbers (ascending) and their users, and each user's latest one
+        self._seqs: List[int] = []
+        self._seq_users: List[str] = []
+        self._latest: Dict[str, int] = {}
+        self._next_seq = 1
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.metrics = {"messages": 0, "flushed": 0, "flush_errors": 0, "expired": 0}
+
+    def get_session(self, user_id: str) -> Dict[str, Any]:
+        with self._lock:
+            session = self.sessions.get(user_id)
+            if session is None:
+                session = self.sessions[user_id] = {
+                    "history": deque(maxlen=self.history_size),
+                    "last_active": time.time(),
+                    "language": None
+                }
+            session["last_active"] = time.time()
+            self._touch(user_id)
+            return session
+
+    def _touch(self, user_id: str):
+        """Move user_id to the most recent end of the activity index; caller holds the lock"""
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seqs.append(seq)
+        self._seq_users.append(user_id)
+        self._latest[user_id] = seq
+        # Entries superseded by a later touch or an expiry are dropped once they outnumber live ones
+        if len(self._seqs) > 2 * len(self._latest) + 64:
+            self._compact()
+
+    def _compact(self):
+        live = [(seq, user_id) for seq, user_id in zip(self._seqs, self._seq_users) if self._latest.get(user_id) == seq]
+        self._seqs = [seq for seq, _ in live]
+        self._seq_users = [user_id for _, user_id in live]
+
+    def recent_sessions(self, cursor: Optional[str] = None, limit: int = 50) -> Tuple[List[Tuple[str, Dict[str, Any]]], Optional[str]]:
+        """Most recently active (user_id, session) pairs, newest first, and the cursor of the next page"""
+        try:
+            before = int(cursor) if cursor else self._next_seq
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        page = []
+        with self._lock:
+            i = bisect_left(self._seqs, before) - 1
+            while i >= 0 and len(page) < limit:
+                seq, user_id = self._seqs[i], self._seq_users[i]
+                if self._latest.get(user_id) == seq:
+                    page.append((user_id, self.sessions[user_id]))
+                    last_seq = seq
+                i -= 1
+            # Skip superseded entries so a cursor is only handed out when another page exists
+            while i >= 0 and self._latest.get(self._seq_users[i]) != self._seqs[i]:
+                i -= 1
+            next_cursor = str(last_seq) if i >= 0 and page else None
+        return page, next_cursor
+
+    def forget(self, user_id: str):
+        with self._lock:
+            self.sessions.pop(user_id, None)
+            self._latest.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.sessions.clear()
+            self._latest.clear()
+            self._compact()
+
+    def find_session(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """The user's session if it exists and has not expired; unlike get_session, creates nothing"""
+        session = self.sessions.get(user_id)
+        if session is None or time.time() - session["last_active"] > self.expiry_seconds:
+            return None
+        return session
+
+    def update_language(self, user_id: str, language: str):
+        session = self.get_session(user_id)
+        session["language"] = language
+
+    def add_message(self, user_id: str, role: str, content: str):
+        message = {"role": role, "content": content, "at": round(time.time(), 3)}
+        session = self.get_session(user_id)
+        with self._lock:
+            session["history"].append(message)
+            if self.transcript_dir:
+                self._pending.setdefault(user_id, []).append(json.dumps(message, ensure_ascii=False))
+            self.metrics["messages"] += 1
+
+    def transcript_path(self, user_id: str) -> str:
+        return os.path.join(self.transcript_dir, re.sub(r"[^\w-]", "_", user_id) + ".jsonl")
+
+    def flush(self):
+        """Append buffered messages to the users' transcript files"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            os.makedirs(self.transcript_dir, exist_ok=True)
+            for user_id, lines in pending.items():
+                try:
+                    with open(self.transcript_path(user_id), "a", encoding="utf-8") as f:
+                        f.write("\n".join(lines) + "\n")
+                    self.metrics["flushed"] += len(lines)
+                except OSError as e:
+                    logger.error(f"Error writing transcript for {user_id}: {e}")
+                    self.metrics["flush_errors"] += 1
+                    # Keep them for the next flush, ahead of anything newer
+                    with self._lock:
+                        self._pending[user_id] = lines + self._pending.get(user_id, [])
+
+    def transcript(self, user_id: str, cursor: Optional[str] = None, limit: int = 50) -> Optional[Dict]:
+        """One page of a user's full history, oldest first; None if the user has no transcript"""
+        if not self.transcript_dir:
+            return None
+        try:
+            offset = int(cursor) if cursor else 0
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        if offset < 0:
+            raise ValueError("Invalid cursor")
+        self.flush()
+        try:
+            f = open(self.transcript_path(user_id), "rb")
+        except FileNotFoundError:
+            return None
+        items = []
+        with f:
+            # The cursor is the byte offset of the next line, so a page costs O(limit)
+            if offset:
+                # Only the start of a line is a cursor this method handed out
+                f.seek(offset - 1)
+                if f.read(1) not in (b"\n", b""):
+                    raise ValueError("Invalid cursor")
+            f.seek(offset)
+            while len(items) < limit:
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    raise ValueError("Invalid cursor")
+            position = f.tell()
+            next_cursor = str(position) if f.readline() else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    def sweep(self) -> int:
+        """Drop sessions idle for longer than the expiry; their transcripts stay on disk"""
+        cutoff = time.time() - self.expiry_seconds
+        expired = 0
+        with self._lock:
+            # Oldest first: stop at the first session still in use
+            for seq, user_id in zip(self._seqs, self._seq_users):
+                if self._latest.get(user_id) != seq:
+                    continue
+                if self.sessions[user_id]["last_active"] >= cutoff:
+                    break
+                del self.sessions[user_id]
+                del self._latest[user_id]
+                expired += 1
+            if expired:
+                self._compact()
+            self.metrics["expired"] += expired
+        return expired
+
+    def _run(self):
+        sweep_every = max(1, int(settings.CHAT_SWEEP_SECONDS / max(self.flush_seconds, 0.001)))
+        ticks = 0
+        while not self._stopping.wait(self.flush_seconds):
+            try:
+                self.flush()
+                ticks += 1
+                if ticks % sweep_every == 0:
+                    self.sweep()
+            except Exception as e:
+                logger.error(f"Error in chat memory maintenance: {e}", exc_info=True)
+
+    def start(self):
+        """Start the background flush/expiry thread (one per worker)"""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="chat-memory", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and write out anything still buffered"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = sum(len(lines) for lines in self._pending.values())
+            sessions = len(self.sessions)
+        return {"sessions": sessions, "pending": pending, **self.metrics}
+
+
+memory = SimpleMemory()
@@ -1,85 +1,202 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from app.db.models import Base, User, Session as SessionModel, Complaint, PropertyTax
-from app.core.config import settings
-import logging
-
-logger = logging.getLogger(__name__)
-
-# Create MariaDB connection string
-DATABASE_URL = f"postgresql+psycopg2://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
-
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=settings.DEBUG
-)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def get_db():
-    """Dependency for getting database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def create_db_and_tables():
-    """Create all tables"""
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Error creating database tables: {e}")
-        raise
-
-def seed_data():
-    """Seed initial data if needed"""
-    db = SessionLocal()
-    try:
-        # Check if property tax data exists
-        if db.query(PropertyTax).first() is None:
-            # Seed sample property tax records
-            sample_taxes = [
-                PropertyTax(
-                    property_id="PROP-001",
-                    owner_name="John Doe",
-                    address="123 Main Street, Ward 1",
-                    amount=15000.0,
-                    status="paid",
-                    year=2025,
-                    receipt_no="REC-2025-001",
-                    bill_no="BILL-2025-001"
-                ),
-                PropertyTax(
-                    property_id="PROP-002",
-                    owner_name="Jane Smith",
-                    address="456 Oak Avenue, Ward 2",
-                    amount=20000.0,
-                    status="due",
-                    year=2025,
-                    receipt_no=None,
-                    bill_no="BILL-2025-002"
-                ),
-                PropertyTax(
-                    property_id="PROP-003",
-                    owner_name="Bob Johnson",
-                    address="789 Pine Road, Ward 3",
-                    amount=18000.0,
-                    status="pending",
-                    year=2025,
-                    receipt_no=None,
-                    bill_no="BILL-2025-003"
-                ),
-            ]
-            db.add_all(sample_taxes)
-            db.commit()
-            logger.info("Sample property tax data seeded")
-    except Exception as e:
-        logger.error(f"Error seeding data: {e}")
-        db.rollback()
-    finally:
-        db.close()
-
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+from app.db.models import Base, User, Session as SessionModel, Complaint, PropertyTax
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pragmas applied to every SQLite connection (embedded / small deployments and tests)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "temp_store": "MEMORY",
+    "cache_size": "-64000",      # 64 MB page cache
+    "mmap_size": "268435456",    # 256 MB memory-mapped I/O
+}
+
+def get_database_url() -> str:
+    """Resolve the database URL from settings"""
+    if settings.DATABASE_URL:
+        return settings.DATABASE_URL
+    return f"postgresql+psycopg2://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+
+def _configure_sqlite(engine: Engine, in_memory: bool):
+    busy_timeout = settings.DB_STATEMENT_TIMEOUT_MS or 5000
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+        for name, value in SQLITE_PRAGMAS.items():
+            # WAL needs a real file; in-memory databases keep their default journal
+            if in_memory and name in ("journal_mode", "mmap_size"):
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+def _configure_mysql(engine: Engine):
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if not timeout_ms:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_mysql_timeout(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        if "mariadb" in dbapi_conn.get_server_info().lower():
+            cursor.execute(f"SET SESSION max_statement_time = {timeout_ms / 1000}")
+        else:
+            cursor.execute(f"SET SESSION max_execution_time = {timeout_ms}")
+        cursor.close()
+
+def _configure_read_only(engine: Engine):
+    """Reject writes on every connection (replica engines)"""
+    statement = {
+        "sqlite": "PRAGMA query_only = ON",
+        "postgresql": "SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY",
+        "mysql": "SET SESSION TRANSACTION READ ONLY",
+    }.get(engine.dialect.name)
+    if statement is None:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_read_only(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute(statement)
+        cursor.close()
+
+def create_db_engine(url: Optional[str] = None, read_only: bool = False, **overrides) -> Engine:
+    """
+    Build an engine for the configured profile (PostgreSQL, MySQL/MariaDB or SQLite).
+    Pool sizing and statement timeouts come from settings; keyword overrides win.
+    read_only makes every connection reject writes (used for the replica).
+    """
+    url = make_url(url or get_database_url())
+    backend = url.get_backend_name()
+    options = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": True,
+    }
+
+    if backend == "sqlite":
+        in_memory = url.database in (None, "", ":memory:")
+        options["connect_args"] = {"check_same_thread": False}
+        if in_memory:
+            # One shared connection so every session sees the same database
+            options["poolclass"] = StaticPool
+        else:
+            options.update(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW,
+                           pool_timeout=settings.DB_POOL_TIMEOUT)
+        options.update(overrides)
+        engine = create_engine(url, **options)
+        _configure_sqlite(engine, in_memory)
+        if read_only:
+            _configure_read_only(engine)
+        return engine
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    options.update(overrides)
+    engine = create_engine(url, **options)
+    if backend == "mysql":
+        _configure_mysql(engine)
+    if read_only:
+        _configure_read_only(engine)
+    return engine
+
+engine = create_db_engine()
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Without a configured replica, reads go to the primary
+replica_engine = create_db_engine(settings.DATABASE_REPLICA_URL, read_only=True) if settings.DATABASE_REPLICA_URL else engine
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+def get_db():
+    """Dependency for getting database session"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db():
+    """Dependency for a session on the read replica (or the primary when none is configured)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def create_db_and_tables():
+    """Create all tables and apply pending schema migrations"""
+    from app.db.migrations import run_migrations
+    try:
+        applied = run_migrations(engine)
+        logger.info(f"Database tables ready (migrations applied: {applied or 'none'})")
+    except Exception as e:
+        logger.error(f"Error creating database tables: {e}")
+        raise
+
+def seed_data():
+    """Seed initial data if needed"""
+    db = SessionLocal()
+    try:
+        # Check if property tax data exists
+        if db.query(PropertyTax).first() is None:
+            # Seed sample property tax records
+            sample_taxes = [
+                PropertyTax(
+                    property_id="PROP-001",
+                    owner_name="John Doe",
+                    address="123 Main Street, Ward 1",
+                    amount=15000.0,
+                    status="paid",
+                    year=2025,
+                    receipt_no="REC-2025-001",
+                    bill_no="BILL-2025-001",
+                    ward_number="Ward 1"
+                ),
+                PropertyTax(
+                    property_id="PROP-002",
+                    owner_name="Jane Smith",
+                    address="456 Oak Avenue, Ward 2",
+                    amount=20000.0,
+                    status="due",
+                    year=2025,
+                    receipt_no=None,
+                    bill_no="BILL-2025-002",
+                    ward_number="Ward 2"
+                ),
+                PropertyTax(
+                    property_id="PROP-003",
+                    owner_name="Bob Johnson",
+                    address="789 Pine Road, Ward 3",
+                    amount=18000.0,
+                    status="pending",
+                    year=2025,
+                    receipt_no=None,
+                    bill_no="BILL-2025-003",
+                    ward_number="Ward 3"
+                ),
+            ]
+            db.add_all(sample_taxes)
+            db.commit()
+            logger.info("Sample property tax data seeded")
+    except Exception as e:
+        logger.error(f"Error seeding data: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
@@ -0,0 +1,198 @@
+"""
+Versioned, dialect-aware schema migrations.
+
+New tables and indexes declared on the models are created by
+``Base.metadata.create_all``; migrations bring databases created by older
+releases up to date. Every step checks the live schema before changing it,
+so running against a fresh database simply records the versions.
+Applied versions are stored in the ``schema_migrations`` table.
+"""
+
+from typing import Callable, Dict, Iterator, List, Sequence
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, Text, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.types import TypeEngine
+from app.db.models import Base
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+WARD_IN_ADDRESS_RE = re.compile(r"\bWard\s*(?:No\.?\s*)?(\d+)\b", re.IGNORECASE)
+
+# Arbitrary key for the PostgreSQL advisory lock that serializes concurrent runners
+MIGRATION_LOCK_ID = 72_019_026
+# MySQL named lock (GET_LOCK) and how long a runner waits for it
+MIGRATION_LOCK_NAME = "vmc_schema_migrations"
+MIGRATION_LOCK_TIMEOUT_SECONDS = 60
+
+
+class Migration:
+    def __init__(self, version: int, description: str, upgrade: Callable[[Connection], None]):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+
+
+def add_column(conn: Connection, table: str, name: str, type_: TypeEngine, nullable: bool = True, default: str = None):
+    """ALTER TABLE ... ADD COLUMN unless the column already exists"""
+    if name in {c["name"] for c in inspect(conn).get_columns(table)}:
+        return
+    ddl = f"ALTER TABLE {table} ADD COLUMN {name} {type_.compile(dialect=conn.dialect)}"
+    if default is not None:
+        ddl += f" DEFAULT {default}"
+    if not nullable:
+        ddl += " NOT NULL"
+    conn.execute(text(ddl))
+    logger.info(f"Added column {table}.{name}")
+
+
+def create_index(conn: Connection, name: str, table: str, columns: Sequence[str]):
+    """CREATE INDEX unless an index with this name already exists on the table"""
+    if name in {ix["name"] for ix in inspect(conn).get_indexes(table)}:
+        return
+    conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+    logger.info(f"Created index {name} on {table}({', '.join(columns)})")
+
+
+def _add_complaint_location(conn: Connection):
+    add_column(conn, "complaints", "latitude", Float())
+    add_column(conn, "complaints", "longitude", Float())
+
+
+def _add_complaint_report_count(conn: Connection):
+    add_column(conn, "complaints", "report_count", Integer(), nullable=False, default="1")
+
+
+def _add_hot_path_indexes(conn: Connection):
+    # Tracking: complaints by login ID
+    create_index(conn, "ix_complaints_login_id", "complaints", ["login_id"])
+    # Dashboard: complaints by status, newest first
+    create_index(conn, "ix_complaints_status_created_at", "complaints", ["status", "created_at"])
+    # Property tax lookup by receipt number
+    create_index(conn, "ix_property_tax_receipt_no", "property_tax", ["receipt_no"])
+
+
+def _add_pagination_indexes(conn: Connection):
+    # Keyset pagination of /api/complaints on (created_at, id)
+    create_index(conn, "ix_complaints_created_at_id", "complaints", ["created_at", "id"])
+    create_index(conn, "ix_complaints_category_created_at", "complaints", ["category", "created_at"])
+    # Ward filter joins through users
+    create_index(conn, "ix_users_ward_number", "users", ["ward_number"])
+
+def _add_export_watermark_index(conn: Connection):
+    create_index(conn, "ix_complaints_updated_at_id", "complaints", ["updated_at", "id"])
+
+
+def _backfill_complaint_stats(conn: Connection):
+    from app.services.complaint_stats import rebuild
+    rows = rebuild(conn)
+    logger.info(f"Backfilled {rows} complaint_stats rows")
+
+
+def _add_property_tax_updated_at(conn: Connection):
+    add_column(conn, "property_tax", "updated_at", DateTime())
+
+
+def _add_complaint_search(conn: Connection):
+    from app.services.complaint_search import backfill_search_text, create_search_indexes
+    add_column(conn, "complaints", "search_text", Text())
+    add_column(conn, "complaints_archive", "search_text", Text())
+    logger.info(f"Backfilled search_text for {backfill_search_text(conn)} complaints")
+    create_search_indexes(conn)
+
+
+def _add_property_tax_ward(conn: Connection):
+    add_column(conn, "property_tax", "ward_number", String(10))
+    create_index(conn, "ix_property_tax_ward_number", "property_tax", ["ward_number"])
+    # Older rolls only carry the ward in the address ("..., Ward 3")
+    rows = conn.execute(text(
+        "SELECT id, address FROM property_tax WHERE ward_number IS NULL AND address LIKE '%Ward%'"
+    )).all()
+    for row in rows:
+        match = WARD_IN_ADDRESS_RE.search(row.address)
+        if match:
+            conn.execute(
+                text("UPDATE property_tax SET ward_number = :ward WHERE id = :id"),
+                {"ward": f"Ward {match.group(1)}", "id": row.id}
+            )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Add complaint latitude/longitude", _add_complaint_location),
+    Migration(2, "Add complaint report_count for linked duplicate reports", _add_complaint_report_count),
+    Migration(3, "Add hot-path indexes for tracking, dashboard and receipt lookup", _add_hot_path_indexes),
+    Migration(4, "Add keyset pagination indexes for the complaints listing", _add_pagination_indexes),
+    Migration(5, "Add updated_at index for incremental complaint exports", _add_export_watermark_index),
+    Migration(6, "Backfill complaint_stats dashboard counters", _backfill_complaint_stats),
+    Migration(7, "Add property_tax.updated_at for roll imports", _add_property_tax_updated_at),
+    Migration(8, "Add complaint search_text with a full-text index", _add_complaint_search),
+    Migration(9, "Add property_tax.ward_number for batch receipts", _add_property_tax_ward),
+]
+
+
+@contextmanager
+def _lock(conn: Connection) -> Iterator[None]:
+    """Serialize concurrent runners (e.g. several workers starting at once) for the duration of the block"""
+    if conn.dialect.name == "postgresql":
+        # Released with the transaction
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+    elif conn.dialect.name == "mysql":
+        # Session-level: held until released, whether the migrations succeed or not
+        acquired = conn.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT_SECONDS},
+        ).scalar()
+        if acquired != 1:
+            raise RuntimeError(
+                f"Could not take the migration lock within {MIGRATION_LOCK_TIMEOUT_SECONDS}s; "
+                "is another runner stuck?"
+            )
+        try:
+            yield
+        finally:
+            try:
+                conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+            except Exception as e:
+                logger.warning(f"Could not release the migration lock: {e}")
+        return
+    yield
+
+
+def applied_versions(conn: Connection) -> Dict[int, datetime]:
+    """Map of applied migration versions to when they were applied"""
+    migration_metadata.create_all(bind=conn)
+    rows = conn.execute(select(schema_migrations.c.version, schema_migrations.c.applied_at)).all()
+    return {row.version: row.applied_at for row in rows}
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Create missing tables, then apply pending migrations in order. Returns the versions applied."""
+    applied_now = []
+    with engine.begin() as conn, _lock(conn):
+        Base.metadata.create_all(bind=conn)
+        done = applied_versions(conn)
+        for migration in MIGRATIONS:
+            if migration.version in done:
+                continue
+            logger.info(f"Applying migration {migration.version}: {migration.description}")
+            migration.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version,
+                description=migration.description,
+                applied_at=datetime.utcnow()
+            ))
+            applied_now.append(migration.version)
+    return applied_now
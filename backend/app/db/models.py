@@ -1,78 +1,175 @@
-from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Enum as SQLEnum
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from datetime import datetime
-import enum
-
-Base = declarative_base()
-
-class ComplaintStatus(str, enum.Enum):
-    PENDING = "pending"
-    RESOLVED = "resolved"
-    IN_PROGRESS = "in_progress"
-
-class TaxStatus(str, enum.Enum):
-    PAID = "paid"
-    DUE = "due"
-    PENDING = "pending"
-
-class User(Base):
-    __tablename__ = "users"
-    
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    login_id = Column(String(50), unique=True, nullable=False, index=True)
-    name = Column(String(100), nullable=False)
-    mobile = Column(String(20), nullable=False, index=True)
-    area = Column(String(100))
-    ward_number = Column(String(10))
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-class Session(Base):
-    __tablename__ = "sessions"
-    
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, nullable=False, index=True)
-    phone_number = Column(String(20), nullable=False, index=True)
-    state = Column(String(50), default="login")
-    current_category = Column(String(50), nullable=True)
-    current_sub_issue = Column(String(100), nullable=True)
-    login_id = Column(String(50), nullable=True)
-    complaint_id = Column(String(50), nullable=True)
-    property_id = Column(String(50), nullable=True)
-    image_url = Column(Text, nullable=True)
-    description = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-class Complaint(Base):
-    __tablename__ = "complaints"
-    
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    complaint_id = Column(String(50), unique=True, nullable=False, index=True)
-    user_id = Column(Integer, nullable=False, index=True)
-    login_id = Column(String(50), nullable=False)
-    category = Column(String(50), nullable=False)
-    sub_issue = Column(String(100), nullable=True)
-    description = Column(Text, nullable=True)
-    image_url = Column(Text, nullable=True)
-    latitude = Column(Float, nullable=True)
-    longitude = Column(Float, nullable=True)
-    status = Column(SQLEnum(ComplaintStatus), default=ComplaintStatus.PENDING, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-class PropertyTax(Base):
-    __tablename__ = "property_tax"
-    
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    property_id = Column(String(50), unique=True, nullable=False, index=True)
-    owner_name = Column(String(100), nullable=False)
-    address = Column(Text, nullable=False)
-    amount = Column(Float, nullable=False)
-    status = Column(SQLEnum(TaxStatus), nullable=False, index=True)
-    year = Column(Integer, nullable=False)
-    receipt_no = Column(String(50), nullable=True)
-    bill_no = Column(String(50), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Text, Float, Date, DateTime, Index, Enum as SQLEnum
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine
+from datetime import datetime
+import enum
+
+Base = declarative_base()
+
+class ComplaintStatus(str, enum.Enum):
+    PENDING = "pending"
+    RESOLVED = "resolved"
+    IN_PROGRESS = "in_progress"
+
+class TaxStatus(str, enum.Enum):
+    PAID = "paid"
+    DUE = "due"
+    PENDING = "pending"
+
+class User(Base):
+    __tablename__ = "users"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    login_id = Column(String(50), unique=True, nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    mobile = Column(String(20), nullable=False, index=True)
+    area = Column(String(100))
+    ward_number = Column(String(10), index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class Session(Base):
+    __tablename__ = "sessions"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    phone_number = Column(String(20), nullable=False, index=True)
+    state = Column(String(50), default="login")
+    current_category = Column(String(50), nullable=True)
+    current_sub_issue = Column(String(100), nullable=True)
+    login_id = Column(String(50), nullable=True)
+    complaint_id = Column(String(50), nullable=True)
+    property_id = Column(String(50), nullable=True)
+    image_url = Column(Text, nullable=True)
+    description = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Complaint(Base):
+    __tablename__ = "complaints"
+    __table_args__ = (
+        # Dashboard listing by status, newest first
+        Index("ix_complaints_status_created_at", "status", "created_at"),
+        # Keyset pagination on (created_at, id), optionally filtered by category
+        Index("ix_complaints_created_at_id", "created_at", "id"),
+        Index("ix_complaints_category_created_at", "category", "created_at"),
+        # Incremental exports since an updated_at watermark
+        Index("ix_complaints_updated_at_id", "updated_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    complaint_id = Column(String(50), unique=True, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    login_id = Column(String(50), nullable=False, index=True)
+    category = Column(String(50), nullable=False)
+    sub_issue = Column(String(100), nullable=True)
+    description = Column(Text, nullable=True)
+    image_url = Column(Text, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    status = Column(SQLEnum(ComplaintStatus), default=ComplaintStatus.PENDING, index=True)
+    report_count = Column(Integer, nullable=False, default=1, server_default="1")
+    # Category, sub-issue and description words for full-text search (see complaint_search)
+    search_text = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ArchivedComplaint(Base):
+    """Complaint resolved long ago, moved out of the hot complaints table"""
+    __tablename__ = "complaints_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    complaint_id = Column(String(50), unique=True, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    login_id = Column(String(50), nullable=False, index=True)
+    category = Column(String(50), nullable=False)
+    sub_issue = Column(String(100), nullable=True)
+    description = Column(Text, nullable=True)
+    image_url = Column(Text, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    status = Column(SQLEnum(ComplaintStatus), nullable=False)
+    report_count = Column(Integer, nullable=False, default=1, server_default="1")
+    search_text = Column(Text, nullable=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class ComplaintReport(Base):
+    """A citizen report linked to an existing open complaint as a near-duplicate"""
+    __tablename__ = "complaint_reports"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    complaint_id = Column(String(50), nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
+    login_id = Column(String(50), nullable=False, index=True)
+    image_url = Column(Text, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ComplaintStat(Base):
+    """Complaint count per ward, category, sub-issue, status and creation day"""
+    __tablename__ = "complaint_stats"
+
+    # Missing ward/sub-issue are stored as "" so they take part in the key
+    ward = Column(String(10), primary_key=True, default="")
+    category = Column(String(50), primary_key=True)
+    sub_issue = Column(String(100), primary_key=True, default="")
+    status = Column(SQLEnum(ComplaintStatus), primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class NotificationOutbox(Base):
+    """Citizen WhatsApp notification written in the same transaction as the change it announces"""
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Relay: due pending rows, oldest first
+        Index("ix_notification_outbox_state_next_attempt", "state", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # One row per logical notification, e.g. complaint-status:CMP-1:resolved:<changed_at>
+    dedupe_key = Column(String(150), unique=True, nullable=False)
+    # What the notification is about (complaint ID); only the newest pending row per subject is sent
+    subject = Column(String(50), nullable=False, index=True)
+    recipient = Column(String(20), nullable=False)
+    message = Column(Text, nullable=False)
+    state = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    claimed_by = Column(String(100), nullable=True)
+    last_error = Column(String(500), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+class ComplaintEvent(Base):
+    """Live feed event written in the same transaction as the complaint change; every worker tails it by id"""
+    __tablename__ = "complaint_events"
+
+    # Global, increasing: the SSE event ID on every worker
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(30), nullable=False)
+    ward = Column(String(10), nullable=True)
+    category = Column(String(50), nullable=False)
+    # SSE data line, JSON encoded once by the writer
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class PropertyTax(Base):
+    __tablename__ = "property_tax"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    property_id = Column(String(50), unique=True, nullable=False, index=True)
+    owner_name = Column(String(100), nullable=False)
+    address = Column(Text, nullable=False)
+    amount = Column(Float, nullable=False)
+    status = Column(SQLEnum(TaxStatus), nullable=False, index=True)
+    year = Column(Integer, nullable=False)
+    receipt_no = Column(String(50), nullable=True, index=True)
+    bill_no = Column(String(50), nullable=True)
+    # Same form as users.ward_number, e.g. "Ward 10"; selects receipts for batch runs
+    ward_number = Column(String(10), nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
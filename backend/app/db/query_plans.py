@@ -0,0 +1,177 @@
+"""
+EXPLAIN-based checks for the queries on the router and API hot paths.
+
+Each registered query is explained on the live database and any table it
+reads with a full sequential scan is reported. On PostgreSQL sequential
+scans are disabled for the check, so a Seq Scan in the plan means no usable
+index exists rather than the planner preferring a scan of a small table.
+"""
+
+from typing import Callable, Dict, List
+from datetime import datetime, timedelta
+from sqlalchemy import or_, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from app.db.models import ArchivedComplaint, Complaint, ComplaintReport, ComplaintStatus, PropertyTax, User
+import json
+
+# name -> factory returning the statement as the application issues it
+HOT_QUERIES: Dict[str, Callable] = {}
+
+
+def hot_query(name: str):
+    """Register a statement factory to be covered by the plan check"""
+    def decorator(factory: Callable):
+        HOT_QUERIES[name] = factory
+        return factory
+    return decorator
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper so the inner statement is compiled with its bound parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement, prefix: str):
+        self.statement = statement
+        self.prefix = prefix
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    # Compile as a nested statement so its columns do not become the result
+    # columns (the plan rows have their own shape)
+    compiler.stack.append({"correlate_froms": set(), "asfrom_froms": set(), "selectable": element})
+    try:
+        return f"{element.prefix} {compiler.process(element.statement, **kw)}"
+    finally:
+        compiler.stack.pop()
+
+
+@hot_query("tracking: user by login_id")
+def _user_by_login_id():
+    return select(User).where(User.login_id == "LOGIN-00000000")
+
+
+@hot_query("tracking: complaints by login_id")
+def _complaints_by_login_id():
+    linked_ids = select(ComplaintReport.complaint_id).where(ComplaintReport.login_id == "LOGIN-00000000")
+    return select(Complaint).where(or_(Complaint.login_id == "LOGIN-00000000", Complaint.complaint_id.in_(linked_ids)))
+
+
+@hot_query("tracking: archived complaints by login_id")
+def _archived_complaints_by_login_id():
+    linked_ids = select(ComplaintReport.complaint_id).where(ComplaintReport.login_id == "LOGIN-00000000")
+    return select(ArchivedComplaint).where(or_(
+        ArchivedComplaint.login_id == "LOGIN-00000000", ArchivedComplaint.complaint_id.in_(linked_ids)
+    ))
+
+
+@hot_query("archival: resolved complaints past the cutoff")
+def _archive_candidates():
+    return (
+        select(Complaint.id)
+        .where(Complaint.status == ComplaintStatus.RESOLVED, Complaint.updated_at < datetime.utcnow())
+        .order_by(Complaint.updated_at, Complaint.id)
+        .limit(500)
+    )
+
+
+@hot_query("property tax by receipt_no")
+def _property_by_receipt_no():
+    return select(PropertyTax).where(PropertyTax.receipt_no == "REC-2025-001")
+
+
+@hot_query("property tax by property_id")
+def _property_by_property_id():
+    return select(PropertyTax).where(PropertyTax.property_id == "PROP-001")
+
+
+@hot_query("status update: complaint by complaint_id")
+def _complaint_by_complaint_id():
+    return select(Complaint).where(Complaint.complaint_id == "CMP-00000000")
+
+
+@hot_query("dashboard: complaints by status, newest first")
+def _complaints_by_status():
+    return (
+        select(Complaint)
+        .where(Complaint.status == ComplaintStatus.PENDING)
+        .order_by(Complaint.created_at.desc())
+        .limit(50)
+    )
+
+
+@hot_query("dashboard: complaints page after cursor")
+def _complaints_page():
+    from app.services.complaint_listing import COMPLAINT_FIELDS, build_complaints_query
+    return build_complaints_query(list(COMPLAINT_FIELDS), after=(datetime.utcnow(), 1000))
+
+
+@hot_query("dashboard: complaints page by category")
+def _complaints_page_by_category():
+    from app.services.complaint_listing import build_complaints_query
+    return build_complaints_query(["complaint_id", "status"], category="garbage_cleanliness", after=(datetime.utcnow(), 1000))
+
+
+@hot_query("export: complaints since watermark")
+def _complaints_since_watermark():
+    from app.services.complaint_export import build_export_query
+    return build_export_query(since=datetime.utcnow() - timedelta(days=1))
+
+
+@hot_query("duplicate index warm-up: open complaints in window")
+def _open_recent_complaints():
+    return select(Complaint.complaint_id).where(
+        Complaint.status.in_([ComplaintStatus.PENDING, ComplaintStatus.IN_PROGRESS]),
+        Complaint.created_at >= datetime.utcnow() - timedelta(days=4)
+    )
+
+
+def _postgres_scans(conn: Connection, statement) -> List[str]:
+    conn.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = conn.execute(Explain(statement, "EXPLAIN (FORMAT JSON)")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans = []
+    stack = [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan":
+            scans.append(node.get("Relation Name", "?"))
+        stack.extend(node.get("Plans", []))
+    return scans
+
+
+def _sqlite_scans(conn: Connection, statement) -> List[str]:
+    scans = []
+    for row in conn.execute(Explain(statement, "EXPLAIN QUERY PLAN")):
+        detail = row[-1]
+        # "SCAN complaints" is a full table scan; "SCAN ... USING INDEX" walks an index
+        if detail.startswith("SCAN ") and "USING" not in detail and "CONSTANT ROW" not in detail:
+            scans.append(detail.split()[1])
+    return scans
+
+
+def _mysql_scans(conn: Connection, statement) -> List[str]:
+    return [row.table for row in conn.execute(Explain(statement, "EXPLAIN")) if row.type == "ALL"]
+
+
+def find_sequential_scans(engine: Engine) -> Dict[str, List[str]]:
+    """Explain every hot query; returns {query name: [tables read by sequential scan]} for offenders"""
+    explain = {
+        "postgresql": _postgres_scans,
+        "sqlite": _sqlite_scans,
+        "mysql": _mysql_scans,
+    }.get(engine.dialect.name)
+    if explain is None:
+        raise ValueError(f"No EXPLAIN support for dialect {engine.dialect.name}")
+
+    offenders = {}
+    for name, factory in HOT_QUERIES.items():
+        with engine.connect() as conn:
+            with conn.begin():
+                scans = explain(conn, factory())
+        if scans:
+            offenders[name] = scans
+    return offenders
@@ -0,0 +1,78 @@
+"""
+Read/write routing between the primary database and the optional read replica.
+
+Writes always use ``SessionLocal`` (the primary). Read-only paths ask the
+router for a session: they get the replica unless the key they read by (a
+login ID) was written to within ``REPLICA_STICKY_SECONDS``, in which case
+they stay on the primary so a citizen tracking a complaint right after
+filing it does not see replication lag.
+
+This is best-effort: recent writes are remembered in the process that made
+them, and nothing routes a citizen's next webhook to the same gunicorn
+worker. A read handled by another worker inside the window goes to the
+replica and can miss the write until it has replicated. Where that matters,
+run a single worker or leave ``DATABASE_REPLICA_URL`` unset.
+"""
+
+from typing import Callable, Dict, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import ReadSessionLocal, SessionLocal, engine, replica_engine
+from app.services.events import ComplaintCreated, ComplaintStatusChanged, event_bus
+import threading
+import time
+
+# Forget expired keys once this many are being tracked
+PRUNE_THRESHOLD = 10_000
+
+
+class ReadRouter:
+    def __init__(self, primary_factory: Callable[[], Session], replica_factory: Callable[[], Session],
+                 sticky_seconds: float = settings.REPLICA_STICKY_SECONDS):
+        self.primary_factory = primary_factory
+        self.replica_factory = replica_factory
+        self.sticky_seconds = sticky_seconds
+        self._written: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark_written(self, key: Optional[str]):
+        """Pin this worker's reads for key to the primary for the sticky window"""
+        if not key:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._written[key] = now + self.sticky_seconds
+            if len(self._written) > PRUNE_THRESHOLD:
+                self._written = {k: until for k, until in self._written.items() if until > now}
+
+    def recently_written(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        with self._lock:
+            until = self._written.get(key)
+        return until is not None and until > time.monotonic()
+
+    def session(self, key: Optional[str] = None) -> Session:
+        """Session for a read; on the primary if key was written recently"""
+        if self.recently_written(key):
+            return self.primary_factory()
+        return self.replica_factory()
+
+
+read_router = ReadRouter(SessionLocal, ReadSessionLocal)
+
+
+def has_replica() -> bool:
+    return replica_engine is not engine
+
+
+def _on_complaint_created(event: ComplaintCreated):
+    read_router.mark_written(event.login_id)
+
+
+def _on_status_changed(event: ComplaintStatusChanged):
+    read_router.mark_written(event.login_id)
+
+
+event_bus.subscribe(ComplaintCreated, _on_complaint_created)
+event_bus.subscribe(ComplaintStatusChanged, _on_status_changed)
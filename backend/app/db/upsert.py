@@ -0,0 +1,26 @@
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import Table
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+
+def upsert_statement(dialect_name: str, table: Table, rows: Optional[List[Dict]], key_columns: Sequence[str],
+                     update_columns: Sequence[str], increment: bool = False):
+    """
+    Multi-row INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE for the given dialect.
+    With increment=True the update columns are added to the existing values
+    instead of replacing them (used for counters). With rows=None the statement
+    has no values and is meant to be executed with a list of parameter dicts
+    (executemany), which compiles it once however many rows there are.
+    """
+    if dialect_name in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+        stmt = insert(table) if rows is None else insert(table).values(rows)
+        new = stmt.excluded
+        updates = {c: (table.c[c] + new[c]) if increment else new[c] for c in update_columns}
+        return stmt.on_conflict_do_update(index_elements=list(key_columns), set_=updates)
+    if dialect_name == "mysql":
+        stmt = mysql.insert(table) if rows is None else mysql.insert(table).values(rows)
+        new = stmt.inserted
+        updates = {c: (table.c[c] + new[c]) if increment else new[c] for c in update_columns}
+        return stmt.on_duplicate_key_update(**updates)
+    raise ValueError(f"Upsert not supported for dialect {dialect_name}")
@@ -1,351 +1,685 @@
-from fastapi import FastAPI, Request, HTTPException, Query
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
-from starlette.exceptions import HTTPException as StarletteHTTPException
-from app.core.config import settings
-from app.db.database import create_db_and_tables, seed_data, SessionLocal
-from app.db.models import PropertyTax, Complaint, User, ComplaintStatus
-from app.services.whatsapp import whatsapp_service
-from app.services.conversation_router import ConversationRouter
-from app.services.pdf_service import generate_property_tax_pdf
-import logging
-import os
-from datetime import datetime
-
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-app = FastAPI(title="VMC WhatsApp Chatbot API")
-
-# Initialize database
-create_db_and_tables()
-seed_data()
-
-# Create upload and PDF directories
-os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-os.makedirs(settings.PDF_DIR, exist_ok=True)
-
-# Mount static directories
-app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
-app.mount("/pdfs", StaticFiles(directory=settings.PDF_DIR), name="pdfs")
-
-# Enable CORS for frontend
-# Parse CORS origins from settings
-cors_origins = [origin.strip() for origin in settings.CORS_ORIGINS.split(",")] if settings.CORS_ORIGINS else ["*"]
-
-# Add frontend URL if specified
-if settings.FRONTEND_URL and settings.FRONTEND_URL not in cors_origins:
-    cors_origins.append(settings.FRONTEND_URL)
-
-# Ensure Netlify frontend is allowed
-netlify_frontend = "https://vmcbot.netlify.app"
-if netlify_frontend not in cors_origins:
-    cors_origins.append(netlify_frontend)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_origins,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=[
-        "Accept",
-        "Accept-Language",
-        "Content-Language",
-        "Content-Type",
-        "Authorization",
-        "X-Requested-With",
-        "Origin",
-        "Access-Control-Request-Method",
-        "Access-Control-Request-Headers",
-    ],
-    expose_headers=["*"],
-    max_age=3600,
-)
-# Initialize conversation router
-conversation_router = ConversationRouter()
-
-@app.get("/")
-async def root():
-    return {"message": "VMC WhatsApp Chatbot API is running"}
-
-async def send_response(to: str, response):
-    """Send appropriate response type based on response structure"""
-    if isinstance(response, dict):
-        response_type = response.get("type", "text")
-        footer = response.get("footer")
-        
-        if response_type == "buttons":
-            await whatsapp_service.send_button_message(
-                to,
-                response["body"],
-                response["buttons"],
-                footer=footer
-            )
-        elif response_type == "list":
-            await whatsapp_service.send_list_message(
-                to,
-                response["body"],
-                response["list_button"],
-                response["sections"],
-                footer=footer
-            )
-        else:
-            # Fallback to text
-            await whatsapp_service.send_text_message(to, response.get("body", str(response)))
-    else:
-        # Plain text response
-        await whatsapp_service.send_text_message(to, str(response))
-
-@app.get("/webhook")
-async def verify_webhook(
-    hub_mode: str = Query(None, alias="hub.mode"),
-    hub_challenge: str = Query(None, alias="hub.challenge"),
-    hub_verify_token: str = Query(None, alias="hub.verify_token"),
-):
-    """
-    WhatsApp Webhook Verification (GET)
-    """
-    if hub_mode == "subscribe" and hub_verify_token == settings.VERIFY_TOKEN:
-        logger.info("Webhook verified successfully!")
-        return int(hub_challenge)
-    
-    logger.warning("Webhook verification failed!")
-    raise HTTPException(status_code=403, detail="Verification token mismatch")
-
-@app.post("/webhook")
-async def handle_whatsapp_message(request: Request):
-    """
-    Handle incoming WhatsApp messages (POST)
-    """
-    payload = await request.json()
-    logger.info(f"Received WHATSAPP payload: {payload}")
-    
-    try:
-        # Extract message data
-        if payload.get("entry") and payload["entry"][0].get("changes"):
-            change = payload["entry"][0]["changes"][0]
-            value = change.get("value", {})
-            
-            # Handle messages
-            if value.get("messages"):
-                message_data = value["messages"][0]
-                from_number = message_data["from"]
-                message_type = message_data.get("type")
-                
-                # Handle text messages
-                if message_type == "text":
-                    message_text = message_data["text"]["body"]
-                    logger.info(f"Processing text message from {from_number}: {message_text}")
-                    
-                    # Process message through conversation router
-                    response = conversation_router.process_message(from_number, message_text)
-                    
-                    # Send appropriate response type
-                    await send_response(from_number, response)
-                
-                # Handle interactive button/list responses
-                elif message_type == "interactive":
-                    interactive_data = message_data["interactive"]
-                    interactive_type = interactive_data["type"]
-                    
-                    if interactive_type == "button_reply":
-                        button_id = interactive_data["button_reply"]["id"]
-                        logger.info(f"Processing button reply from {from_number}: {button_id}")
-                        response = conversation_router.process_message(from_number, button_id)
-                    elif interactive_type == "list_reply":
-                        list_id = interactive_data["list_reply"]["id"]
-                        logger.info(f"Processing list reply from {from_number}: {list_id}")
-                        response = conversation_router.process_message(from_number, list_id)
-                    else:
-                        logger.warning(f"Unknown interactive type: {interactive_type}")
-                        response = "Please select a valid option."
-                    
-                    # Send appropriate response type
-                    await send_response(from_number, response)
-                
-                # Handle image messages
-                elif message_type == "image":
-                    image_id = message_data["image"]["id"]
-                    logger.info(f"Received image ID: {image_id}")
-                    
-                    # 1. Get media URL from Meta
-                    media_url = await whatsapp_service.get_media_url(image_id)
-                    if media_url:
-                        # 2. Download and save locally
-                        filename = f"{image_id}.jpg"
-                        save_path = os.path.join(settings.UPLOAD_DIR, filename)
-                        success = await whatsapp_service.download_media(media_url, save_path)
-                        
-                        if success:
-                            # Use local URL for processing
-                            local_url = f"/uploads/{filename}"
-                            response = conversation_router.process_message(from_number, "", image_url=local_url)
-                            await send_response(from_number, response)
-                        else:
-                            await whatsapp_service.send_text_message(from_number, "Error processing image. Please try again.")
-                    else:
-                        await whatsapp_service.send_text_message(from_number, "Could not retrieve image from WhatsApp.")
-
-                # Handle location messages
-                elif message_type == "location":
-                    location_data = {
-                        "latitude": message_data["location"]["latitude"],
-                        "longitude": message_data["location"]["longitude"]
-                    }
-                    logger.info(f"Processing location from {from_number}: {location_data}")
-                    
-                    # Process location through conversation router
-                    response = conversation_router.process_message(from_number, "", location=location_data)
-                    
-                    # Send response
-                    await send_response(from_number, response)
-                
-                else:
-                    logger.info(f"Unsupported message type: {message_type}")
-                    await whatsapp_service.send_text_message(
-                        from_number, 
-                        "Please send a text message, image, or location."
-                    )
-            
-            # Handle status updates (delivered, read, etc.)
-            elif value.get("statuses"):
-                status = value["statuses"][0]
-                logger.info(f"Message status update: {status}")
-        
-    except Exception as e:
-        logger.error(f"Error processing webhook: {e}", exc_info=True)
-        # Return 200 to WhatsApp to avoid retries
-        return {"status": "error", "detail": str(e)}
-
-    return {"status": "success"}
-
-@app.get("/api/property-tax/pdf/{property_id}")
-async def get_property_tax_pdf(property_id: str):
-    """Generate and return property tax PDF"""
-    db = SessionLocal()
-    try:
-        tax_record = db.query(PropertyTax).filter(
-            PropertyTax.property_id == property_id.upper()
-        ).first()
-        
-        if not tax_record:
-            raise HTTPException(status_code=404, detail="Property not found")
-        
-        pdf_path = generate_property_tax_pdf(tax_record)
-        return FileResponse(
-            pdf_path,
-            media_type="application/pdf",
-            filename=f"property_tax_{property_id}.pdf"
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error generating PDF: {e}")
-        raise HTTPException(status_code=500, detail="Error generating PDF")
-    finally:
-        db.close()
-
-@app.get("/api/complaints")
-async def get_complaints():
-    """Get all complaints with user details joined"""
-    db = SessionLocal()
-    try:
-        results = db.query(Complaint, User).join(User, Complaint.user_id == User.id).all()
-        
-        complaints_with_users = []
-        for complaint, user in results:
-            complaint_data = {
-                "id": complaint.id,
-                "complaint_id": complaint.complaint_id,
-                "user_id": complaint.user_id,
-                "login_id": complaint.login_id,
-                "category": complaint.category,
-                "sub_issue": complaint.sub_issue,
-                "description": complaint.description,
-                "image_url": complaint.image_url,
-                "latitude": complaint.latitude,
-                "longitude": complaint.longitude,
-                "status": complaint.status,
-                "created_at": complaint.created_at,
-                "user_name": user.name,
-                "user_mobile": user.mobile,
-                "user_area": user.area,
-                "user_ward": user.ward_number
-            }
-            complaints_with_users.append(complaint_data)
-        return complaints_with_users
-    finally:
-        db.close()
-
-@app.patch("/api/complaints/{complaint_id}/status")
-async def update_complaint_status(complaint_id: str, status: str):
-    """Update complaint status"""
-    logger.info(f"Updating complaint {complaint_id} status to {status}")
-    db = SessionLocal()
-    try:
-        complaint = db.query(Complaint).filter(Complaint.complaint_id == complaint_id.strip()).first()
-        if not complaint:
-            logger.error(f"Complaint {complaint_id} not found")
-            raise HTTPException(status_code=404, detail="Complaint not found")
-        
-        # Match enum Case
-        new_status = status.lower()
-        if new_status == "completed":
-            complaint.status = ComplaintStatus.RESOLVED
-        else:
-            complaint.status = ComplaintStatus.PENDING
-            
-        complaint.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(complaint)
-        logger.info(f"Successfully updated complaint {complaint_id} to {complaint.status}")
-        return {"message": "Status updated successfully", "status": complaint.status}
-    except Exception as e:
-        logger.error(f"Error updating status for {complaint_id}: {e}")
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
-
-@app.get("/api/properties")
-async def get_properties():
-    """Get all property tax records"""
-    db = SessionLocal()
-    try:
-        properties = db.query(PropertyTax).all()
-        return properties
-    finally:
-        db.close()
-
-# Custom 404 handler
-@app.exception_handler(StarletteHTTPException)
-async def not_found_handler(request: Request, exc: StarletteHTTPException):
-    if exc.status_code != 404:
-        raise exc
-    
-    return JSONResponse(
-        status_code=404,
-        content={
-            "detail": f"Invalid endpoint: {request.url.path}",
-            "error": "Not Found",
-            "valid_endpoints": [
-                "/",
-                "/webhook (GET for verification, POST for messages)",
-                "/api/complaints",
-                "/api/properties",
-                "/api/property-tax/pdf/{property_id}",
-                "/docs",
-                "/redoc"
-            ]
-        }
-    )
-
-if __name__ == "__main__":
-    import uvicorn
-    # uvicorn app.main:app --host 0.0.0.0 --port $PORT
-    port = int(os.getenv("PORT", settings.PORT))
-    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=settings.DEBUG)
-
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, APIRouter, Request, HTTPException, Query, UploadFile, File
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.exception_handlers import http_exception_handler
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from app.core.config import settings
+from app.db.database import create_db_and_tables, seed_data, ReadSessionLocal, SessionLocal
+from app.db.routing import has_replica
+from app.db.models import PropertyTax, Complaint, User, ComplaintStatus, TaxStatus
+from app.services.whatsapp import whatsapp_service
+from app.services.conversation_router import ConversationRouter
+from app.services.pdf_service import pdf_cache_stats, receipt_fields
+from app.services.pdf_render_pool import PdfRenderBusy, PdfRenderTimeout, pdf_render_pool
+from app.services.receipt_validators import is_not_modified, validator_index, validators_for
+from app.services.complaint_stats import complaint_stats, rebuild as rebuild_complaint_stats
+from app.services.complaint_status import (
+    apply_status_updates, MAX_BULK_STATUS_UPDATES,
+    UPDATED as STATUS_UPDATED, NOT_FOUND as STATUS_NOT_FOUND, INVALID_STATUS as STATUS_INVALID
+)
+from app.services.complaint_listing import list_complaints, parse_fields, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.complaint_export import export_complaints, FORMATS as EXPORT_FORMATS
+from app.services.complaint_search import search_complaints, DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from app.services.complaint_archive import archive_metrics, run_archival, table_sizes
+from app.services.property_import import import_property_file
+from app.services.notification_outbox import outbox_metrics, outbox_relay, outbox_status
+from app.services.translations import CatalogError, reload_catalog
+from app.services.language_detection import language_detector
+from app.services.receipt_batch import FORMATS as RECEIPT_FORMATS, batch_jobs, iter_receipts, select_receipts, start_job
+from app.api import complaints as complaints_api, queries as queries_api, tax as tax_api, user as user_api
+from app.api.common import page_responses, response_cache
+from app.core.memory import memory
+from app.core.serialization import FastJSONResponse, page_body
+from app.api.complaints import ComplaintOut
+from app.api.tax import TAX_FIELDS, PropertyTaxOut
+from app.services.complaint_feed import FeedFull, complaint_feed
+from typing import List, Optional
+import logging
+import os
+import time
+from datetime import datetime
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_backend_ready = False
+
+def init_backend():
+    """
+    One-time backend initialization: schema, seed data and storage directories.
+    Idempotent, so a gunicorn --preload master can run it before forking and
+    the workers' lifespan then skips it.
+    """
+    global _backend_ready
+    if _backend_ready:
+        return
+    create_db_and_tables()
+    seed_data()
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    os.makedirs(settings.PDF_DIR, exist_ok=True)
+    _backend_ready = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the backend and per-worker HTTP clients on startup, release them on shutdown"""
+    started = time.perf_counter()
+    init_backend()
+    await whatsapp_service.start()
+    language_detector.start()
+    memory.start()
+    complaint_feed.start()
+    if settings.OUTBOX_RELAY_ENABLED:
+        outbox_relay.start()
+    if has_replica():
+        logger.info("Dashboard and tracking reads are routed to the read replica")
+    logger.info(f"Startup completed in {(time.perf_counter() - started) * 1000:.1f} ms")
+    yield
+    await complaint_feed.stop()
+    await outbox_relay.stop()
+    await whatsapp_service.close()
+    memory.stop()
+    pdf_render_pool.shutdown()
+
+def get_cors_origins() -> list:
+    """Parse CORS origins from settings"""
+    cors_origins = [origin.strip() for origin in settings.CORS_ORIGINS.split(",")] if settings.CORS_ORIGINS else ["*"]
+
+    # Add frontend URL if specified
+    if settings.FRONTEND_URL and settings.FRONTEND_URL not in cors_origins:
+        cors_origins.append(settings.FRONTEND_URL)
+
+    # Ensure Netlify frontend is allowed
+    netlify_frontend = "https://vmcbot.netlify.app"
+    if netlify_frontend not in cors_origins:
+        cors_origins.append(netlify_frontend)
+    return cors_origins
+
+router = APIRouter()
+
+# Initialize conversation router
+conversation_router = ConversationRouter()
+
+@router.get("/")
+async def root():
+    return {"message": "VMC WhatsApp Chatbot API is running"}
+
+async def send_receipt_document(to: str, response: dict):
+    """Send a receipt as a WhatsApp document captioned with the reply; plain text if that fails"""
+    try:
+        pdf_path = await pdf_render_pool.render(response["receipt"])
+        sent = await whatsapp_service.send_file_document(
+            to, pdf_path, filename=response["filename"], caption=response["body"]
+        )
+    except Exception as e:
+        logger.error(f"Error sending receipt document to {to}: {e}")
+        sent = None
+    if sent is None:
+        await whatsapp_service.send_text_message(to, f"{response['body']}\n\n{response['fallback']}")
+
+async def send_response(to: str, response):
+    """Send appropriate response type based on response structure"""
+    if isinstance(response, dict):
+        response_type = response.get("type", "text")
+        footer = response.get("footer")
+        
+        if response_type == "buttons":
+            await whatsapp_service.send_button_message(
+                to,
+                response["body"],
+                response["buttons"],
+                footer=footer
+            )
+        elif response_type == "list":
+            await whatsapp_service.send_list_message(
+                to,
+                response["body"],
+                response["list_button"],
+                response["sections"],
+                footer=footer
+            )
+        elif response_type == "document":
+            await send_receipt_document(to, response)
+        else:
+            # Fallback to text
+            await whatsapp_service.send_text_message(to, response.get("body", str(response)))
+    else:
+        # Plain text response
+        await whatsapp_service.send_text_message(to, str(response))
+
+@router.get("/webhook")
+async def verify_webhook(
+    hub_mode: str = Query(None, alias="hub.mode"),
+    hub_challenge: str = Query(None, alias="hub.challenge"),
+    hub_verify_token: str = Query(None, alias="hub.verify_token"),
+):
+    """
+    WhatsApp Webhook Verification (GET)
+    """
+    if hub_mode == "subscribe" and hub_verify_token == settings.VERIFY_TOKEN:
+        logger.info("Webhook verified successfully!")
+        return int(hub_challenge)
+    
+    logger.warning("Webhook verification failed!")
+    raise HTTPException(status_code=403, detail="Verification token mismatch")
+
+@router.post("/webhook")
+async def handle_whatsapp_message(request: Request):
+    """
+    Handle incoming WhatsApp messages (POST)
+    """
+    payload = await request.json()
+    logger.info(f"Received WHATSAPP payload: {payload}")
+    
+    try:
+        # Extract message data
+        if payload.get("entry") and payload["entry"][0].get("changes"):
+            change = payload["entry"][0]["changes"][0]
+            value = change.get("value", {})
+            
+            # Handle messages
+            if value.get("messages"):
+                message_data = value["messages"][0]
+                from_number = message_data["from"]
+                message_type = message_data.get("type")
+                
+                # Handle text messages
+                if message_type == "text":
+                    message_text = message_data["text"]["body"]
+                    logger.info(f"Processing text message from {from_number}: {message_text}")
+                    
+                    # Process message through conversation router
+                    response = conversation_router.process_message(from_number, message_text)
+                    
+                    # Send appropriate response type
+                    await send_response(from_number, response)
+                
+                # Handle interactive button/list responses
+                elif message_type == "interactive":
+                    interactive_data = message_data["interactive"]
+                    interactive_type = interactive_data["type"]
+                    
+                    if interactive_type == "button_reply":
+                        button_id = interactive_data["button_reply"]["id"]
+                        logger.info(f"Processing button reply from {from_number}: {button_id}")
+                        response = conversation_router.process_message(from_number, button_id)
+                    elif interactive_type == "list_reply":
+                        list_id = interactive_data["list_reply"]["id"]
+                        logger.info(f"Processing list reply from {from_number}: {list_id}")
+                        response = conversation_router.process_message(from_number, list_id)
+                    else:
+                        logger.warning(f"Unknown interactive type: {interactive_type}")
+                        response = "Please select a valid option."
+                    
+                    # Send appropriate response type
+                    await send_response(from_number, response)
+                
+                # Handle image messages
+                elif message_type == "image":
+                    image_id = message_data["image"]["id"]
+                    logger.info(f"Received image ID: {image_id}")
+                    
+                    # 1. Get media URL from Meta
+                    media_url = await whatsapp_service.get_media_url(image_id)
+                    if media_url:
+                        # 2. Download and save locally
+                        filename = f"{image_id}.jpg"
+                        save_path = os.path.join(settings.UPLOAD_DIR, filename)
+                        success = await whatsapp_service.download_media(media_url, save_path)
+                        
+                        if success:
+                            # Use local URL for processing
+                            local_url = f"/uploads/{filename}"
+                            response = conversation_router.process_message(from_number, "", image_url=local_url)
+                            await send_response(from_number, response)
+                        else:
+                            await whatsapp_service.send_text_message(from_number, "Error processing image. Please try again.")
+                    else:
+                        await whatsapp_service.send_text_message(from_number, "Could not retrieve image from WhatsApp.")
+
+                # Handle location messages
+                elif message_type == "location":
+                    location_data = {
+                        "latitude": message_data["location"]["latitude"],
+                        "longitude": message_data["location"]["longitude"]
+                    }
+                    logger.info(f"Processing location from {from_number}: {location_data}")
+                    
+                    # Process location through conversation router
+                    response = conversation_router.process_message(from_number, "", location=location_data)
+                    
+                    # Send response
+                    await send_response(from_number, response)
+                
+                else:
+                    logger.info(f"Unsupported message type: {message_type}")
+                    await whatsapp_service.send_text_message(
+                        from_number, 
+                        "Please send a text message, image, or location."
+                    )
+            
+            # Handle status updates (delivered, read, etc.)
+            elif value.get("statuses"):
+                status = value["statuses"][0]
+                logger.info(f"Message status update: {status}")
+        
+    except Exception as e:
+        logger.error(f"Error processing webhook: {e}", exc_info=True)
+        # Return 200 to WhatsApp to avoid retries
+        return {"status": "error", "detail": str(e)}
+
+    return {"status": "success"}
+
+@router.get("/api/property-tax/pdf/{property_id}")
+async def get_property_tax_pdf(property_id: str, request: Request):
+    """Return the property tax PDF, rendering it off the event loop if it is not cached; supports conditional GET"""
+    property_id = property_id.upper()
+    known = validator_index.get(property_id)
+    if known is not None and is_not_modified(request.headers, known):
+        validator_index.metrics["not_modified_without_db"] += 1
+        return Response(status_code=304, headers=known.headers())
+
+    db = ReadSessionLocal()
+    try:
+        tax_record = db.query(PropertyTax).filter(
+            PropertyTax.property_id == property_id
+        ).first()
+        
+        if not tax_record:
+            raise HTTPException(status_code=404, detail="Property not found")
+        fields = receipt_fields(tax_record)
+        validators = validators_for(fields, tax_record.updated_at or tax_record.created_at)
+    finally:
+        db.close()
+
+    validator_index.remember(property_id, validators)
+    if is_not_modified(request.headers, validators):
+        validator_index.metrics["not_modified"] += 1
+        return Response(status_code=304, headers=validators.headers())
+
+    try:
+        pdf_path = await pdf_render_pool.render(fields)
+    except (PdfRenderBusy, PdfRenderTimeout) as e:
+        logger.warning(f"PDF for {property_id} not ready: {e}")
+        raise HTTPException(status_code=503, detail="PDF is being generated, please retry", headers={"Retry-After": "2"})
+    except Exception as e:
+        logger.error(f"Error generating PDF: {e}")
+        raise HTTPException(status_code=500, detail="Error generating PDF")
+    validator_index.metrics["full"] += 1
+    return FileResponse(
+        pdf_path,
+        media_type="application/pdf",
+        filename=f"property_tax_{property_id}.pdf",
+        headers=validators.headers()
+    )
+
+@router.get("/api/complaints", responses=page_responses(ComplaintOut))
+async def get_complaints(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    status: Optional[ComplaintStatus] = None,
+    category: Optional[str] = None,
+    sub_issue: Optional[str] = None,
+    ward: Optional[str] = Query(None, description="Ward as stored on the user, e.g. 'Ward 10'"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of fields to return"),
+    layout: str = Query("rows", pattern="^(rows|columns)$", description="columns: one array per field"),
+):
+    """Get one page of complaints with user details joined, newest first (keyset pagination)"""
+    db = ReadSessionLocal()
+    try:
+        page = list_complaints(
+            db,
+            fields=fields,
+            cursor=cursor,
+            limit=limit,
+            status=status,
+            category=category,
+            sub_issue=sub_issue,
+            ward=ward,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        return Response(page_body(page, layout, parse_fields(fields)), media_type="application/json")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        db.close()
+
+@router.get("/api/complaints/export")
+async def export_all_complaints(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = Query(None, description="Only complaints updated at or after this watermark"),
+    gzip: bool = False,
+):
+    """Stream every complaint with user fields as NDJSON or CSV, optionally gzipped"""
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"complaints.{extension}"
+    if gzip:
+        media_type, filename = "application/gzip", filename + ".gz"
+    return StreamingResponse(
+        export_complaints(format, since=since, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/api/complaints/feed")
+async def complaint_feed_stream(
+    request: Request,
+    ward: Optional[str] = Query(None, description="Only this ward, e.g. 10 or 'Ward 10'"),
+    category: Optional[str] = None,
+    last_event_id: Optional[str] = Query(None, description="Resume after this event (else the Last-Event-ID header)"),
+):
+    """Server-Sent Events stream of complaint_created / complaint_status_changed events as they happen"""
+    try:
+        stream = complaint_feed.stream(
+            last_event_id or request.headers.get("last-event-id"), ward=ward, category=category
+        )
+    except FeedFull as e:
+        logger.warning(f"Complaint feed client rejected: {e}")
+        raise HTTPException(status_code=503, detail="Too many live feed clients", headers={"Retry-After": "10"})
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/api/complaints/search")
+def search_all_complaints(
+    q: str = Query(..., min_length=2, max_length=200, description="Words to find, English or romanized Hindi/Gujarati"),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    offset: int = Query(0, ge=0, le=10_000),
+    status: Optional[ComplaintStatus] = None,
+    category: Optional[str] = None,
+    sub_issue: Optional[str] = None,
+    ward: Optional[str] = Query(None, description="Ward as stored on the user, e.g. 'Ward 10'"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_archived: bool = True,
+):
+    """Full-text search over complaint sub-issues and descriptions, best matches first (runs in the threadpool)"""
+    db = ReadSessionLocal()
+    try:
+        return FastJSONResponse(search_complaints(
+            db,
+            q,
+            limit=limit,
+            offset=offset,
+            status=status,
+            category=category,
+            sub_issue=sub_issue,
+            ward=ward,
+            created_from=created_from,
+            created_to=created_to,
+            include_archived=include_archived,
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        db.close()
+
+class StatusUpdate(BaseModel):
+    complaint_id: str
+    status: str = Field(..., description="pending, in_progress or resolved ('completed' is accepted for resolved)")
+
+class BulkStatusUpdate(BaseModel):
+    updates: List[StatusUpdate] = Field(..., min_length=1, max_length=MAX_BULK_STATUS_UPDATES)
+
+@router.patch("/api/complaints/status")
+def bulk_update_complaint_status(body: BulkStatusUpdate):
+    """Update the status of many complaints in one transaction (runs in the threadpool); returns a result per complaint ID"""
+    logger.info(f"Bulk status update of {len(body.updates)} complaints")
+    try:
+        results = apply_status_updates([(update.complaint_id, update.status) for update in body.updates])
+    except Exception as e:
+        logger.error(f"Error applying bulk status update: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "updated": sum(1 for result in results if result["result"] == STATUS_UPDATED),
+        "results": results
+    }
+
+@router.patch("/api/complaints/{complaint_id}/status")
+def update_complaint_status(complaint_id: str, status: str):
+    """Update complaint status (runs in the threadpool)"""
+    logger.info(f"Updating complaint {complaint_id} status to {status}")
+    try:
+        result = apply_status_updates([(complaint_id, status)])[0]
+    except Exception as e:
+        logger.error(f"Error updating status for {complaint_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if result["result"] == STATUS_INVALID:
+        raise HTTPException(status_code=400, detail=result["error"])
+    if result["result"] == STATUS_NOT_FOUND:
+        logger.error(f"Complaint {complaint_id} not found")
+        raise HTTPException(status_code=404, detail="Complaint not found")
+    
+    logger.info(f"Successfully updated complaint {complaint_id} to {result['status']}")
+    return {"message": "Status updated successfully", "status": result["status"]}
+
+@router.get("/api/stats")
+def get_stats():
+    """Complaint counts by status, category, ward, sub-issue and day for the dashboard (runs in the threadpool, as a stale snapshot is reloaded inline)"""
+    if complaint_stats.is_stale():
+        db = ReadSessionLocal()
+        try:
+            complaint_stats.load(db)
+        finally:
+            db.close()
+    return complaint_stats.snapshot()
+
+@router.post("/api/stats/rebuild")
+def rebuild_stats():
+    """Recompute the dashboard counters from the complaints table (runs in the threadpool)"""
+    db = SessionLocal()
+    try:
+        rows = rebuild_complaint_stats(db)
+        db.commit()
+        complaint_stats.load(db)
+        return {"message": "Stats rebuilt", "rows": rows}
+    except Exception as e:
+        logger.error(f"Error rebuilding stats: {e}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        db.close()
+
+@router.post("/api/admin/archive")
+def archive_resolved_complaints(
+    older_than_days: int = Query(settings.ARCHIVE_AFTER_DAYS, ge=0),
+    max_batches: Optional[int] = Query(None, ge=1),
+):
+    """Move complaints resolved more than older_than_days ago into the archive table (runs in the threadpool)"""
+    try:
+        return run_archival(older_than_days=older_than_days, max_batches=max_batches)
+    except Exception as e:
+        logger.error(f"Error archiving complaints: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/api/admin/archive/metrics")
+async def get_archive_metrics():
+    """Rows moved by archival runs in this process and the current hot/archive table sizes"""
+    db = ReadSessionLocal()
+    try:
+        return {**archive_metrics, **table_sizes(db)}
+    finally:
+        db.close()
+
+@router.get("/api/admin/pdf-cache/metrics")
+async def get_pdf_cache_metrics():
+    """Receipt PDF cache hits, misses, render time and evictions, render pool state, conditional GETs, and PDF_DIR usage"""
+    return {**pdf_cache_stats(), "render_pool": pdf_render_pool.stats(), "etags": validator_index.stats()}
+
+@router.get("/api/admin/receipts/batch")
+def generate_receipt_batch(
+    ward: Optional[str] = Query(None, description="Ward number or name, e.g. 10 or 'Ward 10'"),
+    year: Optional[int] = None,
+    status: Optional[TaxStatus] = None,
+    format: str = Query("zip", pattern="^(zip|pdf)$"),
+):
+    """Stream the receipts of the matching properties as a zip of PDFs or one merged PDF; progress via X-Batch-Job-Id (runs in the threadpool)"""
+    db = ReadSessionLocal()
+    try:
+        receipts = select_receipts(db, ward=ward, year=year, status=status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        db.close()
+    if not receipts:
+        raise HTTPException(status_code=404, detail="No properties match the filter")
+
+    filters = {"ward": ward, "year": year, "status": status.value if status else None}
+    job = start_job(len(receipts), format, filters)
+    logger.info(f"Receipt batch {job.job_id}: {len(receipts)} receipts as {format} for {filters}")
+    media_type, extension = RECEIPT_FORMATS[format]
+    return StreamingResponse(
+        iter_receipts(format, receipts, job),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=receipts_{job.job_id}.{extension}",
+            "X-Batch-Job-Id": job.job_id,
+        }
+    )
+
+@router.get("/api/admin/receipts/batch/{job_id}")
+async def get_receipt_batch_progress(job_id: str):
+    """Progress of a receipt batch: receipts rendered, served from cache or failed, and receipts per second"""
+    job = batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return job.as_dict()
+
+@router.get("/api/admin/outbox/metrics")
+async def get_outbox_metrics():
+    """Notification relay throughput and lag in this process, plus the outbox backlog"""
+    db = SessionLocal()
+    try:
+        return {**outbox_metrics, **outbox_status(db)}
+    finally:
+        db.close()
+
+@router.post("/api/admin/translations/reload")
+async def reload_translations():
+    """Re-read the message catalog from LOCALES_DIR in this worker; an invalid catalog is rejected and the old one kept"""
+    try:
+        return reload_catalog()
+    except CatalogError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/api/admin/property-tax/import")
+def import_property_tax(file: UploadFile = File(..., description="Property tax roll as .csv or .xlsx")):
+    """Insert or update property tax records from an uploaded roll (runs in the threadpool); returns throughput and rejected rows"""
+    logger.info(f"Importing property tax roll {file.filename}")
+    try:
+        report = import_property_file(file.file, file.filename or "")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing property tax roll: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return report.as_dict()
+
+@router.get("/api/admin/cache/metrics")
+async def get_admin_cache_metrics():
+    """Hits, misses and invalidations of the cached /api/admin list pages in this worker"""
+    return response_cache.stats()
+
+@router.get("/api/admin/feed/metrics")
+async def get_complaint_feed_metrics():
+    """Live feed clients connected to this worker, events tailed/sent, skipped id gaps, resumes and resets"""
+    return complaint_feed.stats()
+
+@router.get("/api/admin/chat-memory/metrics")
+async def get_chat_memory_metrics():
+    """Chat sessions held in this worker, messages recorded, transcript lines flushed or pending, and sessions expired"""
+    return memory.stats()
+
+@router.get("/api/properties", deprecated=True, response_model=List[PropertyTaxOut])
+async def get_properties():
+    """Get all property tax records (unbounded; use the paginated /api/admin/tax)"""
+    db = ReadSessionLocal()
+    try:
+        rows = db.execute(select(*(column.label(name) for name, column in TAX_FIELDS.items()))).all()
+        return FastJSONResponse(
+            [dict(row._mapping) for row in rows],
+            headers={"Deprecation": "true", "Link": '</api/admin/tax>; rel="successor-version"'}
+        )
+    finally:
+        db.close()
+
+# Custom 404 handler
+async def not_found_handler(request: Request, exc: StarletteHTTPException):
+    if exc.status_code != 404:
+        return await http_exception_handler(request, exc)
+    
+    return JSONResponse(
+        status_code=404,
+        content={
+            "detail": f"Invalid endpoint: {request.url.path}",
+            "error": "Not Found",
+            "valid_endpoints": [
+                "/",
+                "/webhook (GET for verification, POST for messages)",
+                "/api/complaints",
+                "/api/complaints/search?q=...",
+                "/api/stats",
+                "/api/admin/complaints",
+                "/api/admin/tax",
+                "/api/admin/queries",
+                "/api/property-tax/pdf/{property_id}",
+                "/docs",
+                "/redoc"
+            ]
+        }
+    )
+
+def create_app() -> FastAPI:
+    """Build the FastAPI application; no database or filesystem work happens until startup"""
+    app = FastAPI(title="VMC WhatsApp Chatbot API", lifespan=lifespan)
+
+    # Mount static directories (created on startup)
+    app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR, check_dir=False), name="uploads")
+    app.mount("/pdfs", StaticFiles(directory=settings.PDF_DIR, check_dir=False), name="pdfs")
+
+    # Enable CORS for frontend
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=get_cors_origins(),
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+        allow_headers=[
+            "Accept",
+            "Accept-Language",
+            "Content-Language",
+            "Content-Type",
+            "Authorization",
+            "X-Requested-With",
+            "Origin",
+            "Access-Control-Request-Method",
+            "Access-Control-Request-Headers",
+        ],
+        expose_headers=["*"],
+        max_age=3600,
+    )
+
+    app.include_router(router)
+    for api in (complaints_api, tax_api, queries_api, user_api):
+        app.include_router(api.router, prefix="/api")
+    app.add_exception_handler(StarletteHTTPException, not_found_handler)
+    return app
+
+app = create_app()
+
+if __name__ == "__main__":
+    import uvicorn
+    # uvicorn app.main:app --host 0.0.0.0 --port $PORT
+    port = int(os.getenv("PORT", settings.PORT))
+    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=settings.DEBUG)
+
@@ -0,0 +1,124 @@
+"""
+Hot/cold archival of resolved complaints.
+
+Complaints resolved more than ``ARCHIVE_AFTER_DAYS`` ago are copied into
+``complaints_archive`` and deleted from ``complaints`` in small batches, each
+in its own short transaction, so the job can run while the bot is serving
+traffic. A complaint's ``updated_at`` is taken as its resolution time, since
+every status change sets it. The hot table then only holds open and recently
+resolved complaints; tracking falls through to the archive for older ones.
+"""
+
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, literal, select, text
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import ArchivedComplaint, Complaint, ComplaintStatus
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Columns copied as-is from complaints to complaints_archive
+ARCHIVED_COLUMNS: List[str] = [column.name for column in Complaint.__table__.columns]
+
+_metrics_lock = threading.Lock()
+archive_metrics: Dict = {
+    "runs": 0,
+    "rows_moved_total": 0,
+    "last_run_at": None,
+    "last_run_rows": 0,
+    "last_run_batches": 0,
+    "last_run_seconds": 0.0,
+}
+
+
+def archive_batch(db, cutoff: datetime, batch_size: int = settings.ARCHIVE_BATCH_SIZE) -> int:
+    """Move up to batch_size complaints resolved before cutoff; returns the number moved"""
+    candidates = (
+        select(Complaint.id)
+        .where(Complaint.status == ComplaintStatus.RESOLVED, Complaint.updated_at < cutoff)
+        .order_by(Complaint.updated_at, Complaint.id)
+        .limit(batch_size)
+    )
+    if db.get_bind().dialect.name in ("postgresql", "mysql"):
+        # Concurrent runners take disjoint batches instead of waiting on each other
+        candidates = candidates.with_for_update(skip_locked=True)
+    ids = db.execute(candidates).scalars().all()
+    if not ids:
+        return 0
+
+    now = datetime.utcnow()
+    db.execute(insert(ArchivedComplaint).from_select(
+        ARCHIVED_COLUMNS + ["archived_at"],
+        select(*[Complaint.__table__.c[name] for name in ARCHIVED_COLUMNS], literal(now))
+        .where(Complaint.id.in_(ids))
+    ))
+    db.execute(delete(Complaint).where(Complaint.id.in_(ids)).execution_options(synchronize_session=False))
+    db.commit()
+    return len(ids)
+
+
+def run_archival(older_than_days: int = settings.ARCHIVE_AFTER_DAYS, batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+                 max_batches: Optional[int] = None, pause_seconds: float = 0.0, session_factory=SessionLocal) -> Dict:
+    """Archive batch after batch until nothing old enough is left (or max_batches is reached)"""
+    started = time.perf_counter()
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved, batches = 0, 0
+    db = session_factory()
+    try:
+        while max_batches is None or batches < max_batches:
+            count = archive_batch(db, cutoff, batch_size)
+            if not count:
+                break
+            moved += count
+            batches += 1
+            logger.info(f"Archived batch {batches}: {count} complaints")
+            if count < batch_size:
+                break
+            if pause_seconds:
+                # Give the hot path room between batches
+                time.sleep(pause_seconds)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    with _metrics_lock:
+        archive_metrics["runs"] += 1
+        archive_metrics["rows_moved_total"] += moved
+        archive_metrics["last_run_at"] = datetime.utcnow().isoformat()
+        archive_metrics["last_run_rows"] = moved
+        archive_metrics["last_run_batches"] = batches
+        archive_metrics["last_run_seconds"] = round(elapsed, 3)
+    logger.info(f"Archived {moved} complaints resolved before {cutoff:%Y-%m-%d} in {elapsed:.1f}s")
+    return {"moved": moved, "batches": batches, "cutoff": cutoff.isoformat()}
+
+
+def _table_bytes(db, table: str) -> Optional[int]:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return db.execute(text("SELECT pg_total_relation_size(CAST(:t AS regclass))"), {"t": table}).scalar()
+    if dialect == "mysql":
+        return db.execute(text(
+            "SELECT data_length + index_length FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = :t"
+        ), {"t": table}).scalar()
+    return None
+
+
+def table_sizes(db) -> Dict:
+    """Row counts (and on-disk size where the database reports it) of the hot and archive tables"""
+    return {
+        "hot_rows": db.execute(select(func.count()).select_from(Complaint)).scalar(),
+        "hot_resolved_rows": db.execute(
+            select(func.count()).select_from(Complaint).where(Complaint.status == ComplaintStatus.RESOLVED)
+        ).scalar(),
+        "archive_rows": db.execute(select(func.count()).select_from(ArchivedComplaint)).scalar(),
+        "hot_bytes": _table_bytes(db, Complaint.__tablename__),
+        "archive_bytes": _table_bytes(db, ArchivedComplaint.__tablename__),
+    }
@@ -0,0 +1,383 @@
+"""
+Live feed of complaint creations and status changes for the dashboard (SSE).
+
+Every complaint creation or status change writes a ``complaint_events`` row in
+the same transaction (``record_events``), so the feed sees exactly the changes
+that committed, whichever gunicorn worker made them. Each worker runs one
+poller that tails the table by its autoincrement id, every
+``COMPLAINT_FEED_POLL_SECONDS`` and straight away after a change committed in
+that worker. New rows are turned into Server-Sent Events frames once and kept
+in a ring buffer of the last ``COMPLAINT_FEED_BUFFER`` events; connected
+clients read from that buffer and filter on ward/category, so one event costs
+one query per worker and a single wakeup however many dashboards are open.
+
+The row id is the SSE event ID, so it is the same on every worker. A client
+that reconnects with ``Last-Event-ID`` (to any worker, or after a restart)
+gets the events it missed while they are still buffered; otherwise it gets a
+``reset`` event and should reload its list from ``/api/complaints``.
+
+Ids can commit out of order (on PostgreSQL a transaction that took a lower id
+may commit after one that took a higher id), so a missing id is waited for
+until the rows after it are ``GAP_SECONDS`` old, then skipped.
+"""
+
+from typing import AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, select
+from app.core.config import settings
+from app.core.serialization import dumps
+from app.db.database import SessionLocal
+from app.db.models import ComplaintEvent
+from app.services.events import ComplaintCreated, ComplaintStatusChanged, event_bus
+from app.services.property_import import normalize_ward
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# A transaction holding a missing id gets this long to commit before the id is skipped
+GAP_SECONDS = 5
+PRUNE_EVERY_SECONDS = 3600
+
+_COLUMNS = (
+    ComplaintEvent.id, ComplaintEvent.event_type, ComplaintEvent.ward, ComplaintEvent.category,
+    ComplaintEvent.payload, ComplaintEvent.created_at,
+)
+
+
+class FeedFull(Exception):
+    """More dashboards are connected to this worker than COMPLAINT_FEED_MAX_CLIENTS"""
+
+
+class FeedEvent(NamedTuple):
+    seq: int
+    ward: Optional[str]
+    category: str
+    # Complete SSE frame, encoded once for every client
+    frame: bytes
+
+
+def _frame(event_id: int, event_type: str, data: bytes) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event_type.encode(), data)
+
+
+def _created_data(event: ComplaintCreated) -> Dict:
+    return {
+        "complaint_id": event.complaint_id,
+        "category": event.category,
+        "sub_issue": event.sub_issue,
+        "status": event.status.value,
+        "ward": event.ward,
+        "latitude": event.latitude,
+        "longitude": event.longitude,
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+def _status_data(event: ComplaintStatusChanged) -> Dict:
+    return {
+        "complaint_id": event.complaint_id,
+        "category": event.category,
+        "sub_issue": event.sub_issue,
+        "old_status": event.old_status.value,
+        "status": event.new_status.value,
+        "ward": event.ward,
+        "created_at": event.created_at.isoformat(),
+        "changed_at": event.changed_at.isoformat(),
+    }
+
+
+def event_row(event) -> Dict:
+    """complaint_events row for a ComplaintCreated or ComplaintStatusChanged"""
+    if isinstance(event, ComplaintCreated):
+        event_type, data = "complaint_created", _created_data(event)
+    else:
+        event_type, data = "complaint_status_changed", _status_data(event)
+    return {
+        "event_type": event_type,
+        "ward": normalize_ward(event.ward),
+        "category": event.category,
+        "payload": dumps(data).decode(),
+        "created_at": datetime.utcnow(),
+    }
+
+
+def record_events(db, events: Iterable):
+    """Queue feed events in the caller's transaction; every worker streams them once it commits"""
+    rows = [event_row(event) for event in events]
+    if rows:
+        db.execute(insert(ComplaintEvent), rows)
+
+
+class _Slot:
+    """A reserved client slot, given back once: when the stream ends, or when it is dropped unstarted"""
+
+    def __init__(self, feed: "ComplaintFeed"):
+        self._feed = feed
+
+    def release(self):
+        feed, self._feed = self._feed, None
+        if feed is not None:
+            feed.clients -= 1
+
+    __del__ = release
+
+
+class ComplaintFeed:
+    def __init__(self, session_factory=SessionLocal,
+                 buffer_size: int = settings.COMPLAINT_FEED_BUFFER,
+                 max_clients: int = settings.COMPLAINT_FEED_MAX_CLIENTS,
+                 keepalive_seconds: float = settings.COMPLAINT_FEED_KEEPALIVE_SECONDS,
+                 poll_seconds: float = settings.COMPLAINT_FEED_POLL_SECONDS,
+                 retention_hours: float = settings.COMPLAINT_FEED_RETENTION_HOURS):
+        self.session_factory = session_factory
+        self.buffer_size = buffer_size
+        self.max_clients = max_clients
+        self.keepalive_seconds = keepalive_seconds
+        self.poll_seconds = poll_seconds
+        self.retention_hours = retention_hours
+        self._buffer: "deque[FeedEvent]" = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        # Newest id taken from the table, and the newest id no longer (or never) buffered
+        self._last_seq = 0
+        self._floor = 0
+        self._loaded = False
+        self._pruned_at = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._poke: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.clients = 0
+        self.metrics = {"received": 0, "polls": 0, "gaps_skipped": 0, "sent": 0, "resumed": 0, "resets": 0, "rejected": 0}
+
+    def start(self):
+        """Load the newest events, bind to the running event loop and start tailing complaint_events"""
+        try:
+            self.load()
+        except Exception as e:
+            # Retried by the poller; streams opened meanwhile start at whatever it loads
+            logger.error(f"Complaint feed: loading complaint_events failed: {e}")
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._poke = asyncio.Event()
+        self._closed = False
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop tailing and end every open stream (e.g. on shutdown)"""
+        self._closed = True
+        if self._loop is not None:
+            self._notify()
+        self._loop = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def poke(self):
+        """Poll now rather than at the next interval (a change just committed); safe to call from any thread"""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._poke.set)
+
+    def _append(self, row):
+        """Buffer one row; the caller holds the lock"""
+        if len(self._buffer) == self.buffer_size:
+            self._floor = self._buffer[0].seq
+        self._buffer.append(FeedEvent(row.id, row.ward, row.category, _frame(row.id, row.event_type, row.payload.encode())))
+        self._last_seq = row.id
+        self.metrics["received"] += 1
+
+    def load(self):
+        """Buffer the newest buffer_size events, so clients that were connected elsewhere can resume here"""
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(*_COLUMNS).order_by(ComplaintEvent.id.desc()).limit(self.buffer_size)
+            ).all()
+        finally:
+            db.close()
+        rows = rows[::-1]
+        with self._lock:
+            self._buffer.clear()
+            for row in rows:
+                self._append(row)
+            # Anything before the oldest buffered row is gone
+            self._floor = rows[0].id - 1 if rows else 0
+            self._loaded = True
+
+    def poll(self) -> int:
+        """Buffer events committed since the last poll; returns how many were added"""
+        if not self._loaded:
+            self.load()
+            return len(self._buffer)
+        self.metrics["polls"] += 1
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(*_COLUMNS)
+                .where(ComplaintEvent.id > self._last_seq)
+                .order_by(ComplaintEvent.id)
+                .limit(self.buffer_size)
+            ).all()
+            self._prune(db)
+        finally:
+            db.close()
+
+        young = datetime.utcnow() - timedelta(seconds=GAP_SECONDS)
+        added = 0
+        with self._lock:
+            for row in rows:
+                if row.id != self._last_seq + 1 and self._last_seq:
+                    if row.created_at > young:
+                        # An earlier id may still be committing; read again from here next poll
+                        break
+                    self.metrics["gaps_skipped"] += 1
+                self._append(row)
+                added += 1
+        return added
+
+    def _prune(self, db):
+        """Delete events past the retention, at most once per PRUNE_EVERY_SECONDS per worker; the newest row is kept"""
+        now = time.monotonic()
+        if now - self._pruned_at < PRUNE_EVERY_SECONDS or not self._last_seq:
+            return
+        self._pruned_at = now
+        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        try:
+            db.execute(delete(ComplaintEvent).where(
+                ComplaintEvent.created_at < cutoff, ComplaintEvent.id < self._last_seq
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Complaint feed: pruning complaint_events failed: {e}")
+
+    async def run(self):
+        """Poll complaint_events back to back while full batches come in, otherwise every poll_seconds or when poked"""
+        while True:
+            try:
+                added = await asyncio.to_thread(self.poll)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Complaint feed poll error: {e}")
+                added = 0
+            if added:
+                self._notify()
+            if added >= self.buffer_size:
+                continue
+            # asyncio.wait rather than wait_for, which can swallow a cancellation that races the timeout
+            poked = asyncio.ensure_future(self._poke.wait())
+            try:
+                await asyncio.wait({poked}, timeout=self.poll_seconds)
+            finally:
+                poked.cancel()
+            self._poke.clear()
+
+    def _notify(self):
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        if wakeup is not None:
+            wakeup.set()
+
+    def resume_point(self, last_event_id: Optional[str]) -> Tuple[Optional[int], bool]:
+        """
+        Event ID to stream after (None: the newest, once the feed has loaded),
+        and whether the client has missed events it cannot get back
+        """
+        newest = self._last_seq if self._loaded else None
+        if not last_event_id:
+            return newest, False
+        if not last_event_id.isdigit() or int(last_event_id) < self._floor:
+            return newest, True
+        # May be ahead of this worker when another one polled first; those events are not sent twice
+        self.metrics["resumed"] += 1
+        return int(last_event_id), False
+
+    def events_after(self, seq: int) -> Tuple[List[FeedEvent], bool]:
+        """Buffered events after seq, and whether some were already dropped from the buffer"""
+        with self._lock:
+            if seq >= self._last_seq:
+                return [], False
+            newer = []
+            for event in reversed(self._buffer):
+                if event.seq <= seq:
+                    break
+                newer.append(event)
+            dropped = seq < self._floor
+        newer.reverse()
+        return newer, dropped
+
+    def _reset_frame(self) -> bytes:
+        self.metrics["resets"] += 1
+        return _frame(self._last_seq, "reset", dumps({"reload": "/api/complaints"}))
+
+    def stream(self, last_event_id: Optional[str] = None, ward: Optional[str] = None,
+               category: Optional[str] = None) -> AsyncIterator[bytes]:
+        """SSE frames for one client, filtered by ward/category; raises FeedFull before the first frame"""
+        if self.clients >= self.max_clients:
+            self.metrics["rejected"] += 1
+            raise FeedFull(f"{self.clients} feed clients connected")
+        # Reserved here, where the limit is checked, so concurrent connects cannot overshoot it
+        self.clients += 1
+        slot = _Slot(self)
+        seq, missed = self.resume_point(last_event_id)
+        return self._stream(slot, seq, missed, normalize_ward(ward), category)
+
+    async def _stream(self, slot: _Slot, seq: Optional[int], missed: bool, ward: Optional[str],
+                      category: Optional[str]) -> AsyncIterator[bytes]:
+        try:
+            yield f"retry: {settings.COMPLAINT_FEED_RETRY_MS}\n\n".encode()
+            if missed:
+                yield self._reset_frame()
+            while not self._closed:
+                # Take the wakeup before reading, so an event buffered in between is not slept through
+                wakeup = self._wakeup
+                if seq is None and self._loaded:
+                    # Connected before the feed had loaded: start from its newest event
+                    seq = self._last_seq
+                events, dropped = self.events_after(seq) if seq is not None else ([], False)
+                if dropped:
+                    yield self._reset_frame()
+                if events:
+                    seq = events[-1].seq
+                    for event in events:
+                        if (ward is None or event.ward == ward) and (category is None or event.category == category):
+                            self.metrics["sent"] += 1
+                            yield event.frame
+                    continue
+                if wakeup is None:
+                    await asyncio.sleep(self.keepalive_seconds)
+                    continue
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    # Comment line: keeps proxies from closing an idle connection
+                    yield b": keepalive\n\n"
+        finally:
+            slot.release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            buffered = len(self._buffer)
+        return {"clients": self.clients, "buffered": buffered, "last_event_id": self._last_seq, **self.metrics}
+
+
+complaint_feed = ComplaintFeed()
+
+
+def _on_complaint_changed(event):
+    # Committed in this worker: no need to wait for the next poll
+    complaint_feed.poke()
+
+
+event_bus.subscribe(ComplaintCreated, _on_complaint_changed)
+event_bus.subscribe(ComplaintStatusChanged, _on_complaint_changed)
@@ -0,0 +1,117 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from app.db.models import Complaint, ComplaintStatus, User
+import base64
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Output field name -> column, in the order returned by /api/complaints
+COMPLAINT_FIELDS = {
+    "id": Complaint.id,
+    "complaint_id": Complaint.complaint_id,
+    "user_id": Complaint.user_id,
+    "login_id": Complaint.login_id,
+    "category": Complaint.category,
+    "sub_issue": Complaint.sub_issue,
+    "description": Complaint.description,
+    "image_url": Complaint.image_url,
+    "latitude": Complaint.latitude,
+    "longitude": Complaint.longitude,
+    "status": Complaint.status,
+    "report_count": Complaint.report_count,
+    "created_at": Complaint.created_at,
+    "user_name": User.name,
+    "user_mobile": User.mobile,
+    "user_area": User.area,
+    "user_ward": User.ward_number,
+}
+USER_FIELDS = {"user_name", "user_mobile", "user_area", "user_ward"}
+
+
+def encode_cursor(created_at: datetime, complaint_pk: int) -> str:
+    """Opaque cursor for the position after (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{complaint_pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError on malformed input"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, complaint_pk = raw.split("|")
+        return datetime.fromisoformat(created_at), int(complaint_pk)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma-separated projection; None/empty means every field"""
+    if not fields:
+        return list(COMPLAINT_FIELDS)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in COMPLAINT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def build_complaints_query(
+    fields: List[str],
+    status: Optional[ComplaintStatus] = None,
+    category: Optional[str] = None,
+    sub_issue: Optional[str] = None,
+    ward: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+):
+    """
+    Keyset page of complaints, newest first, ordered on (created_at, id).
+    Fetches one extra row so the caller can tell whether another page exists.
+    """
+    # created_at and id are always selected to build the next cursor
+    columns = [COMPLAINT_FIELDS[name].label(name) for name in fields]
+    columns += [Complaint.created_at.label("_cursor_created_at"), Complaint.id.label("_cursor_id")]
+    query = select(*columns).select_from(Complaint)
+
+    if ward or USER_FIELDS.intersection(fields):
+        query = query.join(User, Complaint.user_id == User.id)
+    if status:
+        query = query.where(Complaint.status == status)
+    if category:
+        query = query.where(Complaint.category == category)
+    if sub_issue:
+        query = query.where(Complaint.sub_issue == sub_issue)
+    if ward:
+        query = query.where(User.ward_number == ward)
+    if created_from:
+        query = query.where(Complaint.created_at >= created_from)
+    if created_to:
+        query = query.where(Complaint.created_at < created_to)
+    if after:
+        query = query.where(tuple_(Complaint.created_at, Complaint.id) < tuple_(*after))
+
+    return query.order_by(Complaint.created_at.desc(), Complaint.id.desc()).limit(limit + 1)
+
+
+def list_complaints(db: Session, fields: Optional[str] = None, cursor: Optional[str] = None,
+                    limit: int = DEFAULT_PAGE_SIZE, **filters) -> Dict:
+    """Return {"items": [...], "next_cursor": str | None} for one page of complaints"""
+    names = parse_fields(fields)
+    after = decode_cursor(cursor) if cursor else None
+    rows = db.execute(build_complaints_query(names, after=after, limit=limit, **filters)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last._cursor_created_at, last._cursor_id)
+
+    return {
+        "items": [{name: row._mapping[name] for name in names} for row in rows],
+        "next_cursor": next_cursor,
+    }
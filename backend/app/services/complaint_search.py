@@ -0,0 +1,281 @@
+"""
+Full-text search over complaint sub-issues and descriptions.
+
+Each complaint stores a ``search_text`` column built from its category,
+sub-issue and description: the lower-cased words plus a folded spelling of
+each romanized word ("paani" -> "pani", "kachraa" -> "kachra"), so spelling
+variants of Hindi/Gujarati typed in Latin script meet in the index. Query
+words are folded the same way and expanded with a small civic vocabulary
+("bijli" also finds "electricity", "light", ...).
+
+The column is indexed per dialect (see migration 8):
+- PostgreSQL: GIN index on ``to_tsvector('english', search_text)``
+- SQLite: FTS5 external-content tables kept in sync by triggers
+- MySQL: FULLTEXT index
+
+Hot and archived complaints are both searched, ranked together.
+"""
+
+from typing import Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import column, event, false, func, inspect, literal_column, select, table, text, true, union_all, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.db.models import ArchivedComplaint, Complaint, ComplaintStatus, User
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+MAX_QUERY_TERMS = 8
+BACKFILL_BATCH_SIZE = 1000
+SEARCHABLE_TABLES = (Complaint, ArchivedComplaint)
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+LATIN_RE = re.compile(r"^[a-z0-9]+$")
+
+# Words that mean the same thing in English and romanized Hindi/Gujarati
+VARIANT_GROUPS = [
+    {"pani", "water", "jal", "nal", "tap"},
+    {"bijli", "bijali", "electricity", "power", "current", "light"},
+    {"light", "batti", "streetlight", "lamp"},
+    {"kachra", "kachro", "garbage", "waste", "trash", "dustbin"},
+    {"gatar", "gutter", "drain", "drainage", "nali", "sewer", "sewage"},
+    {"rasta", "rasto", "road", "sadak", "street"},
+    {"khada", "khado", "pothole", "gadda"},
+    {"spark", "sparking", "chingari", "tankha"},
+    {"school", "shala", "vidyalay"},
+    {"tree", "ped", "jhad", "zad"},
+    {"leak", "leakage", "tapakta"},
+    {"smell", "badbu", "durgandh", "gandh"},
+    {"mosquito", "machhar", "machar"},
+    {"dog", "kutta", "kutra", "kutro"},
+]
+
+
+def fold(word: str) -> str:
+    """Fold common romanization variants of a lower-case Latin word to one spelling"""
+    if not LATIN_RE.match(word):
+        return word
+    word = word.replace("ee", "i").replace("oo", "u").replace("w", "v").replace("ph", "f")
+    # Collapse doubled letters: paani -> pani, kachraa -> kachra
+    return re.sub(r"(.)\1+", r"\1", word)
+
+
+def _build_variants() -> Dict[str, set]:
+    variants: Dict[str, set] = {}
+    for group in VARIANT_GROUPS:
+        members = group | {fold(word) for word in group}
+        for word in members:
+            variants.setdefault(word, set()).update(members)
+    return variants
+
+
+VARIANTS = _build_variants()
+
+
+def words(text: Optional[str]) -> List[str]:
+    return WORD_RE.findall((text or "").lower().replace("_", " "))
+
+
+def build_search_text(category: Optional[str], sub_issue: Optional[str], description: Optional[str]) -> str:
+    """Indexed text for a complaint: its words followed by folded spellings not already present"""
+    tokens = words(category) + words(sub_issue) + words(description)
+    seen = set(tokens)
+    folded = []
+    for token in tokens:
+        variant = fold(token)
+        if variant not in seen:
+            seen.add(variant)
+            folded.append(variant)
+    return " ".join(tokens + folded)
+
+
+def query_terms(q: str) -> List[List[str]]:
+    """Each query word with its spelling variants and synonyms; every word must match"""
+    terms = []
+    for word in words(q)[:MAX_QUERY_TERMS]:
+        folded = fold(word)
+        alternatives = {word, folded} | VARIANTS.get(folded, set())
+        terms.append(sorted(alternatives))
+    return terms
+
+
+@event.listens_for(Complaint, "before_insert")
+@event.listens_for(Complaint, "before_update")
+def _set_search_text(mapper, connection, target: Complaint):
+    target.search_text = build_search_text(target.category, target.sub_issue, target.description)
+
+
+# --- Index maintenance (called from migration 8) ---------------------------
+
+def backfill_search_text(conn: Connection) -> int:
+    """Fill search_text for rows written before the column existed"""
+    filled = 0
+    for model in SEARCHABLE_TABLES:
+        while True:
+            rows = conn.execute(
+                select(model.id, model.category, model.sub_issue, model.description)
+                .where(model.search_text.is_(None))
+                .order_by(model.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                conn.execute(
+                    update(model.__table__).where(model.id == row.id)
+                    .values(search_text=build_search_text(row.category, row.sub_issue, row.description))
+                )
+            filled += len(rows)
+    return filled
+
+
+def _create_sqlite_fts(conn: Connection, name: str):
+    fts = f"{name}_fts"
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(search_text, content='{name}', "
+        f"content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')"
+    ))
+    # External-content FTS tables are kept in sync by triggers
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {name} BEGIN "
+        f"INSERT INTO {fts}(rowid, search_text) VALUES (new.id, new.search_text); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, search_text) VALUES ('delete', old.id, old.search_text); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF search_text ON {name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+        f"INSERT INTO {fts}(rowid, search_text) VALUES (new.id, new.search_text); END"
+    ))
+    conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def create_search_indexes(conn: Connection):
+    """Create the dialect's full-text index over search_text for complaints and the archive"""
+    dialect = conn.dialect.name
+    for model in SEARCHABLE_TABLES:
+        name = model.__tablename__
+        if dialect == "sqlite":
+            _create_sqlite_fts(conn, name)
+        elif dialect == "postgresql":
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{name}_search ON {name} "
+                f"USING GIN (to_tsvector('english', coalesce(search_text, '')))"
+            ))
+        elif dialect == "mysql":
+            if f"ix_{name}_search" not in {ix["name"] for ix in inspect(conn).get_indexes(name)}:
+                conn.execute(text(f"CREATE FULLTEXT INDEX ix_{name}_search ON {name} (search_text)"))
+        else:
+            continue
+        logger.info(f"Full-text index ready on {name}.search_text")
+
+
+# --- Dialect-specific match and rank ---------------------------------------
+
+def _sqlite_match(model, terms: List[List[str]]):
+    fts_name = f"{model.__tablename__}_fts"
+    fts = table(fts_name, column("rowid"))
+    expression = " AND ".join("(" + " OR ".join(f'"{alt}"' for alt in alts) + ")" for alts in terms)
+    # bm25() is lower for better matches
+    rank = -func.bm25(literal_column(fts_name))
+    return fts, fts.c.rowid == model.id, literal_column(fts_name).op("MATCH")(expression), rank
+
+
+def _postgres_match(model, terms: List[List[str]]):
+    # Must match the expression of the GIN index exactly
+    vector = func.to_tsvector(literal_column("'english'"), func.coalesce(model.search_text, literal_column("''")))
+    query = func.to_tsquery(
+        literal_column("'english'"),
+        " & ".join("(" + " | ".join(alts) + ")" for alts in terms)
+    )
+    return None, None, vector.op("@@")(query), func.ts_rank_cd(vector, query)
+
+
+def _mysql_match(model, terms: List[List[str]]):
+    expression = " ".join("+(" + " ".join(alts) + ")" for alts in terms)
+    match = model.search_text.match(expression)
+    return None, None, match, match
+
+
+MATCHERS = {
+    "sqlite": _sqlite_match,
+    "postgresql": _postgres_match,
+    "mysql": _mysql_match,
+}
+
+
+def _source_query(model, archived: bool, matcher, terms, status, category, sub_issue, ward, created_from, created_to):
+    fts, fts_join, condition, rank = matcher(model, terms)
+    query = select(
+        model.id.label("id"),
+        model.complaint_id.label("complaint_id"),
+        model.category.label("category"),
+        model.sub_issue.label("sub_issue"),
+        model.description.label("description"),
+        model.status.label("status"),
+        model.created_at.label("created_at"),
+        User.ward_number.label("user_ward"),
+        (true() if archived else false()).label("archived"),
+        rank.label("rank"),
+    )
+    query = query.select_from(fts.join(model, fts_join)) if fts is not None else query.select_from(model)
+    query = query.outerjoin(User, model.user_id == User.id).where(condition)
+    if status:
+        query = query.where(model.status == status)
+    if category:
+        query = query.where(model.category == category)
+    if sub_issue:
+        query = query.where(model.sub_issue == sub_issue)
+    if ward:
+        query = query.where(User.ward_number == ward)
+    if created_from:
+        query = query.where(model.created_at >= created_from)
+    if created_to:
+        query = query.where(model.created_at < created_to)
+    return query
+
+
+def build_search_query(dialect_name: str, q: str, status: Optional[ComplaintStatus] = None,
+                       category: Optional[str] = None, sub_issue: Optional[str] = None, ward: Optional[str] = None,
+                       created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                       include_archived: bool = True, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0):
+    """Ranked search statement over complaints (and the archive); fetches one extra row for paging"""
+    matcher = MATCHERS.get(dialect_name)
+    if matcher is None:
+        raise ValueError(f"Full-text search is not supported on {dialect_name}")
+    terms = query_terms(q)
+    if not terms:
+        raise ValueError("Search query has no words")
+
+    filters = (status, category, sub_issue, ward, created_from, created_to)
+    sources = [_source_query(Complaint, False, matcher, terms, *filters)]
+    if include_archived:
+        sources.append(_source_query(ArchivedComplaint, True, matcher, terms, *filters))
+    results = union_all(*sources).subquery() if len(sources) > 1 else sources[0].subquery()
+    return (
+        select(results)
+        .order_by(results.c.rank.desc(), results.c.created_at.desc(), results.c.id.desc())
+        .limit(limit + 1)
+        .offset(offset)
+    )
+
+
+def search_complaints(db: Session, q: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0, **filters) -> Dict:
+    """Return {"items": [...], "next_offset": int | None} for one page of ranked matches"""
+    statement = build_search_query(db.get_bind().dialect.name, q, limit=limit, offset=offset, **filters)
+    rows = db.execute(statement).mappings().all()
+    next_offset = offset + limit if len(rows) > limit else None
+    items = []
+    for row in rows[:limit]:
+        item = dict(row)
+        item.pop("id")
+        item["archived"] = bool(item["archived"])
+        item["rank"] = round(float(item["rank"] or 0), 6)
+        items.append(item)
+    return {"items": items, "next_offset": next_offset}
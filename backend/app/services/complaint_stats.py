@@ -0,0 +1,175 @@
+"""
+Dashboard aggregates: complaint counts by ward, category, sub-issue, status and day.
+
+Counters live in the ``complaint_stats`` summary table and are changed by an
+upsert increment in the same transaction that inserts a complaint or changes
+its status, so the table never drifts from ``complaints``. Each worker keeps
+the counters and their rollups in memory: its own changes are applied when the
+session commits, and changes made by other workers are picked up by reloading
+the summary table every ``STATS_REFRESH_SECONDS``. ``rebuild`` recomputes the
+table from scratch with a single GROUP BY over the hot and archived complaints.
+"""
+
+from typing import Dict, Optional, Tuple
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import Date, cast, delete, event, func, insert, select, union_all
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import ArchivedComplaint, Complaint, ComplaintStat, ComplaintStatus, User
+from app.db.upsert import upsert_statement
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+StatKey = Tuple[str, str, str, ComplaintStatus, date]
+
+KEY_COLUMNS = ("ward", "category", "sub_issue", "status", "day")
+
+# Session.info key holding counter deltas waiting for the transaction to commit
+PENDING_DELTAS = "complaint_stats_deltas"
+
+
+def stat_key(ward: Optional[str], category: str, sub_issue: Optional[str],
+             status: ComplaintStatus, created_at: datetime) -> StatKey:
+    return (ward or "", category, sub_issue or "", ComplaintStatus(status), created_at.date())
+
+
+def _dialect_name(conn) -> str:
+    # Works for both a Connection and a Session
+    return conn.dialect.name if hasattr(conn, "dialect") else conn.get_bind().dialect.name
+
+
+def rebuild(conn) -> int:
+    """Recompute complaint_stats from complaints with one INSERT ... SELECT ... GROUP BY"""
+    # Archived complaints still count towards the historical totals
+    complaints = union_all(*[
+        select(model.user_id, model.category, model.sub_issue, model.status, model.created_at)
+        for model in (Complaint, ArchivedComplaint)
+    ]).subquery()
+    if _dialect_name(conn) == "sqlite":
+        day = func.date(complaints.c.created_at)
+    else:
+        day = cast(complaints.c.created_at, Date)
+    ward = func.coalesce(User.ward_number, "")
+    sub_issue = func.coalesce(complaints.c.sub_issue, "")
+    grouped = (
+        select(ward, complaints.c.category, sub_issue, complaints.c.status, day, func.count())
+        .select_from(complaints)
+        .outerjoin(User, complaints.c.user_id == User.id)
+        .group_by(ward, complaints.c.category, sub_issue, complaints.c.status, day)
+    )
+    conn.execute(delete(ComplaintStat))
+    result = conn.execute(insert(ComplaintStat).from_select(list(KEY_COLUMNS) + ["count"], grouped))
+    return result.rowcount
+
+
+class ComplaintStats:
+    def __init__(self, refresh_seconds: float = settings.STATS_REFRESH_SECONDS,
+                 recent_days: int = settings.STATS_RECENT_DAYS):
+        self.refresh_seconds = refresh_seconds
+        self.recent_days = recent_days
+        self._counts: Counter = Counter()
+        self._snapshot: Optional[Dict] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, db: Session, key: StatKey, delta: int = 1):
+        """Change one counter inside db's current transaction; memory follows on commit"""
+        self.record_many(db, {key: delta})
+
+    def record_many(self, db: Session, deltas: Dict[StatKey, int]):
+        """Change several counters with one multi-row upsert"""
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        rows = [dict(zip(KEY_COLUMNS, key), count=delta) for key, delta in deltas.items()]
+        db.execute(upsert_statement(
+            _dialect_name(db), ComplaintStat.__table__, rows, KEY_COLUMNS, ["count"], increment=True
+        ))
+        db.info.setdefault(PENDING_DELTAS, []).extend(deltas.items())
+
+    def record_created(self, db: Session, ward: Optional[str], category: str, sub_issue: Optional[str],
+                       status: ComplaintStatus, created_at: datetime):
+        self.record(db, stat_key(ward, category, sub_issue, status, created_at))
+
+    def record_status_change(self, db: Session, ward: Optional[str], category: str, sub_issue: Optional[str],
+                             old_status: ComplaintStatus, new_status: ComplaintStatus, created_at: datetime):
+        if ComplaintStatus(old_status) == ComplaintStatus(new_status):
+            return
+        self.record_many(db, {
+            stat_key(ward, category, sub_issue, old_status, created_at): -1,
+            stat_key(ward, category, sub_issue, new_status, created_at): 1,
+        })
+
+    def apply(self, deltas):
+        with self._lock:
+            for key, delta in deltas:
+                self._counts[key] += delta
+                if self._counts[key] <= 0:
+                    del self._counts[key]
+            self._snapshot = None
+
+    def load(self, db: Session):
+        """Replace the in-memory counters with the summary table"""
+        rows = db.execute(select(*[getattr(ComplaintStat, c) for c in KEY_COLUMNS], ComplaintStat.count)).all()
+        counts = Counter({tuple(row[:-1]): row[-1] for row in rows if row[-1] > 0})
+        with self._lock:
+            self._counts = counts
+            self._snapshot = None
+            self._loaded_at = time.monotonic()
+        logger.info(f"Loaded {len(counts)} complaint stat counters")
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def snapshot(self, today: Optional[date] = None) -> Dict:
+        """Rollups for the dashboard; rebuilt only after the counters change"""
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._rollup(today or datetime.utcnow().date())
+            return self._snapshot
+
+    def _rollup(self, today: date) -> Dict:
+        first_day = today - timedelta(days=self.recent_days - 1)
+        by_status, by_category, by_ward, by_day = Counter(), Counter(), Counter(), Counter()
+        by_ward_status = defaultdict(Counter)
+        by_category_status = defaultdict(Counter)
+        by_sub_issue = defaultdict(Counter)
+        for (ward, category, sub_issue, status, day), count in self._counts.items():
+            status = status.value
+            by_status[status] += count
+            by_category[category] += count
+            by_ward[ward] += count
+            by_ward_status[ward][status] += count
+            by_category_status[category][status] += count
+            by_sub_issue[category][sub_issue] += count
+            if day >= first_day:
+                by_day[day.isoformat()] += count
+        return {
+            "total": sum(by_status.values()),
+            "by_status": dict(by_status),
+            "by_category": dict(by_category),
+            "by_ward": dict(by_ward),
+            "by_ward_status": {ward: dict(counts) for ward, counts in by_ward_status.items()},
+            "by_category_status": {category: dict(counts) for category, counts in by_category_status.items()},
+            "by_sub_issue": {category: dict(counts) for category, counts in by_sub_issue.items()},
+            "by_day": dict(sorted(by_day.items())),
+        }
+
+
+complaint_stats = ComplaintStats()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_deltas(session: Session):
+    deltas = session.info.pop(PENDING_DELTAS, None)
+    if deltas:
+        complaint_stats.apply(deltas)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_deltas(session: Session, previous_transaction):
+    session.info.pop(PENDING_DELTAS, None)
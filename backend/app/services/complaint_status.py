@@ -0,0 +1,147 @@
+"""
+Complaint status changes, single or in bulk.
+
+A batch is applied in one transaction: the affected complaints are read (and
+locked where the database supports it) with one SELECT, then each target
+status gets one set-based UPDATE. Dashboard counters are adjusted, citizen
+WhatsApp notifications queued in the notification outbox and live feed events
+recorded in the same transaction, and a ComplaintStatusChanged event is published per changed
+complaint once the transaction has committed.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import select, update
+from app.db.database import SessionLocal
+from app.db.models import Complaint, ComplaintStatus, User
+from app.services.complaint_feed import record_events
+from app.services.complaint_stats import complaint_stats, stat_key
+from app.services.events import ComplaintStatusChanged, event_bus
+from app.services.language_detection import language_detector
+from app.services.notification_outbox import enqueue, recipient_for, status_notification
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_BULK_STATUS_UPDATES = 1000
+
+# Values the dashboard sends besides the enum values themselves
+STATUS_ALIASES = {
+    "completed": ComplaintStatus.RESOLVED,
+    "complete": ComplaintStatus.RESOLVED,
+    "closed": ComplaintStatus.RESOLVED,
+    "open": ComplaintStatus.PENDING,
+    "reopened": ComplaintStatus.PENDING,
+}
+
+# Per-ID outcomes
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+NOT_FOUND = "not_found"
+INVALID_STATUS = "invalid_status"
+
+
+def parse_status(value: str) -> ComplaintStatus:
+    """Parse a status such as "in_progress", "In Progress" or "completed"; raises ValueError"""
+    key = (value or "").strip().lower().replace(" ", "_").replace("-", "_")
+    if key in STATUS_ALIASES:
+        return STATUS_ALIASES[key]
+    try:
+        return ComplaintStatus(key)
+    except ValueError:
+        raise ValueError(f"Invalid status: {value}")
+
+
+def apply_status_updates(updates: Iterable[Tuple[str, str]], session_factory=SessionLocal) -> List[Dict]:
+    """
+    Apply (complaint_id, status) pairs; the last pair wins for a repeated ID.
+    Returns one result per distinct complaint ID, in input order.
+    """
+    results: Dict[str, Dict] = {}
+    targets: Dict[str, ComplaintStatus] = {}
+    for complaint_id, status in updates:
+        complaint_id = complaint_id.strip()
+        try:
+            targets[complaint_id] = parse_status(status)
+            results[complaint_id] = {"complaint_id": complaint_id, "result": None, "old_status": None, "status": None}
+        except ValueError as e:
+            targets.pop(complaint_id, None)
+            results[complaint_id] = {"complaint_id": complaint_id, "result": INVALID_STATUS, "old_status": None,
+                                     "status": None, "error": str(e)}
+    if not targets:
+        return list(results.values())
+
+    events = []
+    db = session_factory()
+    try:
+        rows = db.execute(
+            select(
+                Complaint.complaint_id, Complaint.login_id, Complaint.category, Complaint.sub_issue,
+                Complaint.status, Complaint.latitude, Complaint.longitude, Complaint.created_at,
+                User.ward_number, User.mobile
+            )
+            .select_from(Complaint)
+            .outerjoin(User, Complaint.user_id == User.id)
+            .where(Complaint.complaint_id.in_(list(targets)))
+            .with_for_update(of=Complaint)
+        ).all()
+        found = {row.complaint_id: row for row in rows}
+
+        now = datetime.utcnow()
+        by_status: Dict[ComplaintStatus, List[str]] = {}
+        deltas: Counter = Counter()
+        notifications: List[Dict] = []
+        for complaint_id, new_status in targets.items():
+            result = results[complaint_id]
+            row = found.get(complaint_id)
+            if row is None:
+                result["result"] = NOT_FOUND
+                continue
+            result.update(old_status=row.status, status=new_status)
+            if row.status == new_status:
+                result["result"] = UNCHANGED
+                continue
+            result["result"] = UPDATED
+            by_status.setdefault(new_status, []).append(complaint_id)
+            deltas[stat_key(row.ward_number, row.category, row.sub_issue, row.status, row.created_at)] -= 1
+            deltas[stat_key(row.ward_number, row.category, row.sub_issue, new_status, row.created_at)] += 1
+            events.append(ComplaintStatusChanged(
+                complaint_id=complaint_id,
+                category=row.category,
+                sub_issue=row.sub_issue,
+                old_status=row.status,
+                new_status=new_status,
+                ward=row.ward_number,
+                login_id=row.login_id,
+                latitude=row.latitude,
+                longitude=row.longitude,
+                created_at=row.created_at,
+                changed_at=now,
+            ))
+            # The language the citizen chats in, as far as this worker knows it; English otherwise
+            lang = language_detector.language_of(recipient_for(row.mobile)) or "en"
+            notification = status_notification(complaint_id, row.mobile, new_status, now, lang)
+            if notification:
+                notifications.append(notification)
+
+        for new_status, complaint_ids in by_status.items():
+            db.execute(
+                update(Complaint)
+                .where(Complaint.complaint_id.in_(complaint_ids))
+                .values(status=new_status, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        complaint_stats.record_many(db, deltas)
+        enqueue(db, notifications)
+        record_events(db, events)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    logger.info(f"Applied {len(events)} complaint status changes ({len(targets)} requested)")
+    event_bus.publish_all(events)
+    return list(results.values())
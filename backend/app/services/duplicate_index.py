@@ -0,0 +1,162 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.db.models import Complaint, ComplaintStatus
+from app.services.events import ComplaintCreated, ComplaintStatusChanged, event_bus
+import threading
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE = 111_320.0
+
+
+def haversine_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in meters"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * 6_371_000.0 * math.asin(math.sqrt(a))
+
+
+class ComplaintGeoIndex:
+    """
+    In-memory grid index of open complaints used to spot near-duplicate reports.
+
+    Entries are bucketed by (category, sub_issue, time bucket) and then by a
+    lat/lon grid cell roughly one radius wide, so a lookup only has to look at
+    the 3x3 neighbouring cells of the current and previous time bucket.
+    The index is per process; the database stays the source of truth.
+    """
+
+    def __init__(self, radius_meters: float = 50.0, window_hours: float = 48.0):
+        self.radius_meters = radius_meters
+        self.window_seconds = window_hours * 3600
+        self.cell_degrees = radius_meters / METERS_PER_DEGREE
+        # (category, sub_issue, time_bucket) -> (row, col) -> [(complaint_id, lat, lon, created_ts)]
+        self._buckets: Dict[Tuple[str, str, int], Dict[Tuple[int, int], List[Tuple[str, float, float, float]]]] = {}
+        # complaint_id -> (bucket key, cell key) for O(1) removal
+        self._locations: Dict[str, Tuple[Tuple[str, str, int], Tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def _row(self, lat: float) -> int:
+        return math.floor(lat / self.cell_degrees)
+
+    def _col(self, row: int, lon: float) -> int:
+        # Size longitude cells for the pole-ward edge of the row so every cell
+        # is at least one radius wide on the ground.
+        edge = max(abs(row * self.cell_degrees), abs((row + 1) * self.cell_degrees))
+        lon_step = self.cell_degrees / max(math.cos(math.radians(min(edge, 89.0))), 0.01)
+        return math.floor(lon / lon_step)
+
+    def _time_bucket(self, ts: float) -> int:
+        return math.floor(ts / self.window_seconds)
+
+    def add(self, complaint_id: str, category: str, sub_issue: str, lat: float, lon: float, created_at: datetime):
+        """Index an open complaint"""
+        if lat is None or lon is None:
+            return
+        ts = created_at.timestamp()
+        row = self._row(lat)
+        bucket_key = (category, sub_issue, self._time_bucket(ts))
+        cell_key = (row, self._col(row, lon))
+        with self._lock:
+            if complaint_id in self._locations:
+                return
+            self._buckets.setdefault(bucket_key, {}).setdefault(cell_key, []).append((complaint_id, lat, lon, ts))
+            self._locations[complaint_id] = (bucket_key, cell_key)
+
+    def remove(self, complaint_id: str):
+        """Drop a complaint from the index (e.g. once it is resolved)"""
+        with self._lock:
+            location = self._locations.pop(complaint_id, None)
+            if location is None:
+                return
+            bucket_key, cell_key = location
+            cells = self._buckets.get(bucket_key, {})
+            entries = [e for e in cells.get(cell_key, []) if e[0] != complaint_id]
+            if entries:
+                cells[cell_key] = entries
+            else:
+                cells.pop(cell_key, None)
+                if not cells:
+                    self._buckets.pop(bucket_key, None)
+
+    def find_duplicate(self, category: str, sub_issue: str, lat: float, lon: float, at: Optional[datetime] = None) -> Optional[str]:
+        """Return the closest open complaint within the radius and time window, if any"""
+        if lat is None or lon is None:
+            return None
+        ts = (at or datetime.utcnow()).timestamp()
+        bucket = self._time_bucket(ts)
+        row = self._row(lat)
+
+        best_id, best_distance = None, None
+        with self._lock:
+            for time_bucket in (bucket, bucket - 1):
+                cells = self._buckets.get((category, sub_issue, time_bucket))
+                if not cells:
+                    continue
+                for r in (row - 1, row, row + 1):
+                    col = self._col(r, lon)
+                    for c in (col - 1, col, col + 1):
+                        for complaint_id, e_lat, e_lon, e_ts in cells.get((r, c), ()):
+                            if abs(ts - e_ts) > self.window_seconds:
+                                continue
+                            distance = haversine_meters(lat, lon, e_lat, e_lon)
+                            if distance <= self.radius_meters and (best_distance is None or distance < best_distance):
+                                best_id, best_distance = complaint_id, distance
+        return best_id
+
+    def prune(self, now: Optional[datetime] = None):
+        """Forget time buckets that can no longer match a new report"""
+        oldest = self._time_bucket((now or datetime.utcnow()).timestamp()) - 1
+        with self._lock:
+            for bucket_key in [k for k in self._buckets if k[2] < oldest]:
+                for entries in self._buckets.pop(bucket_key).values():
+                    for entry in entries:
+                        self._locations.pop(entry[0], None)
+
+    def load_open_complaints(self, db):
+        """Warm the index from open complaints still inside the time window"""
+        since = datetime.utcnow() - timedelta(seconds=2 * self.window_seconds)
+        rows = db.query(
+            Complaint.complaint_id, Complaint.category, Complaint.sub_issue,
+            Complaint.latitude, Complaint.longitude, Complaint.created_at
+        ).filter(
+            Complaint.status.in_([ComplaintStatus.PENDING, ComplaintStatus.IN_PROGRESS]),
+            Complaint.latitude.isnot(None),
+            Complaint.longitude.isnot(None),
+            Complaint.created_at >= since
+        ).all()
+        for row in rows:
+            self.add(row.complaint_id, row.category, row.sub_issue, row.latitude, row.longitude, row.created_at)
+        self.loaded = True
+        logger.info(f"Duplicate index warmed with {len(rows)} open complaints")
+
+
+complaint_index = ComplaintGeoIndex(
+    radius_meters=settings.DUPLICATE_RADIUS_METERS,
+    window_hours=settings.DUPLICATE_WINDOW_HOURS
+)
+
+
+def _on_complaint_created(event: ComplaintCreated):
+    if event.status != ComplaintStatus.RESOLVED:
+        complaint_index.add(event.complaint_id, event.category, event.sub_issue,
+                            event.latitude, event.longitude, event.created_at)
+
+
+def _on_status_changed(event: ComplaintStatusChanged):
+    # Resolved complaints no longer absorb new duplicate reports
+    if event.new_status == ComplaintStatus.RESOLVED:
+        complaint_index.remove(event.complaint_id)
+    else:
+        complaint_index.add(event.complaint_id, event.category, event.sub_issue,
+                            event.latitude, event.longitude, event.created_at)
+
+
+event_bus.subscribe(ComplaintCreated, _on_complaint_created)
+event_bus.subscribe(ComplaintStatusChanged, _on_status_changed)
@@ -0,0 +1,73 @@
+"""
+In-process event bus for changes that caches and notifiers react to.
+
+Events are published after the database transaction that caused them has
+committed. Handlers run synchronously in the publishing thread, so they
+should be quick (update an in-memory structure, enqueue work); a failing
+handler is logged and does not affect the other handlers or the caller.
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+from datetime import datetime
+from app.db.models import ComplaintStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ComplaintCreated(NamedTuple):
+    complaint_id: str
+    login_id: str
+    category: str
+    sub_issue: Optional[str]
+    status: ComplaintStatus
+    ward: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    created_at: datetime
+
+
+class ComplaintStatusChanged(NamedTuple):
+    complaint_id: str
+    category: str
+    sub_issue: Optional[str]
+    old_status: ComplaintStatus
+    new_status: ComplaintStatus
+    ward: Optional[str]
+    login_id: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    created_at: datetime
+    changed_at: datetime
+
+
+class PropertyTaxUpdated(NamedTuple):
+    property_ids: Tuple[str, ...]
+    updated_at: datetime
+
+
+class EventBus:
+    def __init__(self):
+        self._handlers: Dict[Type, List[Callable]] = {}
+
+    def subscribe(self, event_type: Type, handler: Callable):
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type: Type, handler: Callable):
+        handlers = self._handlers.get(event_type, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, event):
+        for handler in list(self._handlers.get(type(event), [])):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Error in {type(event).__name__} handler {handler.__name__}: {e}", exc_info=True)
+
+    def publish_all(self, events):
+        for event in events:
+            self.publish(event)
+
+
+event_bus = EventBus()
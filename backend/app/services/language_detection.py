@@ -0,0 +1,137 @@
+"""
+Guess the citizen's language from their first message.
+
+Devanagari and Gujarati script identify Hindi and Gujarati outright. Latin
+text goes to langdetect (profiles loaded once, in the background, at
+startup) and only counts when it is long enough to judge and English is
+detected with at least ``LANGUAGE_DETECT_MIN_CONFIDENCE``; greetings such as
+"Hi" and romanized Hindi/Gujarati are left to the language menu. Detected
+and explicitly chosen languages are remembered per phone number, so a
+returning citizen skips the menu too.
+"""
+
+from typing import Optional
+from collections import OrderedDict
+from app.core.config import settings
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_LANGUAGES = ("en", "hi", "gu")
+# Unicode blocks that settle the language on their own
+SCRIPTS = {
+    "hi": (0x0900, 0x097F),  # Devanagari
+    "gu": (0x0A80, 0x0AFF),  # Gujarati
+}
+# langdetect is unreliable below this many letters/words
+MIN_LATIN_LETTERS = 12
+MIN_LATIN_WORDS = 3
+
+
+def detect_script(text: str) -> Optional[str]:
+    """Language whose script makes up most of the letters in text, if any"""
+    counts = dict.fromkeys(SCRIPTS, 0)
+    letters = 0
+    for char in text:
+        if not char.isalpha():
+            continue
+        letters += 1
+        code = ord(char)
+        for lang, (first, last) in SCRIPTS.items():
+            if first <= code <= last:
+                counts[lang] += 1
+                break
+    if not letters:
+        return None
+    lang, count = max(counts.items(), key=lambda item: item[1])
+    return lang if count / letters >= 0.6 else None
+
+
+class LanguageDetector:
+    def __init__(self, min_confidence: float = settings.LANGUAGE_DETECT_MIN_CONFIDENCE,
+                 cache_size: int = settings.LANGUAGE_CACHE_SIZE):
+        self.min_confidence = min_confidence
+        self.cache_size = cache_size
+        self._factory = None
+        self._loading: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Phone number -> language
+        self._languages: "OrderedDict[str, str]" = OrderedDict()
+        self.metrics = {"script": 0, "langdetect": 0, "remembered": 0, "undetected": 0}
+
+    def load(self):
+        """Load the langdetect profiles (about 0.4s); detection is script-only until this is done"""
+        try:
+            from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
+        except ImportError:
+            logger.warning("langdetect is not installed; detecting Hindi/Gujarati by script only")
+            return
+        started = time.perf_counter()
+        factory = DetectorFactory()
+        factory.load_profile(PROFILES_DIRECTORY)
+        factory.set_seed(0)
+        self._factory = factory
+        logger.info(f"Language profiles loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def start(self):
+        """Load the profiles in the background so startup is not delayed"""
+        if self._factory is None and self._loading is None:
+            self._loading = threading.Thread(target=self.load, name="langdetect-profiles", daemon=True)
+            self._loading.start()
+
+    def detect_text(self, text: str) -> Optional[str]:
+        text = text.strip()
+        lang = detect_script(text)
+        if lang is not None:
+            self.metrics["script"] += 1
+            return lang
+        factory = self._factory
+        if factory is None or len(text.split()) < MIN_LATIN_WORDS \
+                or sum(char.isalpha() for char in text) < MIN_LATIN_LETTERS:
+            return None
+        try:
+            detector = factory.create()
+            detector.append(text)
+            best = detector.get_probabilities()[0]
+        except Exception as e:
+            # langdetect raises on text without features (digits, emoji)
+            logger.debug(f"Language detection failed: {e}")
+            return None
+        if best.lang in SUPPORTED_LANGUAGES and best.prob >= self.min_confidence:
+            self.metrics["langdetect"] += 1
+            return best.lang
+        return None
+
+    def detect(self, phone_number: str, text: str) -> Optional[str]:
+        """Language of this message, else the one last detected or chosen for this phone number"""
+        lang = self.detect_text(text) if text else None
+        if lang is not None:
+            self.remember(phone_number, lang)
+            return lang
+        with self._lock:
+            lang = self._languages.get(phone_number)
+            if lang is not None:
+                self._languages.move_to_end(phone_number)
+        self.metrics["remembered" if lang else "undetected"] += 1
+        return lang
+
+    def language_of(self, phone_number: str) -> Optional[str]:
+        """Language last detected or chosen for this phone number in this worker, if any"""
+        with self._lock:
+            return self._languages.get(phone_number)
+
+    def remember(self, phone_number: str, lang: str):
+        with self._lock:
+            self._languages[phone_number] = lang
+            self._languages.move_to_end(phone_number)
+            while len(self._languages) > self.cache_size:
+                self._languages.popitem(last=False)
+
+    def forget(self, phone_number: str):
+        with self._lock:
+            self._languages.pop(phone_number, None)
+
+
+language_detector = LanguageDetector()
@@ -0,0 +1,298 @@
+"""
+Transactional outbox for citizen WhatsApp notifications.
+
+Status changes insert a ``notification_outbox`` row in the same transaction
+that changes the complaint, so a notification exists exactly when the change
+was committed. A background relay in every worker drains due rows in batches
+and sends them through the WhatsApp service:
+
+- rows are claimed with a lease (and SKIP LOCKED where supported), so workers
+  never send the same row concurrently; a worker that dies mid-batch leaves
+  its rows to be retried after the lease, making delivery at-least-once
+- ``dedupe_key`` is unique, so one change is never queued twice
+- only the newest notice for a complaint is ever sent: older ones in the
+  same batch, and retries of notices that have since been followed by a
+  newer one, are marked superseded, so a citizen is never told an outdated
+  status after the current one
+- failed sends are retried with exponential backoff up to
+  ``OUTBOX_MAX_ATTEMPTS``; errors no retry can fix (such as a citizen outside
+  WhatsApp's 24-hour window when no template is configured) fail at once
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import aliased
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import ComplaintStatus, NotificationOutbox
+from app.services.translations import get_text
+from app.services.whatsapp import WhatsAppSendError, whatsapp_service
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+SUPERSEDED = "superseded"
+
+MAX_BACKOFF_SECONDS = 3600
+
+_metrics_lock = threading.Lock()
+outbox_metrics: Dict = {
+    "sent_total": 0,
+    "retried_total": 0,
+    "failed_total": 0,
+    "superseded_total": 0,
+    "batches": 0,
+    "last_batch_at": None,
+    "last_batch_size": 0,
+    "last_batch_seconds": 0.0,
+    "last_batch_sent_per_second": 0.0,
+    # Seconds from commit of the change to WhatsApp accepting the message
+    "last_delivery_lag_seconds": None,
+    "max_delivery_lag_seconds": 0.0,
+}
+
+
+def recipient_for(mobile: Optional[str]) -> Optional[str]:
+    """WhatsApp recipient for a mobile number collected at login (10 digits, no country code)"""
+    digits = "".join(ch for ch in (mobile or "") if ch.isdigit())
+    if not digits:
+        return None
+    return settings.NOTIFY_COUNTRY_CODE + digits if len(digits) == 10 else digits
+
+
+def status_notification(complaint_id: str, mobile: Optional[str], status: ComplaintStatus,
+                        changed_at: datetime, lang: str = "en") -> Optional[Dict]:
+    """Outbox row announcing a complaint's new status, or None if the citizen has no number"""
+    recipient = recipient_for(mobile)
+    if recipient is None:
+        return None
+    return {
+        "dedupe_key": f"complaint-status:{complaint_id}:{status.value}:{changed_at.isoformat()}",
+        "subject": complaint_id,
+        "recipient": recipient,
+        "message": get_text(
+            "complaint_status_update", lang,
+            complaint_id=complaint_id, status=get_text(f"status_{status.value}", lang)
+        ),
+        "state": PENDING,
+        "attempts": 0,
+        "next_attempt_at": changed_at,
+        "created_at": changed_at,
+    }
+
+
+def enqueue(db, rows: List[Dict]):
+    """Queue notifications in the caller's transaction; they are sent only if it commits"""
+    if rows:
+        db.execute(insert(NotificationOutbox), rows)
+
+
+def backoff_seconds(attempts: int) -> float:
+    return min(settings.OUTBOX_POLL_SECONDS * 2 ** attempts, MAX_BACKOFF_SECONDS)
+
+
+def outbox_status(db) -> Dict:
+    """Row counts per state and the age of the oldest due notification (current lag)"""
+    counts = dict(db.execute(
+        select(NotificationOutbox.state, func.count()).group_by(NotificationOutbox.state)
+    ).all())
+    oldest = db.execute(
+        select(func.min(NotificationOutbox.created_at)).where(NotificationOutbox.state == PENDING)
+    ).scalar()
+    return {
+        "counts": {state: counts.get(state, 0) for state in (PENDING, SENT, FAILED, SUPERSEDED)},
+        "oldest_pending_age_seconds": (
+            round((datetime.utcnow() - oldest).total_seconds(), 3) if oldest else None
+        ),
+    }
+
+
+class OutboxRelay:
+    """Drains due outbox rows in batches and sends them, until stopped"""
+
+    def __init__(self, session_factory=SessionLocal,
+                 sender: Optional[Callable[[str, str], Awaitable]] = None,
+                 batch_size: int = settings.OUTBOX_BATCH_SIZE,
+                 poll_seconds: float = settings.OUTBOX_POLL_SECONDS,
+                 lease_seconds: float = settings.OUTBOX_LEASE_SECONDS,
+                 max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS):
+        self.session_factory = session_factory
+        self.sender = sender or whatsapp_service.send_notification
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: Optional[asyncio.Task] = None
+
+    def claim_batch(self) -> Tuple[str, List]:
+        """Lease up to batch_size due rows to this worker; returns (claim token, rows)"""
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            due = (
+                select(NotificationOutbox.id)
+                .where(NotificationOutbox.state == PENDING, NotificationOutbox.next_attempt_at <= now)
+                .order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+                .limit(self.batch_size)
+            )
+            if db.get_bind().dialect.name in ("postgresql", "mysql"):
+                due = due.with_for_update(skip_locked=True)
+            ids = db.execute(due).scalars().all()
+            token = f"{self.worker_id}:{uuid.uuid4().hex[:8]}"
+            if not ids:
+                db.commit()
+                return token, []
+            lease_until = now + timedelta(seconds=self.lease_seconds)
+            # Re-check the due condition so a concurrent claimer (SQLite) cannot take the same rows
+            db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(ids), NotificationOutbox.state == PENDING,
+                       NotificationOutbox.next_attempt_at <= now)
+                .values(claimed_by=token, next_attempt_at=lease_until,
+                        attempts=NotificationOutbox.attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+            # Newest notice queued for the same complaint, claimed here or not
+            other = aliased(NotificationOutbox)
+            newest_id = (
+                select(func.max(other.id)).where(other.subject == NotificationOutbox.subject).scalar_subquery()
+            )
+            rows = db.execute(
+                select(NotificationOutbox.id, NotificationOutbox.subject, NotificationOutbox.recipient,
+                       NotificationOutbox.message, NotificationOutbox.attempts, NotificationOutbox.created_at,
+                       newest_id.label("newest_id"))
+                .where(NotificationOutbox.id.in_(ids), NotificationOutbox.claimed_by == token)
+                .order_by(NotificationOutbox.id)
+            ).all()
+            db.commit()
+            return token, rows
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def complete(self, token: str, sent: List[int], superseded: List[int], failed: List):
+        """Record the outcome of a claimed batch; failed is a list of (row, error, permanent)"""
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            # Rows whose lease expired and were re-claimed elsewhere are left alone
+            mine = NotificationOutbox.claimed_by == token
+            for ids, values in ((sent, {"state": SENT, "sent_at": now}), (superseded, {"state": SUPERSEDED})):
+                if ids:
+                    db.execute(
+                        update(NotificationOutbox)
+                        .where(NotificationOutbox.id.in_(ids), mine)
+                        .values(claimed_by=None, last_error=None, **values)
+                        .execution_options(synchronize_session=False)
+                    )
+            for row, error, permanent in failed:
+                values = {"claimed_by": None, "last_error": error[:500]}
+                if permanent or row.attempts >= self.max_attempts:
+                    values["state"] = FAILED
+                else:
+                    values["next_attempt_at"] = now + timedelta(seconds=backoff_seconds(row.attempts))
+                db.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id == row.id, mine)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _send(self, row) -> Optional[Tuple[str, bool]]:
+        """Send one row; returns None on success, otherwise (error, whether retrying is pointless)"""
+        try:
+            if await self.sender(row.recipient, row.message):
+                return None
+            return "WhatsApp API did not accept the message", False
+        except WhatsAppSendError as e:
+            return str(e), e.permanent
+        except Exception as e:
+            return str(e) or type(e).__name__, False
+
+    async def drain_once(self) -> int:
+        """Claim, send and record one batch; returns the number of rows claimed"""
+        token, rows = await asyncio.to_thread(self.claim_batch)
+        if not rows:
+            return 0
+        started = time.perf_counter()
+
+        # Only the newest notice per complaint is sent; older ones are superseded, whether the newer
+        # one is in this batch or was queued while they waited for a retry
+        to_send = [row for row in rows if row.id == row.newest_id]
+        sending = {row.id for row in to_send}
+        superseded = [row.id for row in rows if row.id not in sending]
+
+        errors = await asyncio.gather(*(self._send(row) for row in to_send))
+        sent = [row for row, error in zip(to_send, errors) if error is None]
+        failed = [(row, *error) for row, error in zip(to_send, errors) if error is not None]
+        await asyncio.to_thread(self.complete, token, [row.id for row in sent], superseded, failed)
+
+        elapsed = time.perf_counter() - started
+        now = datetime.utcnow()
+        with _metrics_lock:
+            outbox_metrics["sent_total"] += len(sent)
+            outbox_metrics["superseded_total"] += len(superseded)
+            given_up = sum(1 for row, _, permanent in failed if permanent or row.attempts >= self.max_attempts)
+            outbox_metrics["failed_total"] += given_up
+            outbox_metrics["retried_total"] += len(failed) - given_up
+            outbox_metrics["batches"] += 1
+            outbox_metrics["last_batch_at"] = now.isoformat()
+            outbox_metrics["last_batch_size"] = len(rows)
+            outbox_metrics["last_batch_seconds"] = round(elapsed, 3)
+            outbox_metrics["last_batch_sent_per_second"] = round(len(sent) / elapsed, 1) if elapsed else 0.0
+            if sent:
+                lag = max((now - row.created_at).total_seconds() for row in sent)
+                outbox_metrics["last_delivery_lag_seconds"] = round(lag, 3)
+                outbox_metrics["max_delivery_lag_seconds"] = round(max(outbox_metrics["max_delivery_lag_seconds"], lag), 3)
+        if failed:
+            logger.warning(f"Outbox: {len(failed)} of {len(to_send)} notifications failed, e.g. {failed[0][1]}")
+        return len(rows)
+
+    async def run(self):
+        """Drain full batches back to back, otherwise poll every poll_seconds"""
+        logger.info(f"Notification outbox relay started ({self.worker_id})")
+        while True:
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification outbox relay error: {e}")
+                claimed = 0
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+outbox_relay = OutboxRelay()
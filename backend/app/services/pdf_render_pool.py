@@ -0,0 +1,166 @@
+"""
+Receipt rendering off the event loop.
+
+ReportLab rendering is CPU-bound, so rendering inline stalls every webhook
+handled by the worker. ``PdfRenderPool`` renders cache misses in a bounded
+process pool of ``PDF_RENDER_WORKERS`` processes, which scales across cores:
+
+- concurrent requests for the same receipt share one render (single-flight)
+- at most ``PDF_RENDER_MAX_PENDING`` distinct renders are queued or running;
+  beyond that ``PdfRenderBusy`` is raised instead of queueing without bound
+- a caller waits at most ``PDF_RENDER_TIMEOUT_SECONDS`` (``PdfRenderTimeout``);
+  the render itself carries on and lands in the cache for the retry
+- if worker processes cannot be started or the pool breaks, renders fall
+  back to a thread (``PDF_RENDER_WORKERS=0`` always uses threads)
+"""
+
+from typing import Dict, Optional
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.core.config import settings
+from app.services.pdf_service import init_render_worker, lookup, pdf_filename, record_render, render_to_file
+import asyncio
+import logging
+import multiprocessing
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PdfRenderBusy(Exception):
+    """Too many renders already queued"""
+
+
+class PdfRenderTimeout(Exception):
+    """The render did not finish within the caller's timeout"""
+
+
+class PdfRenderPool:
+    def __init__(self, workers: int = settings.PDF_RENDER_WORKERS,
+                 max_pending: int = settings.PDF_RENDER_MAX_PENDING,
+                 timeout: float = settings.PDF_RENDER_TIMEOUT_SECONDS, use_processes: bool = True):
+        self.workers = workers
+        self.use_processes = use_processes and workers > 0
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Receipt file name -> render in progress
+        self._in_flight: Dict[str, Future] = {}
+        self.metrics = {
+            "renders": 0,
+            "shared": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "thread_fallbacks": 0,
+        }
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="pdf-render")
+        return self._threads
+
+    def _submit(self, fields: Dict) -> Future:
+        """Hand a render to the process pool, or to a thread if processes are unavailable"""
+        if self.use_processes:
+            try:
+                if self._processes is None:
+                    # spawn: never fork a process that is running an event loop and threads
+                    self._processes = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                        initializer=init_render_worker
+                    )
+                return self._processes.submit(render_to_file, fields, settings.PDF_DIR)
+            except (BrokenProcessPool, OSError, RuntimeError) as e:
+                logger.warning(f"PDF process pool unavailable ({e}); rendering in a thread")
+                self._discard_processes()
+                if not isinstance(e, BrokenProcessPool):
+                    # Processes cannot be started here at all; a broken pool is simply replaced
+                    self.use_processes = False
+                self.metrics["thread_fallbacks"] += 1
+        return self._thread_pool().submit(render_to_file, fields, settings.PDF_DIR)
+
+    def _discard_processes(self):
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+    def _finished(self, key: str, future: Future):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            record_render(*future.result())
+            return
+        self.metrics["failures"] += 1
+        if isinstance(error, BrokenProcessPool):
+            # A worker died; start a fresh pool for the next render
+            with self._lock:
+                self._discard_processes()
+        logger.error(f"PDF render failed: {error}")
+
+    def submit(self, fields: Dict) -> Future:
+        """Start the render of these receipt fields, or join the one in progress; the Future yields (path, seconds)"""
+        key = pdf_filename(fields)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.metrics["shared"] += 1
+                return future
+            if len(self._in_flight) >= self.max_pending:
+                self.metrics["rejected"] += 1
+                raise PdfRenderBusy(f"{len(self._in_flight)} PDF renders already pending")
+            future = self._submit(fields)
+            self._in_flight[key] = future
+            self.metrics["renders"] += 1
+        future.add_done_callback(lambda done: self._finished(key, done))
+        return future
+
+    async def render(self, fields: Dict) -> str:
+        """Path of the cached receipt, rendering it off the event loop on a miss"""
+        filepath = lookup(fields)
+        if filepath is not None:
+            return filepath
+        future = self.submit(fields)
+        try:
+            # shield: a caller timing out must not cancel the render other callers share
+            filepath, _ = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+            return filepath
+        except asyncio.TimeoutError:
+            self.metrics["timeouts"] += 1
+            raise PdfRenderTimeout(f"PDF render took longer than {self.timeout}s")
+        except BrokenProcessPool:
+            self.metrics["thread_fallbacks"] += 1
+            filepath, elapsed = await asyncio.to_thread(render_to_file, fields, settings.PDF_DIR)
+            record_render(filepath, elapsed)
+            return filepath
+
+    def prefetch(self, fields: Dict):
+        """Start rendering a receipt that is about to be linked, without waiting for it"""
+        if lookup(fields) is not None:
+            return
+        try:
+            self.submit(fields)
+        except PdfRenderBusy:
+            pass  # rendered on request instead
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = len(self._in_flight)
+        mode = "processes" if self.use_processes else "threads"
+        return {"mode": mode, "workers": self.workers, "pending": pending,
+                "max_pending": self.max_pending, **self.metrics}
+
+    def shutdown(self):
+        with self._lock:
+            self._discard_processes()
+            if self._threads is not None:
+                self._threads.shutdown(wait=False, cancel_futures=True)
+                self._threads = None
+
+
+pdf_render_pool = PdfRenderPool()
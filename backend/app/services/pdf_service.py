@@ -1,135 +1,361 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Table,
-    TableStyle,
-)
-from app.db.models import PropertyTax
-from app.core.config import settings
-import os
-from pathlib import Path
-import logging
-
-logger = logging.getLogger(__name__)
-
-# Ensure PDF directory exists
-Path(settings.PDF_DIR).mkdir(parents=True, exist_ok=True)
-
-
-def generate_property_tax_pdf(tax_record: PropertyTax) -> str:
-    """
-    Generate property tax PDF.
-    Returns public URL path instead of local filesystem path.
-    """
-    try:
-        filename = f"property_tax_{tax_record.property_id}.pdf"
-        filepath = os.path.join(settings.PDF_DIR, filename)
-
-        # Create PDF document
-        doc = SimpleDocTemplate(filepath, pagesize=letter)
-        story = []
-
-        styles = getSampleStyleSheet()
-
-        title_style = ParagraphStyle(
-            "CustomTitle",
-            parent=styles["Heading1"],
-            fontSize=20,
-            textColor=colors.HexColor("#1a237e"),
-            spaceAfter=30,
-            alignment=1,
-        )
-
-        heading_style = ParagraphStyle(
-            "CustomHeading",
-            parent=styles["Heading2"],
-            fontSize=14,
-            textColor=colors.HexColor("#283593"),
-            spaceAfter=12,
-        )
-
-        normal_style = styles["Normal"]
-
-        # Title
-        story.append(Paragraph("VMC Property Tax Receipt", title_style))
-        story.append(Spacer(1, 0.3 * inch))
-
-        # Property Details Table
-        story.append(Paragraph("Property Details", heading_style))
-
-        details_data = [
-            ["Property ID:", tax_record.property_id],
-            ["Owner Name:", tax_record.owner_name],
-            ["Address:", tax_record.address],
-            ["Year:", str(tax_record.year)],
-            ["Amount:", f"Rs. {tax_record.amount:,.2f}"],
-            ["Status:", tax_record.status.value.upper()],
-        ]
-
-        if tax_record.bill_no:
-            details_data.append(["Bill No:", tax_record.bill_no])
-
-        if tax_record.receipt_no:
-            details_data.append(["Receipt No:", tax_record.receipt_no])
-
-        details_table = Table(details_data, colWidths=[2 * inch, 4 * inch])
-        details_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#e3f2fd")),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.grey),
-                    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                    ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 10),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                    ("TOPPADDING", (0, 0), (-1, -1), 8),
-                ]
-            )
-        )
-
-        story.append(details_table)
-        story.append(Spacer(1, 0.3 * inch))
-
-        # Status message
-        status_messages = {
-            "paid": "This property tax has been paid successfully.",
-            "due": "This property tax is due. Please pay soon.",
-            "pending": "This property tax is pending verification.",
-        }
-
-        status_msg = status_messages.get(tax_record.status.value)
-
-        if status_msg:
-            story.append(Paragraph(status_msg, normal_style))
-            story.append(Spacer(1, 0.2 * inch))
-
-        # Footer
-        story.append(Spacer(1, 0.5 * inch))
-        story.append(
-            Paragraph(
-                "This is a system-generated document.",
-                ParagraphStyle(
-                    "Footer",
-                    parent=normal_style,
-                    fontSize=8,
-                    textColor=colors.grey,
-                    alignment=1,
-                ),
-            )
-        )
-
-        doc.build(story)
-
-        logger.info(f"PDF generated successfully: {filepath}")
-
-        # Return public URL path instead of local file path
-        return f"/pdfs/{filename}"
-
-    except Exception as e:
-        logger.error(f"Error generating PDF: {e}")
-        raise
+"""
+Property tax receipt PDFs, rendered once per distinct record.
+
+Each file is named after a hash of the record's printed fields and
+``TEMPLATE_VERSION``, so an unchanged record is served from ``PDF_DIR``
+without rendering, and a changed record (or template) gets a new file while
+requests still serving the old one are unaffected. Files are written to a
+temporary name and renamed into place, so a reader never sees a partial PDF.
+Least recently used files are evicted once the directory exceeds
+``PDF_CACHE_MAX_MB``.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    PageBreak,
+    SimpleDocTemplate,
+    Paragraph,
+    Spacer,
+    Table,
+    TableStyle,
+)
+from app.db.models import PropertyTax
+from app.core.config import settings
+from app.services.events import PropertyTaxUpdated, event_bus
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout below changes, so cached receipts are re-rendered
+TEMPLATE_VERSION = "1"
+
+PDF_NAME_RE = re.compile(r"^property_tax_(?P<property_id>.+)_(?P<key>[0-9a-f]{16})\.pdf$")
+
+_cache_lock = threading.Lock()
+# Bytes currently in PDF_DIR; None until the directory has been scanned
+_cache_bytes = None
+pdf_cache_metrics: Dict = {
+    "hits": 0,
+    "misses": 0,
+    "render_seconds_total": 0.0,
+    "evictions": 0,
+    "evicted_bytes": 0,
+    "invalidations": 0,
+}
+
+
+def receipt_fields(tax_record: PropertyTax) -> Dict:
+    """The fields printed on a receipt, as plain values"""
+    return {
+        "property_id": tax_record.property_id,
+        "owner_name": tax_record.owner_name,
+        "address": tax_record.address,
+        "year": tax_record.year,
+        "amount": tax_record.amount,
+        "status": tax_record.status.value,
+        "bill_no": tax_record.bill_no,
+        "receipt_no": tax_record.receipt_no,
+    }
+
+
+def render_key(fields: Dict) -> str:
+    payload = json.dumps([TEMPLATE_VERSION, fields], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def pdf_filename(fields: Dict) -> str:
+    return f"property_tax_{fields['property_id']}_{render_key(fields)}.pdf"
+
+
+@lru_cache(maxsize=None)
+def receipt_styles() -> Dict:
+    """Paragraph and table styles, built once per process"""
+    styles = getSampleStyleSheet()
+    normal_style = styles["Normal"]
+    return {
+        "title": ParagraphStyle(
+            "CustomTitle",
+            parent=styles["Heading1"],
+            fontSize=20,
+            textColor=colors.HexColor("#1a237e"),
+            spaceAfter=30,
+            alignment=1,
+        ),
+        "heading": ParagraphStyle(
+            "CustomHeading",
+            parent=styles["Heading2"],
+            fontSize=14,
+            textColor=colors.HexColor("#283593"),
+            spaceAfter=12,
+        ),
+        "normal": normal_style,
+        "footer": ParagraphStyle(
+            "Footer",
+            parent=normal_style,
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=1,
+        ),
+        "details": TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#e3f2fd")),
+                ("GRID", (0, 0), (-1, -1), 1, colors.grey),
+                ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+                ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
+                ("FONTSIZE", (0, 0), (-1, -1), 10),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+                ("TOPPADDING", (0, 0), (-1, -1), 8),
+            ]
+        ),
+    }
+
+
+def init_render_worker():
+    """Process pool initializer: build the styles before the first render"""
+    receipt_styles()
+
+
+def receipt_story(fields: Dict) -> List:
+    """Flowables of one receipt page"""
+    styles = receipt_styles()
+    story = []
+
+    # Title
+    story.append(Paragraph("VMC Property Tax Receipt", styles["title"]))
+    story.append(Spacer(1, 0.3 * inch))
+
+    # Property Details Table
+    story.append(Paragraph("Property Details", styles["heading"]))
+
+    details_data = [
+        ["Property ID:", fields["property_id"]],
+        ["Owner Name:", fields["owner_name"]],
+        ["Address:", fields["address"]],
+        ["Year:", str(fields["year"])],
+        ["Amount:", f"Rs. {fields['amount']:,.2f}"],
+        ["Status:", fields["status"].upper()],
+    ]
+
+    if fields["bill_no"]:
+        details_data.append(["Bill No:", fields["bill_no"]])
+
+    if fields["receipt_no"]:
+        details_data.append(["Receipt No:", fields["receipt_no"]])
+
+    details_table = Table(details_data, colWidths=[2 * inch, 4 * inch])
+    details_table.setStyle(styles["details"])
+
+    story.append(details_table)
+    story.append(Spacer(1, 0.3 * inch))
+
+    # Status message
+    status_messages = {
+        "paid": "This property tax has been paid successfully.",
+        "due": "This property tax is due. Please pay soon.",
+        "pending": "This property tax is pending verification.",
+    }
+
+    status_msg = status_messages.get(fields["status"])
+
+    if status_msg:
+        story.append(Paragraph(status_msg, styles["normal"]))
+        story.append(Spacer(1, 0.2 * inch))
+
+    # Footer
+    story.append(Spacer(1, 0.5 * inch))
+    story.append(Paragraph("This is a system-generated document.", styles["footer"]))
+    return story
+
+
+def render_property_tax_pdf(fields: Dict, filepath: str):
+    """Render a receipt for receipt_fields() output to filepath"""
+    SimpleDocTemplate(filepath, pagesize=letter).build(receipt_story(fields))
+
+
+def render_receipts_pdf(receipts: List[Dict]) -> bytes:
+    """One PDF with a page per receipt, in order"""
+    buffer = io.BytesIO()
+    story = []
+    for i, fields in enumerate(receipts):
+        if i:
+            story.append(PageBreak())
+        story.extend(receipt_story(fields))
+    SimpleDocTemplate(buffer, pagesize=letter).build(story)
+    return buffer.getvalue()
+
+
+def _cached_files():
+    """(path, size, mtime) of every receipt in PDF_DIR"""
+    files = []
+    try:
+        with os.scandir(settings.PDF_DIR) as entries:
+            for entry in entries:
+                if entry.is_file() and PDF_NAME_RE.match(entry.name):
+                    stat = entry.stat()
+                    files.append((entry.path, stat.st_size, stat.st_mtime))
+    except FileNotFoundError:
+        pass
+    return files
+
+
+def _remove(path: str) -> int:
+    """Delete a cached file; returns the bytes freed. Open readers keep their copy (POSIX)."""
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+        return size
+    except FileNotFoundError:
+        return 0
+
+
+def evict(max_bytes: int = None) -> int:
+    """Delete least recently used receipts until PDF_DIR is within 90% of max_bytes; returns files removed"""
+    global _cache_bytes
+    max_bytes = settings.PDF_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    files = sorted(_cached_files(), key=lambda f: f[2])
+    total = sum(size for _, size, _ in files)
+    removed = freed = 0
+    for path, size, _ in files:
+        if total - freed <= max_bytes * 0.9:
+            break
+        freed += _remove(path)
+        removed += 1
+    with _cache_lock:
+        _cache_bytes = total - freed
+        pdf_cache_metrics["evictions"] += removed
+        pdf_cache_metrics["evicted_bytes"] += freed
+    if removed:
+        logger.info(f"Evicted {removed} cached PDFs ({freed / 1024 / 1024:.1f} MB)")
+    return removed
+
+
+def _account(added_bytes: int):
+    global _cache_bytes
+    with _cache_lock:
+        if _cache_bytes is not None:
+            _cache_bytes += added_bytes
+        over = _cache_bytes is None or _cache_bytes > settings.PDF_CACHE_MAX_MB * 1024 * 1024
+    if over:
+        evict()
+
+
+def invalidate(property_ids: Iterable[str]) -> int:
+    """Delete every cached receipt of these properties; returns files removed"""
+    wanted = set(property_ids)
+    removed = freed = 0
+    for path, _, _ in _cached_files():
+        if PDF_NAME_RE.match(os.path.basename(path)).group("property_id") in wanted:
+            freed += _remove(path)
+            removed += 1
+    if freed:
+        _account(-freed)
+    with _cache_lock:
+        pdf_cache_metrics["invalidations"] += removed
+    return removed
+
+
+def lookup(fields: Dict) -> Optional[str]:
+    """Path of the cached receipt for these fields, or None on a miss"""
+    filepath = os.path.join(settings.PDF_DIR, pdf_filename(fields))
+    try:
+        # Refresh the mtime so eviction sees the file as recently used
+        os.utime(filepath)
+    except FileNotFoundError:
+        return None
+    with _cache_lock:
+        pdf_cache_metrics["hits"] += 1
+    return filepath
+
+
+def render_to_file(fields: Dict, pdf_dir: str) -> Tuple[str, float]:
+    """
+    Render the receipt into pdf_dir under its cache name, atomically.
+    Returns (path, seconds). Runs in PDF render worker processes, so it
+    touches nothing but the filesystem.
+    """
+    filepath = os.path.join(pdf_dir, pdf_filename(fields))
+    # Normally created on startup; CLI scripts may render without it
+    Path(pdf_dir).mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    fd, tmp_path = tempfile.mkstemp(prefix=".render-", suffix=".pdf", dir=pdf_dir)
+    os.close(fd)
+    try:
+        render_property_tax_pdf(fields, tmp_path)
+        os.replace(tmp_path, filepath)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return filepath, time.perf_counter() - started
+
+
+def record_render(filepath: str, elapsed: float):
+    """Account a finished render (metrics, PDF_DIR size and eviction)"""
+    with _cache_lock:
+        pdf_cache_metrics["misses"] += 1
+        pdf_cache_metrics["render_seconds_total"] += elapsed
+    logger.info(f"PDF generated successfully: {filepath} ({elapsed * 1000:.0f} ms)")
+    _account(os.path.getsize(filepath))
+
+
+def cached_pdf_path(fields: Dict) -> str:
+    """Filesystem path of the receipt for these fields, rendering it in this thread on a cache miss"""
+    filepath = lookup(fields)
+    if filepath is None:
+        filepath, elapsed = render_to_file(fields, settings.PDF_DIR)
+        record_render(filepath, elapsed)
+    return filepath
+
+
+def pdf_url(filepath: str) -> str:
+    """Public URL path of a cached receipt (served from the /pdfs mount)"""
+    return f"/pdfs/{os.path.basename(filepath)}"
+
+
+def generate_property_tax_pdf(tax_record: PropertyTax) -> str:
+    """
+    Generate property tax PDF (or reuse the cached one).
+    Returns public URL path instead of local filesystem path.
+    """
+    try:
+        return pdf_url(cached_pdf_path(receipt_fields(tax_record)))
+    except Exception as e:
+        logger.error(f"Error generating PDF: {e}")
+        raise
+
+
+def pdf_cache_stats() -> Dict:
+    files = _cached_files()
+    with _cache_lock:
+        stats = dict(pdf_cache_metrics)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else None
+    stats["render_seconds_total"] = round(stats["render_seconds_total"], 3)
+    stats["cached_files"] = len(files)
+    stats["cached_bytes"] = sum(size for _, size, _ in files)
+    stats["max_bytes"] = settings.PDF_CACHE_MAX_MB * 1024 * 1024
+    return stats
+
+
+def _on_property_tax_updated(event: PropertyTaxUpdated):
+    # Superseded receipts would only be evicted eventually; free the space now
+    invalidate(event.property_ids)
+
+
+event_bus.subscribe(PropertyTaxUpdated, _on_property_tax_updated)
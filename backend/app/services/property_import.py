@@ -0,0 +1,283 @@
+"""
+Bulk import of the property tax roll from CSV or Excel.
+
+Rows are streamed from the file, validated and upserted in chunks of
+``PROPERTY_IMPORT_BATCH_SIZE``, one transaction per chunk, keyed on
+``property_id``. PostgreSQL loads each chunk with COPY into a temporary table
+followed by one INSERT ... ON CONFLICT; SQLite and MySQL execute a single
+upsert statement over the whole chunk (the MySQL driver rewrites it into
+multi-row INSERTs). Invalid rows are skipped and reported with their line
+number. A PropertyTaxUpdated event is published per committed chunk so
+property caches can drop the affected entries.
+"""
+
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import PropertyTax, TaxStatus
+from app.db.upsert import upsert_statement
+from app.services.events import PropertyTaxUpdated, event_bus
+import csv
+import io
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ("property_id", "owner_name", "address", "amount", "status", "year")
+OPTIONAL_COLUMNS = ("receipt_no", "bill_no", "ward_number")
+IMPORT_COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+
+# Header spellings seen in municipal exports -> column
+HEADER_ALIASES = {
+    "property_no": "property_id",
+    "property_number": "property_id",
+    "owner": "owner_name",
+    "tax_amount": "amount",
+    "receipt_number": "receipt_no",
+    "bill_number": "bill_no",
+    "ward": "ward_number",
+    "ward_no": "ward_number",
+}
+
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_upserted = 0
+        self.chunks = 0
+        self.error_count = 0
+        self.errors: List[Dict] = []
+        self.started = time.perf_counter()
+        self.elapsed_seconds = 0.0
+
+    def add_error(self, line: int, property_id: Optional[str], error: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "property_id": property_id, "error": error})
+
+    def finish(self):
+        self.elapsed_seconds = time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "rows_read": self.rows_read,
+            "rows_upserted": self.rows_upserted,
+            "rows_rejected": self.error_count,
+            "chunks": self.chunks,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+        }
+
+
+def normalize_header(name) -> str:
+    key = str(name or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return HEADER_ALIASES.get(key, key)
+
+
+def _check_headers(headers: List[str]):
+    missing = [column for column in REQUIRED_COLUMNS if column not in headers]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+
+def read_csv_rows(stream: IO[str]) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, raw row) from a CSV text stream"""
+    reader = csv.reader(stream)
+    headers = [normalize_header(name) for name in next(reader, [])]
+    _check_headers(headers)
+    for row in reader:
+        if any(cell.strip() for cell in row):
+            yield reader.line_num, dict(zip(headers, row))
+
+
+def read_excel_rows(source) -> Iterator[Tuple[int, Dict]]:
+    """Yield (row number, raw row) from the first sheet of an .xlsx workbook (needs openpyxl)"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Excel import needs the openpyxl package (pip install openpyxl)")
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [normalize_header(name) for name in next(rows, ())]
+        _check_headers(headers)
+        for line, row in enumerate(rows, start=2):
+            if any(cell not in (None, "") for cell in row):
+                yield line, dict(zip(headers, row))
+    finally:
+        workbook.close()
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def normalize_ward(value) -> Optional[str]:
+    """ "10", "ward 10" or "Ward No. 10" -> "Ward 10" (the form users.ward_number uses)"""
+    text = _text(value)
+    if not text:
+        return None
+    digits = re.sub(r"^ward\s*(no\.?)?\s*", "", text, flags=re.IGNORECASE)
+    return f"Ward {int(digits)}" if digits.isdigit() else text
+
+
+def validate_row(raw: Dict) -> Dict:
+    """Clean one row into PropertyTax column values; raises ValueError on bad data"""
+    row = {}
+    for column in ("property_id", "owner_name", "address"):
+        row[column] = _text(raw.get(column))
+        if not row[column]:
+            raise ValueError(f"{column} is required")
+    row["property_id"] = row["property_id"].upper()
+    if len(row["property_id"]) > 50 or len(row["owner_name"]) > 100:
+        raise ValueError("property_id or owner_name is too long")
+
+    amount = _text(raw.get("amount")).replace(",", "").replace("₹", "")
+    try:
+        row["amount"] = float(amount)
+    except ValueError:
+        raise ValueError(f"Invalid amount: {amount!r}")
+    if row["amount"] < 0:
+        raise ValueError("amount must not be negative")
+
+    status = _text(raw.get("status")).lower()
+    try:
+        row["status"] = TaxStatus(status)
+    except ValueError:
+        raise ValueError(f"Invalid status: {status!r} (expected paid, due or pending)")
+
+    year = _text(raw.get("year"))
+    if not year.isdigit() or not 1900 <= int(year) <= 2100:
+        raise ValueError(f"Invalid year: {year!r}")
+    row["year"] = int(year)
+
+    for column in ("receipt_no", "bill_no"):
+        row[column] = _text(raw.get(column)) or None
+    row["ward_number"] = normalize_ward(raw.get("ward_number"))
+    if row["ward_number"] and len(row["ward_number"]) > 10:
+        raise ValueError(f"Invalid ward: {row['ward_number']!r}")
+    return row
+
+
+def _copy_upsert(db, rows: List[Dict], now: datetime):
+    """PostgreSQL fast path: COPY the chunk into a temp table, then one INSERT ... ON CONFLICT"""
+    columns = list(IMPORT_COLUMNS) + ["created_at", "updated_at"]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            row[c].name if c == "status" else ("" if row[c] is None else row[c]) for c in IMPORT_COLUMNS
+        ] + [now.isoformat(), now.isoformat()])
+    buffer.seek(0)
+
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in IMPORT_COLUMNS[1:] + ("updated_at",))
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS property_tax_import "
+            "(LIKE property_tax INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        cursor.copy_expert(
+            f"COPY property_tax_import ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '')", buffer
+        )
+        cursor.execute(
+            f"INSERT INTO property_tax ({', '.join(columns)}) "
+            f"SELECT {', '.join(columns)} FROM property_tax_import "
+            f"ON CONFLICT (property_id) DO UPDATE SET {updates}"
+        )
+    finally:
+        cursor.close()
+
+
+def _executemany_upsert(db, rows: List[Dict], now: datetime):
+    """One upsert statement, compiled once and executed for every row of the chunk"""
+    statement = upsert_statement(
+        db.get_bind().dialect.name, PropertyTax.__table__, None,
+        ["property_id"], list(IMPORT_COLUMNS[1:]) + ["updated_at"]
+    )
+    db.execute(statement, [dict(row, created_at=now, updated_at=now) for row in rows])
+
+
+def upsert_chunk(db, rows: List[Dict]):
+    """Upsert one chunk of validated rows (unique property_ids) and commit"""
+    now = datetime.utcnow()
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_upsert(db, rows, now)
+    else:
+        _executemany_upsert(db, rows, now)
+    db.commit()
+    event_bus.publish(PropertyTaxUpdated(property_ids=tuple(row["property_id"] for row in rows), updated_at=now))
+
+
+def import_property_rows(rows: Iterable[Tuple[int, Dict]], batch_size: int = settings.PROPERTY_IMPORT_BATCH_SIZE,
+                         session_factory=SessionLocal) -> ImportReport:
+    """Validate and upsert (line, raw row) pairs chunk by chunk"""
+    report = ImportReport()
+    db = session_factory()
+
+    def flush(chunk: Dict[str, Dict]):
+        if chunk:
+            upsert_chunk(db, list(chunk.values()))
+            report.rows_upserted += len(chunk)
+            report.chunks += 1
+
+    try:
+        # property_id -> row; a repeated ID within a chunk keeps its last row
+        chunk: Dict[str, Dict] = {}
+        for line, raw in rows:
+            report.rows_read += 1
+            try:
+                row = validate_row(raw)
+            except ValueError as e:
+                report.add_error(line, _text(raw.get("property_id")) or None, str(e))
+                continue
+            chunk[row["property_id"]] = row
+            if len(chunk) >= batch_size:
+                flush(chunk)
+                chunk = {}
+        flush(chunk)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        report.finish()
+
+    logger.info(
+        f"Imported {report.rows_upserted} property tax rows ({report.error_count} rejected) "
+        f"in {report.elapsed_seconds:.1f}s, {report.rows_per_second:.0f} rows/s"
+    )
+    return report
+
+
+def import_property_file(source, filename: str, batch_size: int = settings.PROPERTY_IMPORT_BATCH_SIZE,
+                         session_factory=SessionLocal) -> ImportReport:
+    """Import a .csv or .xlsx file (path or binary file object)"""
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        rows = read_excel_rows(source)
+        return import_property_rows(rows, batch_size, session_factory)
+    if not filename.lower().endswith(".csv"):
+        raise ValueError("Unsupported file type; expected .csv or .xlsx")
+    if isinstance(source, str):
+        with open(source, encoding="utf-8-sig", newline="") as stream:
+            return import_property_rows(read_csv_rows(stream), batch_size, session_factory)
+    stream = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        return import_property_rows(read_csv_rows(stream), batch_size, session_factory)
+    finally:
+        stream.detach()
@@ -0,0 +1,268 @@
+"""
+Batch property tax receipts for a ward, year or status.
+
+A batch selects the matching property_tax rows and renders their receipts in
+a process pool of its own (so a billing run does not starve interactive
+``/api/property-tax/pdf`` renders), in chunks of ``RECEIPT_BATCH_CHUNK``
+receipts per task. Each worker builds the ReportLab styles once, in its
+initializer. Output is streamed as either:
+
+- zip: one PDF per property. Receipts already in the PDF cache are added
+  straight away; misses are rendered into the cache and added as each chunk
+  completes, so the archive is written on the fly. If a chunk fails to
+  render the stream is aborted, so the download fails instead of yielding an
+  archive with receipts silently missing.
+- pdf: one merged document, a page per property in property_id order. Each
+  chunk renders to a multi-page PDF and the parts are joined with pypdf.
+
+Progress of each batch (rendered, cached, failed, receipts per second) is kept
+in ``batch_jobs`` for the progress endpoint and the CLI.
+"""
+
+from typing import Dict, Iterator, List, Optional
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pypdf import PdfWriter
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.models import PropertyTax, TaxStatus
+from app.services.pdf_service import (
+    init_render_worker, lookup, receipt_fields, record_render, render_receipts_pdf, render_to_file
+)
+from app.services.property_import import normalize_ward
+import io
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "zip": ("application/zip", "zip"),
+    "pdf": ("application/pdf", "pdf"),
+}
+MAX_TRACKED_JOBS = 50
+
+_jobs_lock = threading.Lock()
+batch_jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+
+
+class ChunkFailed(Exception):
+    """A chunk of receipts could not be rendered; the batch is aborted"""
+
+
+class BatchJob:
+    def __init__(self, total: int, output: str, filters: Dict):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.total = total
+        self.output = output
+        self.filters = filters
+        self.rendered = 0
+        self.cached = 0
+        self.failed = 0
+        self.state = "running"
+        self.error: Optional[str] = None
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+        self.elapsed_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def advance(self, rendered: int = 0, cached: int = 0, failed: int = 0):
+        with self._lock:
+            self.rendered += rendered
+            self.cached += cached
+            self.failed += failed
+            self.elapsed_seconds = time.perf_counter() - self._started
+
+    def finish(self, error: Optional[str] = None):
+        with self._lock:
+            self.state = "failed" if error else "done"
+            self.error = error
+            self.elapsed_seconds = time.perf_counter() - self._started
+        logger.info(
+            f"Receipt batch {self.job_id} {self.state}: {self.done}/{self.total} receipts "
+            f"in {self.elapsed_seconds:.1f}s ({self.receipts_per_second:.1f}/s)"
+        )
+
+    @property
+    def done(self) -> int:
+        return self.rendered + self.cached + self.failed
+
+    @property
+    def receipts_per_second(self) -> float:
+        return self.done / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "state": self.state,
+                "output": self.output,
+                "filters": self.filters,
+                "total": self.total,
+                "rendered": self.rendered,
+                "cached": self.cached,
+                "failed": self.failed,
+                "progress": round(self.done / self.total, 4) if self.total else 1.0,
+                "started_at": self.started_at.isoformat(),
+                "elapsed_seconds": round(self.elapsed_seconds, 3),
+                "receipts_per_second": round(self.receipts_per_second, 1),
+                "error": self.error,
+            }
+
+
+def start_job(total: int, output: str, filters: Dict) -> BatchJob:
+    job = BatchJob(total, output, filters)
+    with _jobs_lock:
+        batch_jobs[job.job_id] = job
+        while len(batch_jobs) > MAX_TRACKED_JOBS:
+            batch_jobs.popitem(last=False)
+    return job
+
+
+def select_receipts(db, ward: Optional[str] = None, year: Optional[int] = None,
+                    status: Optional[TaxStatus] = None) -> List[Dict]:
+    """Receipt fields of the matching properties, in property_id order"""
+    query = select(PropertyTax).order_by(PropertyTax.property_id)
+    if ward:
+        query = query.where(PropertyTax.ward_number == normalize_ward(ward))
+    if year:
+        query = query.where(PropertyTax.year == year)
+    if status:
+        query = query.where(PropertyTax.status == status)
+    rows = db.execute(query.limit(settings.RECEIPT_BATCH_MAX + 1)).scalars().all()
+    if len(rows) > settings.RECEIPT_BATCH_MAX:
+        raise ValueError(f"More than {settings.RECEIPT_BATCH_MAX} receipts match; narrow the filter")
+    return [receipt_fields(row) for row in rows]
+
+
+def render_chunk_to_files(receipts: List[Dict], pdf_dir: str) -> List:
+    """Worker task: render receipts into the PDF cache; returns (property_id, path, seconds) per receipt"""
+    return [(fields["property_id"], *render_to_file(fields, pdf_dir)) for fields in receipts]
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_render_worker
+    )
+
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Unseekable sink for zipfile; drained after every entry so the archive streams"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_receipts_zip(receipts: List[Dict], job: BatchJob, workers: int = settings.PDF_RENDER_WORKERS,
+                      chunk_size: int = settings.RECEIPT_BATCH_CHUNK) -> Iterator[bytes]:
+    """Stream a zip of one receipt PDF per property"""
+    buffer = _StreamBuffer()
+    executor = None
+    try:
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            misses = []
+            for fields in receipts:
+                path = lookup(fields)
+                if path is None:
+                    misses.append(fields)
+                    continue
+                try:
+                    archive.write(path, f"property_tax_{fields['property_id']}.pdf")
+                except FileNotFoundError:
+                    # Evicted or invalidated since the lookup; the archive is untouched until the file opens
+                    misses.append(fields)
+                    continue
+                job.advance(cached=1)
+                yield buffer.drain()
+
+            if misses:
+                executor = _executor(workers)
+                futures = {
+                    executor.submit(render_chunk_to_files, chunk, settings.PDF_DIR): len(chunk)
+                    for chunk in _chunks(misses, chunk_size)
+                }
+                for future in as_completed(futures):
+                    try:
+                        rendered = future.result()
+                    except Exception as e:
+                        logger.error(f"Receipt batch {job.job_id}: chunk of {futures[future]} failed: {e}")
+                        job.advance(failed=futures[future])
+                        raise ChunkFailed(f"{futures[future]} receipts failed to render: {e}") from e
+                    for property_id, path, elapsed in rendered:
+                        record_render(path, elapsed)
+                        archive.write(path, f"property_tax_{property_id}.pdf")
+                    job.advance(rendered=len(rendered))
+                    yield buffer.drain()
+        yield buffer.drain()
+        job.finish()
+    except Exception as e:
+        job.finish(error=str(e))
+        raise
+    finally:
+        if job.state == "running":
+            job.finish(error="Client disconnected")
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_receipts_pdf(receipts: List[Dict], job: BatchJob, workers: int = settings.PDF_RENDER_WORKERS,
+                      chunk_size: int = settings.RECEIPT_BATCH_CHUNK) -> Iterator[bytes]:
+    """Stream one merged PDF with a page per receipt"""
+    chunks = list(_chunks(receipts, chunk_size)) or [receipts]
+    executor = _executor(min(workers, len(chunks)))
+    try:
+        futures = [executor.submit(render_receipts_pdf, chunk) for chunk in chunks]
+        parts = []
+        for chunk, future in zip(chunks, futures):
+            parts.append(future.result())
+            job.advance(rendered=len(chunk))
+        if len(parts) == 1:
+            document = parts[0]
+        else:
+            writer = PdfWriter()
+            for part in parts:
+                writer.append(io.BytesIO(part))
+            out = io.BytesIO()
+            writer.write(out)
+            document = out.getvalue()
+        for start in range(0, len(document), 64 * 1024):
+            yield document[start:start + 64 * 1024]
+        job.finish()
+    except Exception as e:
+        job.finish(error=str(e))
+        raise
+    finally:
+        if job.state == "running":
+            job.finish(error="Client disconnected")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_receipts(output: str, receipts: List[Dict], job: BatchJob, **kwargs) -> Iterator[bytes]:
+    if output == "zip":
+        return iter_receipts_zip(receipts, job, **kwargs)
+    if output == "pdf":
+        return iter_receipts_pdf(receipts, job, **kwargs)
+    raise ValueError(f"Unsupported output: {output}")
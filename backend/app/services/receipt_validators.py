@@ -0,0 +1,116 @@
+"""
+ETag / Last-Modified validators for property tax receipts.
+
+A receipt's ETag is its render key (a hash of the printed fields and the
+template version), so it is strong and changes exactly when the PDF would.
+The last validators served for each property are remembered here, so a
+conditional request that still matches is answered 304 without touching the
+database or the renderer. Entries are dropped on ``PropertyTaxUpdated`` and
+expire after ``PDF_ETAG_TTL_SECONDS``, which bounds staleness when the roll
+is changed by another process.
+"""
+
+from typing import Dict, Iterable, NamedTuple, Optional
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from app.core.config import settings
+from app.services.events import PropertyTaxUpdated, event_bus
+from app.services.pdf_service import render_key
+import threading
+import time
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = http_date(self.last_modified)
+        return headers
+
+
+def http_date(value: datetime) -> str:
+    # Timestamps are stored as naive UTC
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def validators_for(fields: Dict, updated_at: Optional[datetime]) -> Validators:
+    return Validators(f'"{render_key(fields)}"', updated_at)
+
+
+def is_not_modified(request_headers, validators: Validators) -> bool:
+    """RFC 9110 conditional GET: If-None-Match wins; If-Modified-Since only applies without it"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, as GET allows
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return validators.etag in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and validators.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = validators.last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        return modified <= since
+    return False
+
+
+class ValidatorIndex:
+    def __init__(self, ttl_seconds: float = settings.PDF_ETAG_TTL_SECONDS, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # property_id -> (validators, remembered at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.metrics = {"not_modified": 0, "not_modified_without_db": 0, "full": 0}
+
+    def get(self, property_id: str) -> Optional[Validators]:
+        with self._lock:
+            entry = self._entries.get(property_id)
+            if entry is None:
+                return None
+            validators, remembered_at = entry
+            if time.monotonic() - remembered_at >= self.ttl_seconds:
+                del self._entries[property_id]
+                return None
+            return validators
+
+    def remember(self, property_id: str, validators: Validators):
+        with self._lock:
+            self._entries[property_id] = (validators, time.monotonic())
+            self._entries.move_to_end(property_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def forget(self, property_ids: Iterable[str]):
+        with self._lock:
+            for property_id in property_ids:
+                self._entries.pop(property_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = len(self._entries)
+        return {"entries": entries, **self.metrics}
+
+
+validator_index = ValidatorIndex()
+
+
+def _on_property_tax_updated(event: PropertyTaxUpdated):
+    validator_index.forget(event.property_ids)
+
+
+event_bus.subscribe(PropertyTaxUpdated, _on_property_tax_updated)
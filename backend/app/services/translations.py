@@ -1,95 +1,206 @@
-
-TRANSLATIONS = {
-    "en": {
-        "greeting": "Select Language / भाषा चुनें / ભાષા પસંદ કરો:\n\n1. English\n2. हिंदी\n3. ગુજરાતી",
-        "welcome_options": "Welcome to VMC Chatbot! 👋\n\nPlease select an option:\n1. Open New Complaint\n2. Track Complaint Status\n\n(Reply 0 to go back)",
-        "ask_login_id_track": "Please provide your Login ID (e.g., LOGIN-12345678):\n\n(Reply 0 to go back)",
-        "login_id_not_found": "Login ID not found. Please check and try again.",
-        "track_status_result": "Here are your complaint statuses:\n{status_list}\n\nDo you want to perform another action? (Reply: Yes/No)\n\n(Reply 0 to go back)",
-        "welcome": "Welcome to VMC Chatbot! 👋\n\nPlease provide your name:\n\n(Reply 0 to go back)",
-        "ask_mobile": "Thank you, {name}! Please provide your mobile number:\n\n(Reply 0 to go back)",
-        "ask_area_ward": "Please provide your Area and Ward Number in this format: *Area Name, Ward Number* (e.g., Alkapuri, Ward 10):\n\n(Reply 0 to go back)",
-        "invalid_area_ward": "❌ Invalid format. Please provide your Area and Ward Number exactly as: *Area Name, Ward Number* (e.g., Alkapuri, Ward 10):",
-        "login_success": "✅ Login successful!\n\nYour Login ID: {login_id}\n\nPlease select an option:\n\n1️⃣ Sewage/Potholes/Roads\n2️⃣ Garbage/Cleanliness\n3️⃣ Electricity Issues\n4️⃣ Property Tax Details\n\nReply with 1, 2, 3, or 4\n\n(Reply 0 to go back)",
-        "invalid_choice": "Invalid choice. Please reply with provided options.",
-        "ask_sub_issue": "Select an issue under {category}:\n\n{options}\n(Reply 0 to go back)",
-        "ask_description": "Please describe your issue in detail:\n\n(Reply 0 to go back)",
-        "ask_image": "Issue selected: {issue}\n\nPlease upload an image for verification:\n\n(Reply 0 to go back)",
-        "ask_gps": "✅ Image received!\n\nPlease share the GPS location of the issue where it has taken place (Use WhatsApp Location feature):\n\n(Reply 0 to go back)",
-        "solution_steps": "Location received.\n\nHere are the suggested steps:\n\n{solution}\n\nHave you completed these steps? (Reply: Yes/No)\n\n(Reply 0 to go back)",
-        "resolution_confirm": "Is your issue resolved now? (Reply: Yes/No)\n\n(Reply 0 to go back)",
-        "resolved_msg": "✅ Great! Your complaint has been marked as resolved.\n\nDo you have any other issues? (Reply: Yes/No)\n\n(Reply 0 to go back)",
-        "pending_msg": "Our team will handle it. Thank you for reporting.\n\nDo you have any other issues? (Reply: Yes/No)\n\n(Reply 0 to go back)",
-        "ask_property_id": "Please provide your Receipt Number:\n\n(Reply 0 to go back)",
-        "property_not_found": "Receipt Number '{property_id}' not found. Please check and try again.",
-        "error": "An error occurred. Please try again.",
-        "yes_no_invalid": "Please reply with Yes or No",
-        "too_many_attempts": "Too many failed attempts. For security reasons, this chat will be terminated.",
-        "invalid_mobile": "❌ Invalid mobile number. Please enter a valid 10-digit number starting with 6, 7, 8, or 9:",
-        "terminate": "Thank you for contacting us. This chat will be terminated."
-    },
-    "hi": {
-        "greeting": "Select Language / भाषा चुनें / ભાષા પસંદ કરો:\n\n1. English\n2. हिंदी\n3. ગુજરાતી",
-        "welcome_options": "वीएमसी चैटबॉट में आपका स्वागत है! 👋\n\nकृपया एक विकल्प चुनें:\n1. नई शिकायत दर्ज करें\n2. शिकायत की स्थिति ट्रैक करें\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "ask_login_id_track": "कृपया अपनी लॉगिन आईडी प्रदान करें (उदा., LOGIN-12345678):\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "login_id_not_found": "लॉगिन आईडी नहीं मिली। कृपया जांचें और पुनः प्रयास करें।",
-        "track_status_result": "आपकी शिकायतों की स्थिति यहाँ दी गई है:\n{status_list}\n\nक्या आप कोई अन्य कार्रवाई करना चाहते हैं? (उत्तर: हाँ/नहीं)\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "welcome": "कृपया अपना नाम बताएं:\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "ask_mobile": "धन्यवाद, {name}! कृपया अपना मोबाइल नंबर प्रदान करें:\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "ask_area_ward": "कृपया अपना क्षेत्र और वार्ड नंबर इस प्रारूप में प्रदान करें: *क्षेत्र का नाम, वार्ड नंबर* (जैसे, अलकापुरी, वार्ड 10):\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "invalid_area_ward": "❌ अमान्य प्रारूप। कृपया अपना क्षेत्र और वार्ड नंबर बिल्कुल इस प्रकार प्रदान करें: *क्षेत्र का नाम, वार्ड नंबर* (जैसे, अलकापुरी, वार्ड 10):",
-        "login_success": "✅ लॉगिन सफल!\n\nआपका लॉगिन आईडी: {login_id}\n\nकृपया एक विकल्प चुनें:\n\n1️⃣ सीवेज/गड्ढे/सड़कें\n2️⃣ कचरा/सफाई\n3️⃣ बिजली की समस्याएं\n4️⃣ संपत्ति कर विवरण\n\n1, 2, 3, या 4 के साथ उत्तर दें\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "invalid_choice": "अमान्य विकल्प। कृपया दिए गए विकल्पों में से उत्तर दें।",
-        "ask_sub_issue": "{category} के अंतर्गत एक समस्या चुनें:\n\n{options}\n(वापस जाने के लिए 0 उत्तर दें)",
-        "ask_description": "कृपया अपनी समस्या का विस्तार से वर्णन करें:\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "ask_image": "समस्या चयनित: {issue}\n\nकृपया सत्यापन के लिए एक छवि अपलोड करें:\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "ask_gps": "✅ छवि प्राप्त हुई!\n\nकृपया उस समस्या का जीपीएस स्थान साझा करें जहां यह हुआ है (व्हाट्सएप स्थान सुविधा का उपयोग करें):\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "solution_steps": "स्थान प्राप्त हुआ।\n\nयहाँ सुझाए गए कदम हैं:\n\n{solution}\n\nक्या आपने इन चरणों को पूरा कर लिया है? (उत्तर: हाँ/नहीं)\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "resolution_confirm": "क्या आपकी समस्या अब हल हो गई है? (उत्तर: हाँ/नहीं)\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "resolved_msg": "✅ बहुत बढ़िया! आपकी शिकायत को हल के रूप में चिह्नित किया गया है।\n\nक्या आपके पास कोई अन्य समस्याएं हैं? (उत्तर: हाँ/नहीं)\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "pending_msg": "हमारी टीम इसे संभालेगी। रिपोर्ट करने के लिए धन्यवाद।\n\nक्या आपके पास कोई अन्य समस्याएं हैं? (उत्तर: हाँ/नहीं)\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "ask_property_id": "कृपया अपना रसीद नंबर प्रदान करें:\n\n(वापस जाने के लिए 0 उत्तर दें)",
-        "property_not_found": "रसीद नंबर '{property_id}' नहीं मिला। कृपया जांचें और पुनः प्रयास करें।",
-        "error": "एक त्रुटિ हुई। कृपया पुन: प्रयास करें।",
-        "yes_no_invalid": "कृपया हाँ या नहीं में उत्तर दें",
-        "too_many_attempts": "बहुत अधिक असफल प्रयास। सुरक्षा कारणों से, यह चैट समाप्त कर दी जाएगी।",
-        "invalid_mobile": "❌ अमान्य मोबाइल नंबर। कृपया 6, 7, 8, या 9 से शुरू होने वाला 10 अंकों का मान्य नंबर दर्ज करें:",
-        "terminate": "हमसे संपर्क करने के लिए धन्यवाद। यह चैट समाप्त हो जाएगी।"
-    },
-    "gu": {
-        "greeting": "Select Language / भाषा चुनें / ભાષા પસંદ કરો:\n\n1. English\n2. हिंदी\n3. ગુજરાતી",
-        "welcome_options": "VMC ચેટબોટમાં આપનું સ્વાગત છે! 👋\n\nકૃપા કરીને એક વિકલ્પ પસંદ કરો:\n1. નવી ફરિયાદ નોંધાવો\n2. ફરિયાદની સ્થિતિ તપાસો\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "ask_login_id_track": "કૃપા કરીને તમારું લોગિન આઈડી જણાવો (દા.ત., LOGIN-12345678):\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "login_id_not_found": "લોગિન આઈડી મળી નથી. કૃપા કરીને તપાસો અને ફરી પ્રયાસ કરો.",
-        "track_status_result": "તમારી ફરિયાદોની સ્થિતિ અહીં છે:\n{status_list}\n\nશું તમે બીજી કોઈ કાર્યવાહી કરવા માંગો છો? (જવાબ: હા/ના)\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "welcome": "કૃપા કરીને તમારું નામ જણાવો:\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "ask_mobile": "આભાર, {name}! કૃપા કરીને તમારો મોબાઇલ નંબર જણાવો:\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "ask_area_ward": "કૃપા કરીને આ ફોર્મેટમાં તમારો વિસ્તાર અને વોર્ડ નંબર જણાવો: *વિસ્તારનું નામ, વોર્ડ નંબર* (દા.ત., અલકાપુરી, વોર્ડ 10):\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "invalid_area_ward": "❌ અમાન્ય ફોર્મેટ. કૃપા કરીને તમારો વિસ્તાર અને વોર્ડ નંબર બરાબર આ રીતે જણાવો: *વિસ્તારનું નામ, વોર્ડ નંબર* (દા.ત., અલકાપુરી, વોર્ડ 10):",
-        "login_success": "✅ લોગિન સફળ!\n\nતમારું લોગિન આઈડી: {login_id}\n\nકૃપા કરીને એક વિકલ્પ પસંદ કરો:\n\n1️⃣ ગટર/ખાડા/રસ્તા\n2️⃣ કચરો/સ્વચ્છતા\n3️⃣ વીજળીની સમસ્યાઓ\n4️⃣ પ્રોપર્ટી ટેક્સ વિગતો\n\n1, 2, 3, અથવા 4 સાથે જવાબ આપો\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "invalid_choice": "અમાન્ય પસંદગી. કૃપા કરીને આપેલા વિકલ્પોમાંથી જવાબ આપો.",
-        "ask_sub_issue": "{category} હેઠળ સમસ્યા પસંદ કરો:\n\n{options}\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "ask_description": "કૃપા કરીને તમારી સમસ્યાનું વિગતવાર વર્ણન કરો:\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "ask_image": "સમસ્યા પસંદ કરી: {issue}\n\nચકાસણી માટે કૃપા કરીને ફોટો અપલોડ કરો:\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "ask_gps": "✅ ઈમેજ મળી!\n\nકૃપા કરીને તે સમસ્યાનું GPS સ્થાન શેર કરો જ્યાં તે બની છે (WhatsApp સ્થાન સુવિધાનો ઉપયોગ કરો):\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "solution_steps": "સ્થાન મળ્યું.\n\nઅહીં સૂચવેલા પગલાં છે:\n\n{solution}\n\nશું તમે આ પગલાં પૂર્ણ કર્યા છે? (જવાબ: હા/ના)\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "resolution_confirm": "શું તમારી સમસ્યા હવે ઉકેલાઈ ગઈ છે? (જવાબ: હા/ના)\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "resolved_msg": "✅ સરસ! તમારી ફરિયાદ ઉકેલાઈ ગયેલ તરીકે ચિહ્નિત કરવામાં આવી છે.\n\nશું તમને કોઈ અન્ય સમસ્યાઓ છે? (જવાબ: હા/ના)\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "pending_msg": "અમારી ટીમ તેને સંભાળશે. જાણ કરવા બદલ આભાર.\n\nશું તમને કોઈ અન્ય સમસ્યાઓ છે? (જવાબ: હા/ના)\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "ask_property_id": "કૃપા કરીને તમારો રસીદ નંબર જણાવો:\n\n(પાછા જવા માટે 0 જવાબ આપો)",
-        "property_not_found": "રસીદ નંબર '{property_id}' મળી નથી. કૃપા કરીને તપાસો અને ફરી પ્રયાસ કરો.",
-        "error": "એક ભૂલ આવી. કૃપા કરીને ફરી પ્રયાસ કરો.",
-        "yes_no_invalid": "કૃપા કરીને હા અથવા ના માં જવાબ આપો",
-        "too_many_attempts": "ખૂબ જ નિષ્ફળ પ્રયાસો. સુરક્ષા કારણોસર, આ ચેટ સમાપ્ત કરવામાં આવશે.",
-        "invalid_mobile": "❌ અમાન્ય મોબાઇલ નંબર. કૃપા કરીને 6, 7, 8, અથવા 9 થી શરૂ થતો 10 અંકનો માન્ય નંબર દાખલ કરો:",
-        "terminate": "અમારો સંપર્ક કરવા બદલ આભાર. આ ચેટ સમાપ્ત થશે."
-    }
-}
-
-def get_text(key: str, lang: str = "en", **kwargs) -> str:
-    """Get translated text formatted with kwargs"""
-    lang_dict = TRANSLATIONS.get(lang, TRANSLATIONS["en"])
-    text = lang_dict.get(key, TRANSLATIONS["en"].get(key, key))
-    if kwargs:
-        return text.format(**kwargs)
-    return text
+"""
+Chatbot message catalog.
+
+Messages live in one JSON file per language under ``LOCALES_DIR``
+(``en.json``, ``hi.json``, ``gu.json``); English is the reference. On load
+every message is compiled once into flat per-language tables: messages
+without placeholders are stored ready to send, the rest also get a bound
+``format_map``, so a prompt costs two dict lookups. Loading validates that
+each translation uses exactly the placeholders of its English message, so a
+mismatch stops startup instead of raising ``KeyError`` mid-conversation.
+Missing translations fall back to English.
+
+The files are re-read when they change (checked at most every
+``TRANSLATIONS_RELOAD_SECONDS``) or on ``reload_catalog()``; a catalog that
+fails validation is logged and the previous one stays in use.
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Optional
+from string import Formatter
+from app.core.config import settings
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGE = "en"
+
+
+class CatalogError(ValueError):
+    """A locale file is unreadable or a message does not match its English placeholders"""
+
+
+class Message(NamedTuple):
+    text: str
+    fields: frozenset
+    # None when the message has no placeholders and ``text`` is final
+    render: Optional[Callable[[Dict], str]]
+
+
+def placeholders(text: str) -> frozenset:
+    fields = set()
+    for _, field, _, _ in Formatter().parse(text):
+        if field is None:
+            continue
+        name = field.split(".")[0].split("[")[0]
+        if not name or name.isdigit():
+            raise CatalogError(f"positional placeholder in {text!r}; use named placeholders")
+        fields.add(name)
+    return frozenset(fields)
+
+
+def compile_message(text: str) -> Message:
+    try:
+        fields = placeholders(text)
+    except ValueError as e:
+        raise CatalogError(f"{e} in {text!r}") from e
+    if not fields:
+        # Unescape {{ }} once, so sending it costs nothing
+        return Message(text.format(), fields, None)
+    return Message(text, fields, text.format_map)
+
+
+class Catalog:
+    def __init__(self, messages: Dict[str, Dict[str, Message]], missing: Dict[str, List[str]], versions: Dict):
+        # Language -> key -> message, with English already filled in for missing keys
+        self.messages = messages
+        self.missing = missing
+        self.versions = versions
+        # Hot-path tables: language -> key -> final text / formatter (templated messages only)
+        self.texts = {lang: {key: m.text for key, m in entries.items()} for lang, entries in messages.items()}
+        self.renderers = {
+            lang: {key: m.render for key, m in entries.items() if m.render is not None}
+            for lang, entries in messages.items()
+        }
+        self.default_texts = self.texts[DEFAULT_LANGUAGE]
+        self.default_renderers = self.renderers[DEFAULT_LANGUAGE]
+        self._words: Dict[str, tuple] = {}
+
+    @classmethod
+    def load(cls, directory: str) -> "Catalog":
+        raw, versions = {}, {}
+        try:
+            names = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+        except OSError as e:
+            raise CatalogError(f"cannot read locales from {directory}: {e}") from e
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    raw[name[:-5]] = json.load(f)
+                versions[path] = os.stat(path).st_mtime_ns
+            except (OSError, ValueError) as e:
+                raise CatalogError(f"{path}: {e}") from e
+        if DEFAULT_LANGUAGE not in raw:
+            raise CatalogError(f"{directory} has no {DEFAULT_LANGUAGE}.json")
+
+        reference = {key: compile_message(text) for key, text in raw[DEFAULT_LANGUAGE].items()}
+        messages, missing, errors = {DEFAULT_LANGUAGE: reference}, {}, []
+        for lang, entries in raw.items():
+            if lang == DEFAULT_LANGUAGE:
+                continue
+            compiled = dict(reference)
+            for key, text in entries.items():
+                if key not in reference:
+                    errors.append(f"{lang}.{key}: not in {DEFAULT_LANGUAGE}.json")
+                    continue
+                try:
+                    message = compile_message(text)
+                except CatalogError as e:
+                    errors.append(f"{lang}.{key}: {e}")
+                    continue
+                if message.fields != reference[key].fields:
+                    errors.append(
+                        f"{lang}.{key}: placeholders {sorted(message.fields)} "
+                        f"differ from {DEFAULT_LANGUAGE} {sorted(reference[key].fields)}"
+                    )
+                    continue
+                compiled[key] = message
+            messages[lang] = compiled
+            missing[lang] = sorted(set(reference) - set(entries))
+        if errors:
+            raise CatalogError("invalid translations: " + "; ".join(errors))
+        return cls(messages, missing, versions)
+
+    def is_current(self) -> bool:
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in self.versions.items())
+        except OSError:
+            return False
+
+    def words(self, key: str) -> tuple:
+        """Comma-separated word lists (e.g. accepted answers), merged across all languages"""
+        words = self._words.get(key)
+        if words is None:
+            merged = {}
+            for messages in self.messages.values():
+                message = messages.get(key)
+                if message is not None:
+                    merged.update(dict.fromkeys(w.strip().lower() for w in message.text.split(",") if w.strip()))
+            words = self._words[key] = tuple(merged)
+        return words
+
+    def summary(self) -> Dict:
+        return {
+            "languages": sorted(self.messages),
+            "messages": len(self.default_texts),
+            "missing": {lang: keys for lang, keys in self.missing.items() if keys},
+        }
+
+
+_reload_lock = threading.Lock()
+catalog = Catalog.load(settings.LOCALES_DIR)
+logger.info(f"Translations loaded: {catalog.summary()}")
+
+
+def _schedule_check() -> float:
+    if not settings.TRANSLATIONS_RELOAD_SECONDS:
+        return float("inf")
+    return time.monotonic() + settings.TRANSLATIONS_RELOAD_SECONDS
+
+
+_next_check = _schedule_check()
+_monotonic = time.monotonic
+
+
+def reload_catalog(force: bool = True) -> Dict:
+    """Re-read LOCALES_DIR (if anything changed, unless forced); raises CatalogError and keeps the old catalog if invalid"""
+    global catalog
+    with _reload_lock:
+        if not force and catalog.is_current():
+            return catalog.summary()
+        try:
+            catalog = Catalog.load(settings.LOCALES_DIR)
+        except CatalogError as e:
+            logger.error(f"Translations not reloaded: {e}")
+            raise
+        logger.info(f"Translations reloaded: {catalog.summary()}")
+        return catalog.summary()
+
+
+def _check_for_changes():
+    global _next_check
+    _next_check = _schedule_check()
+    try:
+        reload_catalog(force=False)
+    except CatalogError:
+        pass  # logged; keep serving the previous catalog
+
+
+def get_words(key: str) -> tuple:
+    """Words listed under key in any language, e.g. every accepted way of answering yes"""
+    return catalog.words(key)
+
+
+def get_text(key: str, lang: str = "en", **kwargs) -> str:
+    """Get translated text formatted with kwargs"""
+    if _monotonic() >= _next_check:
+        _check_for_changes()
+    if kwargs:
+        render = catalog.renderers.get(lang, catalog.default_renderers).get(key)
+        if render is not None:
+            return render(kwargs)
+    return catalog.texts.get(lang, catalog.default_texts).get(key, key)
@@ -1,134 +1,315 @@
-import httpx
-import logging
-from app.core.config import settings
-
-logger = logging.getLogger(__name__)
-
-class WhatsAppService:
-    def __init__(self):
-        self.base_url = f"https://graph.facebook.com/v18.0/{settings.PHONE_NUMBER_ID}/messages"
-        self.headers = {
-            "Authorization": f"Bearer {settings.WHATSAPP_TOKEN}",
-            "Content-Type": "application/json"
-        }
-
-    async def send_text_message(self, to: str, text: str):
-        payload = {
-            "messaging_product": "whatsapp",
-            "recipient_type": "individual",
-            "to": to,
-            "type": "text",
-            "text": {"body": text}
-        }
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(self.base_url, headers=self.headers, json=payload)
-                response.raise_for_status()
-                logger.info(f"Message sent to {to}: {text[:20]}...")
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Failed to send message: {e.response.text}")
-                return None
-            except Exception as e:
-                logger.error(f"Error sending message: {e}")
-                return None
-
-    async def send_button_message(self, to: str, body: str, buttons: list, footer: str = None):
-        """Send interactive button message (max 3 buttons)"""
-        interactive_data = {
-            "type": "button",
-            "body": {"text": body},
-            "action": {
-                "buttons": buttons
-            }
-        }
-        
-        if footer:
-            interactive_data["footer"] = {"text": footer}
-        
-        payload = {
-            "messaging_product": "whatsapp",
-            "recipient_type": "individual",
-            "to": to,
-            "type": "interactive",
-            "interactive": interactive_data
-        }
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(self.base_url, headers=self.headers, json=payload)
-                response.raise_for_status()
-                logger.info(f"Button message sent to {to}")
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Failed to send button message: {e.response.text}")
-                return None
-            except Exception as e:
-                logger.error(f"Error sending button message: {e}")
-                return None
-
-    async def send_list_message(self, to: str, body: str, button_text: str, sections: list, footer: str = None):
-        """Send interactive list message (up to 10 items)"""
-        interactive_data = {
-            "type": "list",
-            "body": {"text": body},
-            "action": {
-                "button": button_text,
-                "sections": sections
-            }
-        }
-        
-        if footer:
-            interactive_data["footer"] = {"text": footer}
-        
-        payload = {
-            "messaging_product": "whatsapp",
-            "recipient_type": "individual",
-            "to": to,
-            "type": "interactive",
-            "interactive": interactive_data
-        }
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(self.base_url, headers=self.headers, json=payload)
-                response.raise_for_status()
-                logger.info(f"List message sent to {to}")
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Failed to send list message: {e.response.text}")
-                return None
-            except Exception as e:
-                logger.error(f"Error sending list message: {e}")
-                return None
-
-    async def get_media_url(self, media_id: str) -> str:
-        """Get the actual URL for a media ID from WhatsApp API"""
-        url = f"https://graph.facebook.com/v18.0/{media_id}"
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                data = response.json()
-                return data.get("url")
-            except Exception as e:
-                logger.error(f"Error getting media URL: {e}")
-                return None
-
-    async def download_media(self, media_url: str, save_path: str) -> bool:
-        """Download media from WhatsApp and save to disk"""
-        async with httpx.AsyncClient() as client:
-            try:
-                # Meta media URLs require the same auth header
-                response = await client.get(media_url, headers=self.headers)
-                response.raise_for_status()
-                with open(save_path, "wb") as f:
-                    f.write(response.content)
-                logger.info(f"Media downloaded and saved to: {save_path}")
-                return True
-            except Exception as e:
-                logger.error(f"Error downloading media: {e}")
-                return False
-
-whatsapp_service = WhatsAppService()
+import hashlib
+import httpx
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+from app.core.config import settings
+from app.core.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Graph API error codes that sending the same message again cannot fix
+PERMANENT_ERROR_CODES = {
+    131026,  # recipient cannot receive messages (not on WhatsApp, outdated app)
+    131047,  # re-engagement: over 24 hours since the citizen last wrote, only templates are allowed
+    132001,  # template does not exist (in this language)
+}
+
+
+class WhatsAppSendError(Exception):
+    """The Graph API refused a message"""
+
+    def __init__(self, status_code: int, code: Optional[int], message: str):
+        super().__init__(f"WhatsApp API error {code or status_code}: {message}")
+        self.status_code = status_code
+        self.code = code
+
+    @property
+    def permanent(self) -> bool:
+        return self.code in PERMANENT_ERROR_CODES
+
+
+class WhatsAppService:
+    def __init__(self):
+        self.api_url = settings.WHATSAPP_API_URL.rstrip("/")
+        self.base_url = f"{self.api_url}/{settings.PHONE_NUMBER_ID}/messages"
+        self.upload_url = f"{self.api_url}/{settings.PHONE_NUMBER_ID}/media"
+        self.headers = {
+            "Authorization": f"Bearer {settings.WHATSAPP_TOKEN}",
+            "Content-Type": "application/json"
+        }
+        self._client: Optional[httpx.AsyncClient] = None
+        # File content hash -> (media ID, uploaded at); uploaded media stays valid on Meta's side for 30 days
+        self._media_ids: "OrderedDict[str, tuple]" = OrderedDict()
+        self._media_lock = threading.Lock()
+        self.media_metrics = {"uploads": 0, "reused": 0, "reupload_after_failure": 0}
+
+    async def start(self):
+        """Open the shared, keep-alive HTTP client (once per worker, on startup)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=10.0)
+
+    async def close(self):
+        """Close the shared HTTP client on shutdown"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def _http(self):
+        """Use the shared client when started, otherwise a short-lived one (scripts, tests)"""
+        if self._client is not None:
+            yield self._client
+        else:
+            async with httpx.AsyncClient() as client:
+                yield client
+
+    async def send_text_message(self, to: str, text: str):
+        payload = {
+            "messaging_product": "whatsapp",
+            "recipient_type": "individual",
+            "to": to,
+            "type": "text",
+            "text": {"body": text}
+        }
+        
+        async with self._http() as client:
+            try:
+                response = await client.post(self.base_url, headers=self.headers, content=dumps(payload))
+                response.raise_for_status()
+                logger.info(f"Message sent to {to}: {text[:20]}...")
+                return loads(response.content)
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Failed to send message: {e.response.text}")
+                return None
+            except Exception as e:
+                logger.error(f"Error sending message: {e}")
+                return None
+
+    async def send_notification(self, to: str, text: str):
+        """
+        Send a message the citizen did not prompt: as the NOTIFY_TEMPLATE_NAME template with text
+        as its body parameter when configured, otherwise as plain text. Raises WhatsAppSendError
+        when the API refuses it, so the caller can tell retryable errors from permanent ones.
+        """
+        payload = {"messaging_product": "whatsapp", "recipient_type": "individual", "to": to}
+        if settings.NOTIFY_TEMPLATE_NAME:
+            payload["type"] = "template"
+            payload["template"] = {
+                "name": settings.NOTIFY_TEMPLATE_NAME,
+                "language": {"code": settings.NOTIFY_TEMPLATE_LANG},
+                "components": [{"type": "body", "parameters": [{"type": "text", "text": text}]}],
+            }
+        else:
+            payload["type"] = "text"
+            payload["text"] = {"body": text}
+
+        async with self._http() as client:
+            response = await client.post(self.base_url, headers=self.headers, content=dumps(payload))
+        if response.is_error:
+            try:
+                error = loads(response.content).get("error", {})
+            except Exception:
+                error = {}
+            raise WhatsAppSendError(response.status_code, error.get("code"), error.get("message") or response.text)
+        logger.info(f"Notification sent to {to}: {text[:20]}...")
+        return loads(response.content)
+
+    async def send_button_message(self, to: str, body: str, buttons: list, footer: str = None):
+        """Send interactive button message (max 3 buttons)"""
+        interactive_data = {
+            "type": "button",
+            "body": {"text": body},
+            "action": {
+                "buttons": buttons
+            }
+        }
+        
+        if footer:
+            interactive_data["footer"] = {"text": footer}
+        
+        payload = {
+            "messaging_product": "whatsapp",
+            "recipient_type": "individual",
+            "to": to,
+            "type": "interactive",
+            "interactive": interactive_data
+        }
+        
+        async with self._http() as client:
+            try:
+                response = await client.post(self.base_url, headers=self.headers, content=dumps(payload))
+                response.raise_for_status()
+                logger.info(f"Button message sent to {to}")
+                return loads(response.content)
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Failed to send button message: {e.response.text}")
+                return None
+            except Exception as e:
+                logger.error(f"Error sending button message: {e}")
+                return None
+
+    async def send_list_message(self, to: str, body: str, button_text: str, sections: list, footer: str = None):
+        """Send interactive list message (up to 10 items)"""
+        interactive_data = {
+            "type": "list",
+            "body": {"text": body},
+            "action": {
+                "button": button_text,
+                "sections": sections
+            }
+        }
+        
+        if footer:
+            interactive_data["footer"] = {"text": footer}
+        
+        payload = {
+            "messaging_product": "whatsapp",
+            "recipient_type": "individual",
+            "to": to,
+            "type": "interactive",
+            "interactive": interactive_data
+        }
+        
+        async with self._http() as client:
+            try:
+                response = await client.post(self.base_url, headers=self.headers, content=dumps(payload))
+                response.raise_for_status()
+                logger.info(f"List message sent to {to}")
+                return loads(response.content)
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Failed to send list message: {e.response.text}")
+                return None
+            except Exception as e:
+                logger.error(f"Error sending list message: {e}")
+                return None
+
+    async def get_media_url(self, media_id: str) -> str:
+        """Get the actual URL for a media ID from WhatsApp API"""
+        url = f"{self.api_url}/{media_id}"
+        async with self._http() as client:
+            try:
+                response = await client.get(url, headers=self.headers)
+                response.raise_for_status()
+                data = loads(response.content)
+                return data.get("url")
+            except Exception as e:
+                logger.error(f"Error getting media URL: {e}")
+                return None
+
+    async def download_media(self, media_url: str, save_path: str) -> bool:
+        """Download media from WhatsApp and save to disk"""
+        async with self._http() as client:
+            try:
+                # Meta media URLs require the same auth header
+                response = await client.get(media_url, headers=self.headers)
+                response.raise_for_status()
+                with open(save_path, "wb") as f:
+                    f.write(response.content)
+                logger.info(f"Media downloaded and saved to: {save_path}")
+                return True
+            except Exception as e:
+                logger.error(f"Error downloading media: {e}")
+                return False
+
+    async def upload_media(self, content: bytes, filename: str, mime_type: str) -> Optional[str]:
+        """Upload a file to the Graph media endpoint and return its media ID"""
+        # Multipart body: the JSON Content-Type header must not be sent
+        headers = {"Authorization": self.headers["Authorization"]}
+        async with self._http() as client:
+            try:
+                response = await client.post(
+                    self.upload_url,
+                    headers=headers,
+                    data={"messaging_product": "whatsapp", "type": mime_type},
+                    files={"file": (filename, content, mime_type)},
+                )
+                response.raise_for_status()
+                media_id = loads(response.content).get("id")
+                logger.info(f"Uploaded {filename} as media {media_id}")
+                return media_id
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Failed to upload media: {e.response.text}")
+                return None
+            except Exception as e:
+                logger.error(f"Error uploading media: {e}")
+                return None
+
+    async def send_document(self, to: str, media_id: str, filename: str, caption: str = None):
+        """Send an uploaded file as a document message"""
+        document = {"id": media_id, "filename": filename}
+        if caption:
+            document["caption"] = caption
+
+        payload = {
+            "messaging_product": "whatsapp",
+            "recipient_type": "individual",
+            "to": to,
+            "type": "document",
+            "document": document
+        }
+
+        async with self._http() as client:
+            try:
+                response = await client.post(self.base_url, headers=self.headers, content=dumps(payload))
+                response.raise_for_status()
+                logger.info(f"Document {filename} sent to {to}")
+                return loads(response.content)
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Failed to send document: {e.response.text}")
+                return None
+            except Exception as e:
+                logger.error(f"Error sending document: {e}")
+                return None
+
+    def _cached_media_id(self, content_hash: str) -> Optional[str]:
+        with self._media_lock:
+            entry = self._media_ids.get(content_hash)
+            if entry is None:
+                return None
+            media_id, uploaded_at = entry
+            if time.monotonic() - uploaded_at >= settings.WHATSAPP_MEDIA_TTL_HOURS * 3600:
+                del self._media_ids[content_hash]
+                return None
+            self._media_ids.move_to_end(content_hash)
+            return media_id
+
+    def _remember_media_id(self, content_hash: str, media_id: Optional[str]):
+        with self._media_lock:
+            if media_id is None:
+                self._media_ids.pop(content_hash, None)
+                return
+            self._media_ids[content_hash] = (media_id, time.monotonic())
+            while len(self._media_ids) > settings.WHATSAPP_MEDIA_CACHE_SIZE:
+                self._media_ids.popitem(last=False)
+
+    async def send_file_document(self, to: str, path: str, filename: str = None,
+                                 caption: str = None, mime_type: str = "application/pdf"):
+        """Send a local file as a document, uploading it only if this content has no live media ID"""
+        filename = filename or os.path.basename(path)
+        with open(path, "rb") as f:
+            content = f.read()
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        media_id = self._cached_media_id(content_hash)
+        if media_id is not None:
+            result = await self.send_document(to, media_id, filename, caption)
+            if result is not None:
+                self.media_metrics["reused"] += 1
+                return result
+            # The media may have been deleted or expired early; upload once more
+            self.media_metrics["reupload_after_failure"] += 1
+            self._remember_media_id(content_hash, None)
+
+        media_id = await self.upload_media(content, filename, mime_type)
+        if media_id is None:
+            return None
+        self.media_metrics["uploads"] += 1
+        self._remember_media_id(content_hash, media_id)
+        return await self.send_document(to, media_id, filename, caption)
+
+whatsapp_service = WhatsAppService()
@@ -0,0 +1,49 @@
+"""
+Move long-resolved complaints from complaints into complaints_archive.
+
+Usage:
+    python archive_complaints.py [--older-than-days N] [--batch-size N]
+                                 [--max-batches N] [--pause SECONDS]
+    python archive_complaints.py --sizes    # only print hot/archive table sizes
+
+Each batch is its own short transaction, so this is safe to run from cron
+while the bot is live.
+"""
+
+import argparse
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.complaint_archive import run_archival, table_sizes
+
+
+def print_sizes():
+    db = SessionLocal()
+    try:
+        for name, value in table_sizes(db).items():
+            print(f"{name:<18} {'-' if value is None else value}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    parser.add_argument("--pause", type=float, default=0.1, help="seconds to sleep between batches")
+    parser.add_argument("--sizes", action="store_true", help="print table sizes and exit")
+    args = parser.parse_args()
+
+    if not args.sizes:
+        result = run_archival(
+            older_than_days=args.older_than_days,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+            pause_seconds=args.pause,
+        )
+        print(f"Archived {result['moved']} complaints in {result['batches']} batches (resolved before {result['cutoff']})")
+    print_sizes()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Measure fan-out of the live complaint feed to many dashboard clients.
+
+Usage:
+    python bench_complaint_feed.py [--clients N] [--events N] [--wards N]
+
+Connects N in-process SSE clients (half of them filtered to one ward),
+commits complaint events to complaint_events from a worker thread as the
+status endpoints do, and reports events/s and the time from writing an event
+until every client has received it (the commit included). Events are committed
+one per transaction to a temporary SQLite file; every other one is announced on the
+event bus as a change made in this worker, the rest are left for the poller
+as changes made by another worker.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--wards", type=int, default=10)
+    args = parser.parse_args()
+
+    from sqlalchemy.orm import sessionmaker
+    from app.db.database import create_db_engine
+    from app.db.migrations import run_migrations
+    from app.db.models import ComplaintStatus
+    from app.services.complaint_feed import ComplaintFeed, record_events
+    from app.services.events import ComplaintCreated, event_bus
+    import app.services.complaint_feed as feed_module
+
+    path = os.path.join(tempfile.mkdtemp(prefix="feed-bench-"), "feed.sqlite3")
+    engine = create_db_engine(f"sqlite:///{path}")
+    run_migrations(engine)
+    factory = sessionmaker(bind=engine)
+    feed = ComplaintFeed(session_factory=factory, buffer_size=args.events, max_clients=args.clients)
+    feed_module.complaint_feed = feed
+    published_at = {}
+
+    async def client(stream, expected, received):
+        async for frame in stream:
+            if frame.startswith(b"id:"):
+                seq = int(frame.split(b"\n", 1)[0].split(b": ", 1)[1])
+                received.append(time.perf_counter() - published_at[seq])
+                if len(received) == expected:
+                    break
+        await stream.aclose()
+
+    def publish():
+        db = factory()
+        for i in range(1, args.events + 1):
+            event = ComplaintCreated(f"CMP-{i}", "LOGIN-A", "roads", None, ComplaintStatus.PENDING,
+                                     f"Ward {i % args.wards + 1}", None, None, datetime.utcnow())
+            record_events(db, [event])
+            # Event i gets id i in the fresh table; taken before the commit, which the poller may see at once
+            published_at[i] = time.perf_counter()
+            db.commit()
+            if i % 2:
+                event_bus.publish(event)
+        db.close()
+
+    async def scenario():
+        feed.start()
+        per_ward = sum(1 for i in range(1, args.events + 1) if i % args.wards == 0)
+        latencies = []
+        tasks = []
+        for n in range(args.clients):
+            ward = "1" if n % 2 else None
+            received = []
+            latencies.append(received)
+            tasks.append(asyncio.create_task(
+                client(feed.stream(ward=ward), per_ward if ward else args.events, received)
+            ))
+        await asyncio.sleep(0.1)
+        started = time.perf_counter()
+        thread = threading.Thread(target=publish)
+        thread.start()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        thread.join()
+        await feed.stop()
+        return elapsed, sorted(latency for received in latencies for latency in received)
+
+    elapsed, latencies = asyncio.run(scenario())
+    delivered = len(latencies)
+    print(f"{args.clients} clients, {args.events} events, {delivered} frames delivered in {elapsed:.2f}s")
+    print(f"  {args.events / elapsed:,.0f} events/s, {delivered / elapsed:,.0f} frames/s")
+    print(f"  publish-to-delivery p50 {latencies[delivered // 2] * 1000:.1f} ms, "
+          f"p99 {latencies[int(delivered * 0.99)] * 1000:.1f} ms")
+    print(f"  {feed.stats()}")
+
+
+if __name__ == "__main__":
+    main()
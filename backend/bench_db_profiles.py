@@ -0,0 +1,81 @@
+"""
+Benchmark per-turn conversation latency across database engine profiles.
+
+Usage:
+    python bench_db_profiles.py [--conversations N] [extra database URLs...]
+
+Always runs the embedded SQLite profiles (in-memory, file with WAL, file with
+the default rollback journal); pass PostgreSQL/MySQL URLs to compare them too.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from app.db.database import create_db_engine, SessionLocal, SQLITE_PRAGMAS
+from app.db.models import Base
+from app.services.conversation_router import ConversationRouter
+from app.services.conversation_state import conversation_manager
+
+
+def run_conversation(router: ConversationRouter, timings: list):
+    """File one complaint and track it, recording each turn's latency"""
+    phone = f"BENCH-{uuid.uuid4().hex[:8]}"
+    location = {"latitude": 22.2 + random.random() * 0.2, "longitude": 73.1 + random.random() * 0.2}
+    turns = [
+        ("hi", {}), ("1", {}), ("1", {}), ("Bench User", {}), ("9876543210", {}),
+        ("Alkapuri, Ward 10", {}), ("1", {}), ("3", {}),
+        ("", {"image_url": "/uploads/bench.jpg"}), ("", {"location": location}), ("no", {}),
+    ]
+    for text, kwargs in turns:
+        start = time.perf_counter()
+        router.process_message(phone, text, **kwargs)
+        timings.append(time.perf_counter() - start)
+
+    login_id = conversation_manager.get_session(phone)["login_id"]
+    for text in ("hi", "1", "2", login_id):
+        start = time.perf_counter()
+        router.process_message(phone, text)
+        timings.append(time.perf_counter() - start)
+
+
+def bench_profile(name: str, url: str, conversations: int, **engine_overrides):
+    engine = create_db_engine(url, **engine_overrides)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal.configure(bind=engine)
+    router = ConversationRouter()
+
+    timings = []
+    for _ in range(conversations):
+        run_conversation(router, timings)
+    engine.dispose()
+
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+    print(f"{name:<28} turns={len(timings_ms):<6} mean={statistics.mean(timings_ms):7.3f} ms  "
+          f"p50={statistics.median(timings_ms):7.3f} ms  p95={p95:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("urls", nargs="*", help="additional database URLs to benchmark")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="vmc-bench-")
+    bench_profile("sqlite (memory)", "sqlite://", args.conversations)
+    bench_profile("sqlite (file, WAL)", f"sqlite:///{os.path.join(tmp_dir, 'wal.sqlite3')}", args.conversations)
+
+    # Same file profile with the rollback journal and full sync, for comparison
+    SQLITE_PRAGMAS.update(journal_mode="DELETE", synchronous="FULL")
+    bench_profile("sqlite (file, rollback)", f"sqlite:///{os.path.join(tmp_dir, 'rollback.sqlite3')}", args.conversations)
+
+    for url in args.urls:
+        bench_profile(url.split("://")[0], url, args.conversations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Measure JSON encoding of a large complaint listing.
+
+Usage:
+    python bench_json_encoding.py [--rows N]
+
+Builds N rows shaped like a /api/complaints page (with user fields, as
+list_complaints returns them) and times:
+  - jsonable_encoder + json.dumps (FastAPI's path for a plain dict response)
+  - response_model validation + serialization + json.dumps (FastAPI's path
+    for a typed response_model)
+  - app.core.serialization.dumps, row layout and columnar layout
+Reports the best of three runs and the encoded size.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from app.api.common import Page
+    from app.api.complaints import ComplaintOut
+    from app.core.serialization import dumps, orjson, page_body
+    from app.db.models import ComplaintStatus
+    from app.services.complaint_listing import COMPLAINT_FIELDS
+
+    start = datetime(2026, 1, 1)
+    page = {
+        "items": [
+            {
+                "id": i,
+                "complaint_id": f"VMC-{i:08d}",
+                "user_id": i % 5000,
+                "login_id": f"LOGIN-{i % 5000:05d}",
+                "category": "garbage_cleanliness",
+                "sub_issue": "Garbage not collected",
+                "description": "Garbage has not been collected for three days near the temple",
+                "image_url": f"/uploads/{i}.jpg" if i % 3 else None,
+                "latitude": 22.3 + i * 1e-6,
+                "longitude": 73.18 + i * 1e-6,
+                "status": ComplaintStatus.RESOLVED if i % 4 == 0 else ComplaintStatus.PENDING,
+                "report_count": 1 + i % 3,
+                "created_at": start + timedelta(seconds=i),
+                "user_name": "Asha Patel",
+                "user_mobile": "9000000001",
+                "user_area": "Alkapuri",
+                "user_ward": f"Ward {i % 19 + 1}",
+            }
+            for i in range(args.rows)
+        ],
+        "next_cursor": "MjAyNi0wMS0wMVQwMDowMDowMHwx",
+    }
+    adapter = TypeAdapter(Page[ComplaintOut])
+
+    def starlette_dumps(content):
+        # JSONResponse.render
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+    cases = [
+        ("jsonable_encoder + json", lambda: starlette_dumps(jsonable_encoder(page))),
+        ("response_model + json", lambda: starlette_dumps(adapter.dump_python(adapter.validate_python(page), mode="json"))),
+        ("serialization.dumps (rows)", lambda: dumps(page)),
+        ("serialization.dumps (columns)", lambda: page_body(page, "columns", COMPLAINT_FIELDS)),
+    ]
+    print(f"{args.rows:,} complaint rows, encoder: {'orjson ' + orjson.__version__ if orjson else 'json (orjson not installed)'}")
+    baseline = None
+    for label, fn in cases:
+        elapsed, body = best_of(fn)
+        baseline = baseline or elapsed
+        print(f"  {label:<30} {elapsed * 1000:8.1f} ms  {len(body) / 1e6:6.1f} MB  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
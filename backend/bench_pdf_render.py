@@ -0,0 +1,90 @@
+"""
+Measure receipt rendering throughput and its effect on event-loop latency.
+
+Usage:
+    python bench_pdf_render.py [--renders N] [--workers N]
+
+Renders N distinct receipts (all cache misses) concurrently from one event
+loop, while a probe task measures how late a 5 ms sleep wakes up, standing
+in for webhook latency on the same worker. Modes:
+  - inline:    rendered on the event loop (the old behaviour)
+  - threads:   PdfRenderPool with threads (GIL-bound)
+  - processes: PdfRenderPool with worker processes
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+
+async def probe_latency(stop: asyncio.Event, lateness: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lateness.append((time.perf_counter() - started - 0.005) * 1000)
+
+
+async def run_mode(mode: str, receipts: list, workers: int):
+    from app.services.pdf_render_pool import PdfRenderPool
+    from app.services.pdf_service import cached_pdf_path
+
+    pool = PdfRenderPool(workers=workers, max_pending=len(receipts), timeout=600,
+                         use_processes=mode == "processes")
+    if mode == "processes":
+        # Start the worker processes outside the measurement
+        await pool.render(receipts[0])
+        receipts = receipts[1:]
+
+    stop, lateness = asyncio.Event(), []
+    probe = asyncio.create_task(probe_latency(stop, lateness))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    if mode == "inline":
+        for fields in receipts:
+            cached_pdf_path(fields)
+            await asyncio.sleep(0)
+    else:
+        await asyncio.gather(*(pool.render(fields) for fields in receipts))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    pool.shutdown()
+
+    lateness.sort()
+    p99 = lateness[int(len(lateness) * 0.99) - 1] if lateness else 0.0
+    print(
+        f"{mode:>9}: {len(receipts) / elapsed:7.1f} renders/s | loop lateness "
+        f"p50 {statistics.median(lateness) if lateness else 0:6.1f} ms, p99 {p99:6.1f} ms, "
+        f"max {lateness[-1] if lateness else 0:6.1f} ms"
+    )
+
+
+def main():
+    import os
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.db.models import PropertyTax, TaxStatus
+    from app.services.pdf_service import receipt_fields
+
+    print(f"{args.renders} renders, {args.workers} workers, {os.cpu_count()} CPUs")
+    for mode in ("inline", "threads", "processes"):
+        # A fresh directory and distinct owners per mode, so every render is a miss
+        settings.PDF_DIR = tempfile.mkdtemp(prefix=f"vmc-pdf-{mode}-")
+        receipts = [
+            receipt_fields(PropertyTax(
+                property_id=f"PROP-{i:05d}", owner_name=f"Owner {mode} {i}", address=f"{i} Station Road, Ward 3",
+                amount=1000.0 + i, status=TaxStatus.DUE, year=2025, receipt_no=f"REC-{i:05d}"
+            ))
+            for i in range(args.renders)
+        ]
+        asyncio.run(run_mode(mode, receipts, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Measure batch receipt throughput in receipts per second.
+
+Usage:
+    python bench_receipt_batch.py [--receipts N] [--workers N ...] [--chunk-size N]
+
+Generates N receipts without a database (every one a cache miss) and streams
+them as a zip and as a merged PDF with each worker count, discarding the
+output. Worker start-up is included, as it is for a real batch.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--receipts", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--chunk-size", type=int, default=50)
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.db.models import PropertyTax, TaxStatus
+    from app.services.receipt_batch import iter_receipts, start_job
+    from app.services.pdf_service import receipt_fields
+
+    print(f"{args.receipts} receipts, chunks of {args.chunk_size}, {os.cpu_count()} CPUs")
+    for output in ("zip", "pdf"):
+        for workers in args.workers:
+            # A fresh cache directory per run, so every receipt is rendered
+            settings.PDF_DIR = tempfile.mkdtemp(prefix=f"vmc-batch-{output}-{workers}-")
+            receipts = [
+                receipt_fields(PropertyTax(
+                    property_id=f"PROP-{i:05d}", owner_name=f"Owner {i}", address=f"{i} Station Road, Ward 3",
+                    amount=1000.0 + i, status=TaxStatus.DUE, year=2025, receipt_no=f"REC-{i:05d}"
+                ))
+                for i in range(args.receipts)
+            ]
+            job = start_job(len(receipts), output, {})
+            started = time.perf_counter()
+            size = sum(len(chunk) for chunk in iter_receipts(output, receipts, job, workers=workers,
+                                                              chunk_size=args.chunk_size))
+            elapsed = time.perf_counter() - started
+            print(f"{output:>4}, {workers} workers: {len(receipts) / elapsed:7.1f} receipts/s "
+                  f"({elapsed:.1f}s, {size / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Measure the per-prompt cost of get_text.
+
+Usage:
+    python bench_translations.py [--calls N]
+
+Compares the compiled catalog against the previous implementation (two dict
+lookups and str.format on every call) for a message without placeholders
+and one with a placeholder, in each language.
+"""
+
+import argparse
+import json
+import os
+import timeit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.services.translations import get_text
+
+    translations = {}
+    for name in os.listdir(settings.LOCALES_DIR):
+        with open(os.path.join(settings.LOCALES_DIR, name), encoding="utf-8") as f:
+            translations[name[:-5]] = json.load(f)
+
+    def legacy_get_text(key, lang="en", **kwargs):
+        lang_dict = translations.get(lang, translations["en"])
+        text = lang_dict.get(key, translations["en"].get(key, key))
+        if kwargs:
+            return text.format(**kwargs)
+        return text
+
+    cases = [
+        ("no placeholders", lambda fn, lang: fn("ask_description", lang)),
+        ("one placeholder", lambda fn, lang: fn("ask_mobile", lang, name="Asha")),
+    ]
+    print(f"{args.calls} calls per case")
+    for label, call in cases:
+        for lang in ("en", "hi", "gu"):
+            # Best of five runs, to keep scheduler noise out
+            legacy = min(timeit.repeat(lambda: call(legacy_get_text, lang), number=args.calls, repeat=5)) / args.calls
+            compiled = min(timeit.repeat(lambda: call(get_text, lang), number=args.calls, repeat=5)) / args.calls
+            print(f"{label:>16} [{lang}]: legacy {legacy * 1e9:6.0f} ns, catalog {compiled * 1e9:6.0f} ns "
+                  f"({legacy / compiled:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
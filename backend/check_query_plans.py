@@ -0,0 +1,27 @@
+"""
+Flag router/API queries that fall back to a sequential scan.
+
+Usage:
+    python check_query_plans.py
+
+Explains every registered hot query against the configured database and
+exits non-zero if any of them reads a table with a full scan.
+"""
+
+import sys
+from app.db.database import engine
+from app.db.query_plans import HOT_QUERIES, find_sequential_scans
+
+def main():
+    offenders = find_sequential_scans(engine)
+    for name in HOT_QUERIES:
+        if name in offenders:
+            print(f"SEQ SCAN  {name}: {', '.join(offenders[name])}")
+        else:
+            print(f"ok        {name}")
+    if offenders:
+        print(f"\n{len(offenders)} hot queries fall back to a sequential scan ({engine.dialect.name}).")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Export complaints with their user fields as NDJSON or CSV.
+
+Usage:
+    python export_complaints.py [--format ndjson|csv] [--gzip] [--output FILE]
+                                [--since ISO_DATETIME | --state-file FILE]
+
+With --state-file, the export starts from the watermark saved by the previous
+run and the new watermark (the last exported updated_at) is written back, so
+nightly syncs only move the delta.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+from app.services.complaint_export import export_complaints, iter_export_rows
+
+
+def read_watermark(path: str):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            value = f.read().strip()
+        return datetime.fromisoformat(value) if value else None
+    return None
+
+
+def write_watermark(path: str, watermark: datetime):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(watermark.isoformat())
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--output", help="file to write (default: stdout)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only complaints updated at or after this time")
+    parser.add_argument("--state-file", help="read/write the updated_at watermark here")
+    args = parser.parse_args()
+
+    since = args.since or read_watermark(args.state_file)
+    stats = {"rows": 0, "watermark": since}
+
+    def tracked_rows():
+        for row in iter_export_rows(since):
+            stats["rows"] += 1
+            if row["updated_at"] and (stats["watermark"] is None or row["updated_at"] > stats["watermark"]):
+                stats["watermark"] = row["updated_at"]
+            yield row
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in export_complaints(args.format, rows=tracked_rows(), compress=args.gzip):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+    if args.state_file and stats["watermark"]:
+        write_watermark(args.state_file, stats["watermark"])
+    print(f"Exported {stats['rows']} complaints (watermark: {stats['watermark']})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
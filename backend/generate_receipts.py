@@ -0,0 +1,71 @@
+"""
+Generate property tax receipts for a whole ward, year or billing status.
+
+Usage:
+    python generate_receipts.py [--ward WARD] [--year YEAR] [--status paid|due|pending]
+                                [--format zip|pdf] [--workers N] --output FILE
+
+Renders the receipts of every matching property across worker processes and
+writes either a zip with one PDF per property or a single merged PDF (a page
+per property). Progress is reported on stderr.
+"""
+
+import argparse
+import os
+import sys
+from app.core.config import settings
+from app.db.database import ReadSessionLocal
+from app.db.models import TaxStatus
+from app.services.receipt_batch import iter_receipts, select_receipts, start_job
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ward", help="ward number or name, e.g. 10 or 'Ward 10'")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--status", choices=[s.value for s in TaxStatus])
+    parser.add_argument("--format", choices=["zip", "pdf"], default="zip")
+    parser.add_argument("--workers", type=int, default=settings.PDF_RENDER_WORKERS)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    db = ReadSessionLocal()
+    try:
+        receipts = select_receipts(db, ward=args.ward, year=args.year,
+                                   status=TaxStatus(args.status) if args.status else None)
+    except ValueError as e:
+        print(f"Batch failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db.close()
+    if not receipts:
+        print("No properties match the filter", file=sys.stderr)
+        sys.exit(1)
+
+    filters = {"ward": args.ward, "year": args.year, "status": args.status}
+    job = start_job(len(receipts), args.format, filters)
+    reported = 0
+    try:
+        with open(args.output, "wb") as out:
+            for chunk in iter_receipts(args.format, receipts, job, workers=args.workers):
+                out.write(chunk)
+                if job.done != reported:
+                    reported = job.done
+                    print(f"\r{job.done}/{job.total} receipts ({job.receipts_per_second:.1f}/s)",
+                          end="", file=sys.stderr, flush=True)
+    except Exception as e:
+        # An incomplete archive is worse than none
+        os.remove(args.output)
+        print(f"\nBatch failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(
+        f"\nWrote {args.output}: {job.rendered} rendered, {job.cached} from cache, {job.failed} failed "
+        f"in {job.elapsed_seconds:.1f}s ({job.receipts_per_second:.1f} receipts/s)",
+        file=sys.stderr
+    )
+    sys.exit(1 if job.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
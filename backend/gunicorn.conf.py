@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for production.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+The app is preloaded in the master so workers fork with every module already
+imported. Schema creation and seeding run once in the master; each worker's
+lifespan then only opens its own HTTP client.
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    """Initialize the database once in the master, then drop its connections before forking"""
+    from app.main import init_backend
+    from app.db.database import engine, replica_engine
+
+    init_backend()
+    engine.dispose()
+    replica_engine.dispose()
+
+
+def post_fork(server, worker):
+    """Never share pooled connections inherited from the master"""
+    from app.db.database import engine, replica_engine
+
+    engine.dispose(close=False)
+    replica_engine.dispose(close=False)
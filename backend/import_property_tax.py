@@ -0,0 +1,51 @@
+"""
+Import (insert or update) the property tax roll from a CSV or Excel file.
+
+Usage:
+    python import_property_tax.py ROLL.csv|ROLL.xlsx [--batch-size N] [--errors FILE]
+
+Required columns: property_id, owner_name, address, amount, status (paid/due/
+pending), year. Optional: receipt_no, bill_no, ward_number. Rows are matched on
+property_id. Rejected rows are listed (or written to --errors as CSV) and the
+exit status is 1 if any row was rejected.
+"""
+
+import argparse
+import csv
+import sys
+from app.core.config import settings
+from app.services.property_import import import_property_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=settings.PROPERTY_IMPORT_BATCH_SIZE)
+    parser.add_argument("--errors", help="write rejected rows to this CSV file")
+    args = parser.parse_args()
+
+    try:
+        report = import_property_file(args.path, args.path, batch_size=args.batch_size)
+    except ValueError as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    print(
+        f"Read {report.rows_read} rows, upserted {report.rows_upserted}, rejected {report.error_count} "
+        f"in {report.elapsed_seconds:.1f}s ({report.rows_per_second:.0f} rows/s, {report.chunks} batches)"
+    )
+    if args.errors:
+        with open(args.errors, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["line", "property_id", "error"])
+            writer.writeheader()
+            writer.writerows(report.errors)
+    else:
+        for error in report.errors[:20]:
+            print(f"  line {error['line']}: {error['property_id'] or '-'}: {error['error']}")
+        if report.error_count > 20:
+            print(f"  ... {report.error_count - 20} more (use --errors FILE)")
+    sys.exit(1 if report.error_count else 0)
+
+
+if __name__ == "__main__":
+    main()
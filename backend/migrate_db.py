@@ -1,21 +1,37 @@
-from sqlalchemy import create_engine, text
-from app.core.config import settings
-
-def migrate():
-    DATABASE_URL = f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
-    engine = create_engine(DATABASE_URL)
-    
-    with engine.connect() as conn:
-        print("Migrating database...")
-        try:
-            # Add latitude column
-            conn.execute(text("ALTER TABLE complaints ADD COLUMN IF NOT EXISTS latitude FLOAT AFTER image_url"))
-            # Add longitude column
-            conn.execute(text("ALTER TABLE complaints ADD COLUMN IF NOT EXISTS longitude FLOAT AFTER latitude"))
-            conn.commit()
-            print("Migration successful: Added latitude and longitude columns.")
-        except Exception as e:
-            print(f"Migration error: {e}")
-
-if __name__ == "__main__":
-    migrate()
+"""
+Apply pending schema migrations.
+
+Usage:
+    python migrate_db.py            # apply pending migrations
+    python migrate_db.py --status   # list migrations and whether they are applied
+"""
+
+import sys
+from app.db.database import engine
+from app.db.migrations import MIGRATIONS, applied_versions, run_migrations
+
+def status():
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    for migration in MIGRATIONS:
+        applied_at = done.get(migration.version)
+        state = f"applied {applied_at:%Y-%m-%d %H:%M}" if applied_at else "pending"
+        print(f"{migration.version:>4}  {state:<22} {migration.description}")
+
+def migrate():
+    print(f"Migrating database ({engine.dialect.name})...")
+    try:
+        applied = run_migrations(engine)
+        if applied:
+            print(f"Migration successful: applied {', '.join(map(str, applied))}.")
+        else:
+            print("Database is up to date.")
+    except Exception as e:
+        print(f"Migration error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    if "--status" in sys.argv:
+        status()
+    else:
+        migrate()
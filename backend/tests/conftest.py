@@ -0,0 +1,21 @@
+import os
+import tempfile
+import pytest
+
+# Run the suite against the embedded SQLite profile unless a database is given
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Keep chat transcripts out of the working tree
+os.environ.setdefault("TRANSCRIPT_DIR", tempfile.mkdtemp(prefix="transcripts-"))
+
+
+@pytest.fixture
+def db_sessions():
+    """sessionmaker bound to a fresh in-memory SQLite database with every migration applied"""
+    from sqlalchemy.orm import sessionmaker
+    from app.db.database import create_db_engine
+    from app.db.migrations import run_migrations
+
+    engine = create_db_engine("sqlite://")
+    run_migrations(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
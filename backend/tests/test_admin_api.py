@@ -0,0 +1,130 @@
+import time
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from app import main
+from app.api.common import response_cache
+from app.core.config import settings
+from app.core.memory import memory
+from app.db.database import get_read_db
+from app.db.models import Complaint, ComplaintStatus, PropertyTax, TaxStatus, User
+from app.services import pdf_service
+from app.services.events import PropertyTaxUpdated, event_bus
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def db(db_sessions):
+    session = db_sessions()
+    session.add(User(id=1, login_id="LOGIN-A", name="Asha", mobile="9000000001", area="Alkapuri", ward_number="Ward 10"))
+    for i in range(7):
+        session.add(Complaint(complaint_id=f"CMP-{i:04d}", user_id=1, login_id="LOGIN-A", category="garbage_cleanliness",
+                              status=ComplaintStatus.PENDING, created_at=START + timedelta(minutes=i)))
+        session.add(PropertyTax(property_id=f"P-{i}", owner_name="Owner", address="Road", amount=1000.0 + i,
+                                status=TaxStatus.DUE if i % 2 else TaxStatus.PAID, year=2025,
+                                ward_number="Ward 10" if i < 4 else "Ward 3"))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_service, "_cache_bytes", None)
+    response_cache.clear()
+    main.app.dependency_overrides[get_read_db] = lambda: db
+    with TestClient(main.app) as client:
+        yield client
+    main.app.dependency_overrides.clear()
+
+
+def test_tax_records_are_paged_and_filtered(client):
+    first = client.get("/api/admin/tax", params={"limit": 3}).json()
+    assert [r["property_id"] for r in first["items"]] == ["P-0", "P-1", "P-2"]
+    second = client.get("/api/admin/tax", params={"limit": 3, "cursor": first["next_cursor"]}).json()
+    third = client.get("/api/admin/tax", params={"limit": 3, "cursor": second["next_cursor"]}).json()
+    assert [r["property_id"] for r in third["items"]] == ["P-6"] and third["next_cursor"] is None
+
+    due = client.get("/api/admin/tax", params={"status": "due", "ward": "10"}).json()["items"]
+    assert [r["property_id"] for r in due] == ["P-1", "P-3"]
+    assert client.get("/api/admin/tax", params={"cursor": "x"}).status_code == 400
+    assert client.get("/api/admin/tax", params={"limit": 100000}).status_code == 422
+
+
+def test_pages_are_cached_until_the_data_changes(client, db):
+    assert len(client.get("/api/admin/complaints").json()["items"]) == 7
+    db.add(Complaint(complaint_id="CMP-NEW", user_id=1, login_id="LOGIN-A", category="garbage_cleanliness",
+                     status=ComplaintStatus.PENDING, created_at=START + timedelta(days=1)))
+    db.commit()
+    hits = response_cache.metrics["hits"]
+    assert len(client.get("/api/admin/complaints").json()["items"]) == 7
+    assert response_cache.metrics["hits"] == hits + 1
+
+    response_cache.invalidate("complaints")
+    page = client.get("/api/admin/complaints").json()["items"]
+    assert page[0]["complaint_id"] == "CMP-NEW" and page[0]["user_name"] == "Asha"
+    assert [c["complaint_id"] for c in client.get("/api/admin/complaints/recent").json()] == \
+        ["CMP-NEW", "CMP-0006", "CMP-0005", "CMP-0004", "CMP-0003"]
+
+    client.get("/api/admin/tax")
+    db.query(PropertyTax).filter(PropertyTax.property_id == "P-0").update({"amount": 1.0})
+    db.commit()
+    event_bus.publish(PropertyTaxUpdated(property_ids=("P-0",), updated_at=datetime.utcnow()))
+    assert client.get("/api/admin/tax").json()["items"][0]["amount"] == 1.0
+
+
+def test_receipt_pdf_by_record_id(client, db):
+    record = db.query(PropertyTax).filter(PropertyTax.property_id == "P-2").one()
+    response = client.get(f"/api/admin/tax/pdf/{record.id}")
+    assert response.status_code == 200 and response.content.startswith(b"%PDF")
+    assert "VMC_Receipt_P-2.pdf" in response.headers["content-disposition"]
+    assert client.get("/api/admin/tax/pdf/999").status_code == 404
+
+
+def test_receipt_pdf_render_error_is_a_500(client, db, monkeypatch):
+    async def broken(fields):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(main.pdf_render_pool, "render", broken)
+    record = db.query(PropertyTax).filter(PropertyTax.property_id == "P-2").one()
+    response = client.get(f"/api/admin/tax/pdf/{record.id}")
+    assert (response.status_code, response.json()["detail"]) == (500, "Error generating PDF")
+
+
+def test_queries_and_user_history_do_not_create_sessions(client):
+    memory.clear()
+    memory.add_message("9000000001", "user", "hello")
+    memory.add_message("9000000001", "assistant", "Welcome")
+    memory.sessions["9000000001"]["last_active"] = time.time() - 10
+    memory.add_message("9000000002", "user", "hi")
+
+    page = client.get("/api/admin/queries", params={"limit": 1}).json()
+    assert [s["user_id"] for s in page["items"]] == ["9000000002"]
+    rest = client.get("/api/admin/queries", params={"cursor": page["next_cursor"]}).json()
+    assert rest["items"][0]["message_count"] == 2 and rest["next_cursor"] is None
+
+    history = client.get("/api/user/history/9000000001").json()
+    assert [(m["role"], m["content"]) for m in history] == [("user", "hello"), ("assistant", "Welcome")]
+    assert client.get("/api/user/profile/9000000002").json()["history_count"] == 1
+    assert client.get("/api/user/profile/unknown").status_code == 404
+    assert client.get("/api/admin/queries/unknown").status_code == 404
+    assert "unknown" not in memory.sessions
+    memory.clear()
+
+
+def test_old_property_dump_is_marked_deprecated(client):
+    response = client.get("/api/properties")
+    assert response.headers["deprecation"] == "true"
+    assert "/api/admin/tax" in response.headers["link"]
+
+
+def test_columnar_layout_matches_rows(client):
+    rows = client.get("/api/admin/tax", params={"limit": 4}).json()
+    columns = client.get("/api/admin/tax", params={"limit": 4, "layout": "columns"}).json()
+    assert columns["count"] == 4 and columns["next_cursor"] == rows["next_cursor"]
+    assert columns["columns"]["property_id"] == [r["property_id"] for r in rows["items"]]
+    assert set(columns["columns"]) == set(rows["items"][0])
+    complaints = client.get("/api/complaints", params={"fields": "complaint_id,status", "layout": "columns"}).json()
+    assert list(complaints["columns"]) == ["complaint_id", "status"]
@@ -0,0 +1,96 @@
+import time
+import pytest
+from app.core.memory import SimpleMemory
+from app.services.conversation_router import ConversationRouter
+from app.services.conversation_state import conversation_manager
+from app.core.memory import memory
+
+
+def test_history_is_a_ring_buffer_and_transcript_keeps_everything(tmp_path):
+    store = SimpleMemory(history_size=3, transcript_dir=str(tmp_path))
+    for i in range(7):
+        store.add_message("+91 90000/1", "user", f"message {i}")
+        if i == 3:
+            store.flush()
+    assert [m["content"] for m in store.find_session("+91 90000/1")["history"]] == ["message 4", "message 5", "message 6"]
+
+    pages, cursor = [], None
+    while True:
+        page = store.transcript("+91 90000/1", cursor=cursor, limit=3)
+        pages.append([m["content"] for m in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == [["message 0", "message 1", "message 2"], ["message 3", "message 4", "message 5"], ["message 6"]]
+    # The user ID is made safe for use as a file name
+    assert [p.name for p in tmp_path.iterdir()] == ["_91_90000_1.jsonl"]
+    assert store.transcript("unknown") is None
+
+    # Cursors not handed out by transcript() are rejected, not read from the middle of a line
+    for bad in ("-1", "5", "garbage"):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            store.transcript("+91 90000/1", cursor=bad)
+
+
+def test_sweep_drops_idle_sessions_and_background_thread_flushes(tmp_path):
+    store = SimpleMemory(expiry_seconds=60, transcript_dir=str(tmp_path), flush_seconds=0.01)
+    store.add_message("idle", "user", "old")
+    store.add_message("active", "user", "new")
+    store.sessions["idle"]["last_active"] = time.time() - 120
+    assert store.find_session("idle") is None
+    assert store.sweep() == 1 and list(store.sessions) == ["active"]
+
+    store.start()
+    deadline = time.time() + 2
+    while store.stats()["pending"] and time.time() < deadline:
+        time.sleep(0.01)
+    store.stop()
+    assert store.stats()["flushed"] == 2
+    assert store.transcript("idle")["items"][0]["content"] == "old"
+
+
+def test_router_records_both_sides_of_the_conversation():
+    phone = "919800000047"
+    conversation_manager.reset_session(phone)
+    memory.forget(phone)
+    router = ConversationRouter()
+    reply = router.process_message(phone, "Hi")
+    router.process_message(phone, "", location={"latitude": 22.3, "longitude": 73.2})
+
+    history = list(memory.find_session(phone)["history"])
+    assert [m["role"] for m in history] == ["user", "assistant", "user", "assistant"]
+    assert history[0]["content"] == "Hi"
+    assert history[1]["content"] == (reply["body"] if isinstance(reply, dict) else reply)
+    assert history[2]["content"] == "[location] 22.3,73.2"
+    conversation_manager.reset_session(phone)
+    memory.forget(phone)
+
+
+def test_activity_index_pages_newest_first_across_touches():
+    store = SimpleMemory(transcript_dir="")
+    for i in range(200):
+        store.get_session(f"user-{i}")
+    # Re-touching users supersedes their old entries (and triggers compaction)
+    for i in range(0, 200, 2):
+        store.get_session(f"user-{i}")
+    expected = [f"user-{i}" for i in range(198, -1, -2)] + [f"user-{i}" for i in range(199, 0, -2)]
+
+    page, cursor = store.recent_sessions(limit=30)
+    seen = [user_id for user_id, _ in page]
+    store.get_session("user-199")  # becomes newest; not repeated on later pages
+    while cursor:
+        page, cursor = store.recent_sessions(cursor=cursor, limit=30)
+        seen += [user_id for user_id, _ in page]
+    assert seen == [u for u in expected if u != "user-199"]
+    assert store.recent_sessions(limit=1)[0][0][0] == "user-199"
+    assert len(store._seqs) <= 2 * len(store.sessions) + 64
+
+
+def test_sweep_stops_at_first_active_session():
+    store = SimpleMemory(expiry_seconds=60, transcript_dir="")
+    for i in range(5):
+        store.get_session(f"user-{i}")
+    for i in range(3):
+        store.sessions[f"user-{i}"]["last_active"] = time.time() - 120
+    assert store.sweep() == 3
+    assert [user_id for user_id, _ in store.recent_sessions()[0]] == ["user-4", "user-3"]
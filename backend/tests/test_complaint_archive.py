@@ -0,0 +1,65 @@
+import pytest
+from datetime import datetime, timedelta
+from app.db.models import ArchivedComplaint, Complaint, ComplaintStat, ComplaintStatus, User
+from app.services.complaint_archive import archive_metrics, run_archival, table_sizes
+from app.services.complaint_stats import rebuild
+from app.services.conversation_router import ConversationRouter
+
+NOW = datetime.utcnow()
+OLD = NOW - timedelta(days=200)
+
+
+@pytest.fixture
+def session_factory(db_sessions):
+    factory = db_sessions
+    db = factory()
+    db.add(User(id=1, login_id="LOGIN-A", name="Asha", mobile="9000000001", area="Alkapuri", ward_number="Ward 10"))
+    for i in range(5):
+        # Old and resolved: archived
+        db.add(Complaint(complaint_id=f"CMP-OLD{i}", user_id=1, login_id="LOGIN-A", category="water_supply",
+                         sub_issue="No Water", status=ComplaintStatus.RESOLVED, created_at=OLD, updated_at=OLD))
+    # Old but still open, and recently resolved: both stay hot
+    db.add(Complaint(complaint_id="CMP-OPEN", user_id=1, login_id="LOGIN-A", category="water_supply",
+                     sub_issue="No Water", status=ComplaintStatus.PENDING, created_at=OLD, updated_at=OLD))
+    db.add(Complaint(complaint_id="CMP-NEW", user_id=1, login_id="LOGIN-A", category="water_supply",
+                     sub_issue="No Water", status=ComplaintStatus.RESOLVED, created_at=NOW, updated_at=NOW))
+    db.commit()
+    db.close()
+    return factory
+
+
+def test_archival_moves_only_old_resolved_complaints_in_batches(session_factory):
+    runs_before = archive_metrics["runs"]
+    result = run_archival(older_than_days=90, batch_size=2, session_factory=session_factory)
+    assert result["moved"] == 5
+    assert result["batches"] == 3
+    assert archive_metrics["runs"] == runs_before + 1
+    assert archive_metrics["last_run_rows"] == 5
+
+    db = session_factory()
+    assert {c for (c,) in db.query(Complaint.complaint_id)} == {"CMP-OPEN", "CMP-NEW"}
+    archived = db.query(ArchivedComplaint).order_by(ArchivedComplaint.complaint_id).all()
+    assert [a.complaint_id for a in archived] == [f"CMP-OLD{i}" for i in range(5)]
+    assert archived[0].login_id == "LOGIN-A" and archived[0].updated_at == OLD
+    sizes = table_sizes(db)
+    assert (sizes["hot_rows"], sizes["archive_rows"]) == (2, 5)
+
+    # Dashboard totals still include archived complaints after a rebuild
+    rebuild(db)
+    db.commit()
+    assert sum(count for (count,) in db.query(ComplaintStat.count)) == 7
+    db.close()
+
+    # Running again finds nothing left to move
+    assert run_archival(older_than_days=90, batch_size=2, session_factory=session_factory)["moved"] == 0
+
+
+def test_tracking_falls_through_to_archive(session_factory):
+    run_archival(older_than_days=90, session_factory=session_factory)
+    router = ConversationRouter()
+    router._get_db = session_factory
+    router._get_read_db = lambda key=None: session_factory()
+
+    reply = router._handle_tracking_login_id("919000000001", "LOGIN-A", "en")
+    for complaint_id in ["CMP-OLD0", "CMP-OLD4", "CMP-OPEN", "CMP-NEW"]:
+        assert complaint_id in reply
@@ -0,0 +1,83 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from datetime import datetime
+from app.db.models import Complaint, ComplaintStatus, User
+from app.services.complaint_export import (
+    EXPORT_COLUMNS, chunked, export_complaints, gzip_chunks, iter_export_rows
+)
+
+T1 = datetime(2026, 1, 1, 9, 0)
+T2 = datetime(2026, 1, 2, 9, 0)
+T3 = datetime(2026, 1, 3, 9, 0)
+DESCRIPTION = 'Paani nahi, "since Monday", near the tank\nગટર ઉભરાય છે'
+
+
+@pytest.fixture
+def session_factory(db_sessions):
+    db = db_sessions()
+    db.add(User(id=1, login_id="LOGIN-A", name="Asha, Patel", mobile="9000000001", area="Alkapuri", ward_number="Ward 10"))
+    for i, updated_at in enumerate([T1, T2, T3]):
+        db.add(Complaint(complaint_id=f"CMP-{i}", user_id=1, login_id="LOGIN-A", category="water_supply",
+                         sub_issue="No Water", description=DESCRIPTION, status=ComplaintStatus.PENDING,
+                         created_at=T1, updated_at=updated_at))
+    db.commit()
+    db.close()
+    return db_sessions
+
+
+def _export(session_factory, fmt, since=None, compress=False):
+    rows = iter_export_rows(since, batch_size=2, session_factory=session_factory)
+    return b"".join(export_complaints(fmt, rows=rows, compress=compress))
+
+
+def test_ndjson_has_one_object_per_row_with_plain_values(session_factory):
+    lines = _export(session_factory, "ndjson").decode("utf-8").splitlines()
+    assert len(lines) == 3
+    first = json.loads(lines[0])
+    assert list(first) == list(EXPORT_COLUMNS)
+    assert (first["complaint_id"], first["status"], first["updated_at"]) == ("CMP-0", "pending", T1.isoformat())
+    assert first["description"] == DESCRIPTION and first["user_name"] == "Asha, Patel"
+    # Non-ASCII text is written as UTF-8, not \u escapes
+    assert "ગટર" in lines[0]
+
+
+def test_csv_quotes_commas_quotes_and_newlines(session_factory):
+    data = _export(session_factory, "csv").decode("utf-8")
+    rows = list(csv.reader(io.StringIO(data)))
+    assert rows[0] == list(EXPORT_COLUMNS)
+    assert len(rows) == 4
+    record = dict(zip(rows[0], rows[1]))
+    assert record["description"] == DESCRIPTION
+    assert record["user_name"] == "Asha, Patel"
+    assert record["image_url"] == "" and record["status"] == "pending"
+
+
+def test_gzip_output_decompresses_to_the_same_bytes(session_factory):
+    for fmt in ("ndjson", "csv"):
+        plain = _export(session_factory, fmt)
+        assert gzip.decompress(_export(session_factory, fmt, compress=True)) == plain
+
+    # Many small chunks compress into one gzip member
+    chunks = [f"line {i}\n".encode() for i in range(5000)]
+    assert gzip.decompress(b"".join(gzip_chunks(chunks))) == b"".join(chunks)
+
+
+def test_since_watermark_exports_only_newer_rows(session_factory):
+    everything = [json.loads(line) for line in _export(session_factory, "ndjson").splitlines()]
+    assert [row["complaint_id"] for row in everything] == ["CMP-0", "CMP-1", "CMP-2"]
+
+    # The last row's updated_at is the next watermark; rows on it are exported again
+    watermark = datetime.fromisoformat(everything[1]["updated_at"])
+    newer = [json.loads(line) for line in _export(session_factory, "ndjson", since=watermark).splitlines()]
+    assert [row["complaint_id"] for row in newer] == ["CMP-1", "CMP-2"]
+    assert _export(session_factory, "ndjson", since=datetime(2026, 2, 1)) == b""
+
+
+def test_lines_are_grouped_into_chunks():
+    chunks = list(chunked(["a" * 40 + "\n"] * 10, chunk_bytes=100))
+    assert [len(chunk) for chunk in chunks] == [123, 123, 123, 41]
+    with pytest.raises(ValueError):
+        export_complaints("xml", rows=[])
@@ -0,0 +1,134 @@
+import asyncio
+import gc
+import json
+import threading
+import pytest
+from datetime import datetime, timedelta
+from app.db.models import ComplaintEvent, ComplaintStatus
+from app.services.complaint_feed import GAP_SECONDS, ComplaintFeed, FeedFull, event_row, record_events
+from app.services.events import ComplaintCreated, ComplaintStatusChanged
+
+NOW = datetime(2026, 1, 1, 10, 0)
+
+
+def _created(complaint_id, ward="Ward 10", category="garbage_cleanliness"):
+    return ComplaintCreated(complaint_id, "LOGIN-A", category, "Garbage Dump", ComplaintStatus.PENDING,
+                            ward, 22.3, 73.2, NOW)
+
+
+def _record(factory, *events):
+    db = factory()
+    record_events(db, events)
+    db.commit()
+    db.close()
+
+
+def _parse(frame: bytes):
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return fields["id"], fields["event"], json.loads(fields["data"])
+
+
+async def _next_event(stream):
+    while True:
+        frame = await asyncio.wait_for(stream.__anext__(), 2)
+        if frame.startswith(b"id:"):
+            return _parse(frame)
+
+
+def test_events_committed_by_any_worker_reach_filtered_clients(db_sessions):
+    feed = ComplaintFeed(session_factory=db_sessions, buffer_size=10, keepalive_seconds=5, poll_seconds=0.05)
+
+    async def scenario():
+        feed.start()
+        everything = feed.stream()
+        ward_10 = feed.stream(ward="10", category="garbage_cleanliness")
+        assert (await everything.__anext__()).startswith(b"retry:")
+        await ward_10.__anext__()
+        assert feed.clients == 2
+
+        # Committed by another worker: only the table connects them
+        _record(db_sessions, _created("CMP-1", ward="Ward 3"))
+        thread = threading.Thread(target=_record, args=(db_sessions, ComplaintStatusChanged(
+            "CMP-2", "garbage_cleanliness", None, ComplaintStatus.PENDING, ComplaintStatus.RESOLVED,
+            "Ward 10", "LOGIN-A", None, None, NOW, NOW)))
+        thread.start()
+        thread.join()
+
+        first = await _next_event(everything)
+        second = await _next_event(everything)
+        only = await _next_event(ward_10)
+        await everything.aclose()
+        await ward_10.aclose()
+        await feed.stop()
+        return first, second, only
+
+    first, second, only = asyncio.run(scenario())
+    assert first[1] == "complaint_created" and first[2]["complaint_id"] == "CMP-1"
+    assert second[1] == "complaint_status_changed" and second[2]["status"] == "resolved"
+    assert only == second
+    # Event IDs are the table ids, the same on every worker
+    db = db_sessions()
+    assert [first[0], second[0]] == [str(row.id) for row in db.query(ComplaintEvent).order_by(ComplaintEvent.id)]
+    db.close()
+    assert feed.clients == 0 and feed.metrics["sent"] == 3
+
+
+def test_resume_on_any_worker_from_last_event_id_or_reset(db_sessions):
+    _record(db_sessions, *(_created(f"CMP-{i}") for i in range(5)))
+    # Two workers, one started after the events were written
+    worker_a = ComplaintFeed(session_factory=db_sessions, buffer_size=3, keepalive_seconds=5)
+    worker_b = ComplaintFeed(session_factory=db_sessions, buffer_size=3, keepalive_seconds=5)
+    worker_a.poll()
+    worker_b.poll()
+
+    async def replay(feed, last_event_id, count):
+        stream = feed.stream(last_event_id)
+        events = [await _next_event(stream) for _ in range(count)]
+        await stream.aclose()
+        return events
+
+    # Events 4 and 5 are still buffered on both
+    for feed in (worker_a, worker_b):
+        events = asyncio.run(replay(feed, "3", 2))
+        assert [(event_id, data["complaint_id"]) for event_id, _, data in events] == [("4", "CMP-3"), ("5", "CMP-4")]
+
+    # Too old for the buffer, or not an ID of this feed: reload instead
+    for last_event_id in ("1", "deadbeef-4", "garbage"):
+        assert asyncio.run(replay(worker_a, last_event_id, 1))[0][1] == "reset"
+
+
+def test_missing_ids_are_waited_for_then_skipped(db_sessions):
+    feed = ComplaintFeed(session_factory=db_sessions)
+    feed.poll()
+    db = db_sessions()
+    db.add(ComplaintEvent(id=1, **event_row(_created("CMP-1"))))
+    # Id 2 is still committing elsewhere
+    db.add(ComplaintEvent(id=3, **event_row(_created("CMP-3"))))
+    db.commit()
+
+    assert feed.poll() == 1
+    assert feed.stats()["last_event_id"] == 1
+    db.query(ComplaintEvent).filter_by(id=3).update({"created_at": datetime.utcnow() - timedelta(seconds=GAP_SECONDS + 1)})
+    db.commit()
+    db.close()
+    assert feed.poll() == 1
+    assert (feed.stats()["last_event_id"], feed.metrics["gaps_skipped"]) == (3, 1)
+
+
+def test_clients_beyond_the_limit_are_rejected():
+    feed = ComplaintFeed(max_clients=1)
+
+    async def scenario():
+        # The slot is taken when the stream is created, before it is iterated
+        stream = feed.stream()
+        with pytest.raises(FeedFull):
+            feed.stream()
+        await stream.__anext__()
+        await stream.aclose()
+        unstarted = feed.stream()
+        del unstarted
+        gc.collect()
+        feed.stream()
+
+    asyncio.run(scenario())
+    assert feed.metrics["rejected"] == 1
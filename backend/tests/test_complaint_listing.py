@@ -0,0 +1,63 @@
+import pytest
+from datetime import datetime, timedelta
+from app.db.models import Complaint, ComplaintStatus, User
+from app.services.complaint_listing import decode_cursor, encode_cursor, list_complaints
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def db(db_sessions):
+    session = db_sessions()
+    session.add_all([
+        User(id=1, login_id="LOGIN-A", name="Asha", mobile="9000000001", area="Alkapuri", ward_number="Ward 10"),
+        User(id=2, login_id="LOGIN-B", name="Bhavin", mobile="9000000002", area="Akota", ward_number="Ward 3"),
+    ])
+    for i in range(120):
+        session.add(Complaint(
+            complaint_id=f"CMP-{i:04d}",
+            user_id=1 if i % 2 else 2,
+            login_id="LOGIN-A" if i % 2 else "LOGIN-B",
+            category="garbage_cleanliness" if i % 3 else "electricity_issues",
+            sub_issue="Power Cut",
+            status=ComplaintStatus.RESOLVED if i % 4 == 0 else ComplaintStatus.PENDING,
+            # Pairs share a timestamp so the id tiebreak matters
+            created_at=START + timedelta(minutes=i // 2),
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(START, 42)) == (START, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+def test_pages_cover_every_complaint_once_newest_first(db):
+    seen, cursor = [], None
+    while True:
+        page = list_complaints(db, cursor=cursor, limit=50)
+        seen += [item["complaint_id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == [f"CMP-{i:04d}" for i in reversed(range(120))]
+
+def test_filters_and_projection(db):
+    page = list_complaints(
+        db, fields="complaint_id,status,user_ward", limit=500,
+        status=ComplaintStatus.PENDING, category="garbage_cleanliness", ward="Ward 10",
+        created_from=START + timedelta(minutes=10),
+    )
+    assert page["next_cursor"] is None
+    assert page["items"]
+    for item in page["items"]:
+        assert set(item) == {"complaint_id", "status", "user_ward"}
+        assert item["status"] == ComplaintStatus.PENDING
+        assert item["user_ward"] == "Ward 10"
+        i = int(item["complaint_id"][4:])
+        assert i % 2 == 1 and i % 3 and i >= 20
+
+def test_unknown_field_is_rejected(db):
+    with pytest.raises(ValueError):
+        list_complaints(db, fields="complaint_id,password")
@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime, timedelta
+from app.db.models import Complaint, ComplaintStatus, User
+from app.services.complaint_archive import run_archival
+from app.services.complaint_search import build_search_text, fold, query_terms, search_complaints
+
+NOW = datetime.utcnow()
+OLD = NOW - timedelta(days=200)
+
+
+@pytest.fixture
+def db(db_sessions):
+    factory = db_sessions
+    session = factory()
+    session.add(User(id=1, login_id="LOGIN-A", name="Asha", mobile="9000000001", ward_number="Ward 10"))
+    session.add(User(id=2, login_id="LOGIN-B", name="Bhavin", mobile="9000000002", ward_number="Ward 3"))
+    rows = [
+        ("CMP-1", 1, "water_supply", "No Water", "Paani nahi aa raha since two days", ComplaintStatus.PENDING, NOW),
+        ("CMP-2", 2, "water_supply", "Leakage", "Pipeline leaking near the temple", ComplaintStatus.PENDING, NOW),
+        ("CMP-3", 2, "electricity", "Street Light", "Bijli ka khamba gir gaya, no light on the road", ComplaintStatus.IN_PROGRESS, NOW),
+        ("CMP-4", 1, "garbage", "Not Collected", "Kachraa pada hai gali mein", ComplaintStatus.RESOLVED, OLD),
+        ("CMP-5", 1, "drainage", "Overflow", "ગટર ઉભરાય છે", ComplaintStatus.PENDING, NOW),
+    ]
+    for complaint_id, user_id, category, sub_issue, description, status, when in rows:
+        session.add(Complaint(complaint_id=complaint_id, user_id=user_id, login_id=f"LOGIN-{'AB'[user_id - 1]}",
+                              category=category, sub_issue=sub_issue, description=description, status=status,
+                              created_at=when, updated_at=when))
+    session.commit()
+    session.factory = factory
+    yield session
+    session.close()
+
+
+def _ids(result):
+    return [item["complaint_id"] for item in result["items"]]
+
+
+def test_fold_and_query_expansion():
+    assert fold("paani") == fold("pani") == "pani"
+    assert fold("kachraa") == "kachra"
+    assert fold("ગટર") == "ગટર"
+    assert "electricity" in query_terms("bijlee")[0]
+    assert "pani" in build_search_text("water_supply", "No Water", "Paani nahi").split()
+
+
+def test_search_matches_english_and_romanized_words(db):
+    # CMP-1 mentions water in its sub-issue as well as its category, so it ranks first
+    assert _ids(search_complaints(db, "water")) == ["CMP-1", "CMP-2"]
+    # Spelling variants and synonyms meet: "pani" finds "Paani", "bijli" finds "light"
+    assert "CMP-1" in _ids(search_complaints(db, "pani"))
+    assert _ids(search_complaints(db, "bijli road")) == ["CMP-3"]
+    assert _ids(search_complaints(db, "garbage")) == ["CMP-4"]
+    # Porter stemming: "leaks" finds "leaking"
+    assert "CMP-2" in _ids(search_complaints(db, "leaks"))
+    # Gujarati script is indexed as-is
+    assert _ids(search_complaints(db, "ગટર")) == ["CMP-5"]
+    assert search_complaints(db, "elephant")["items"] == []
+
+
+def test_filters_and_pagination(db):
+    assert set(_ids(search_complaints(db, "water", ward="Ward 3"))) == {"CMP-2"}
+    assert _ids(search_complaints(db, "water", status=ComplaintStatus.IN_PROGRESS)) == []
+    assert _ids(search_complaints(db, "water", created_to=NOW - timedelta(days=1))) == []
+
+    first = search_complaints(db, "water", limit=1)
+    assert len(first["items"]) == 1 and first["next_offset"] == 1
+    second = search_complaints(db, "water", limit=1, offset=first["next_offset"])
+    assert second["next_offset"] is None
+    assert set(_ids(first) + _ids(second)) == {"CMP-1", "CMP-2"}
+
+
+def test_edits_and_archived_complaints_are_searchable(db):
+    complaint = db.query(Complaint).filter(Complaint.complaint_id == "CMP-2").one()
+    complaint.description = "Mosquito breeding in stagnant water"
+    db.commit()
+    assert _ids(search_complaints(db, "machhar")) == ["CMP-2"]
+    assert search_complaints(db, "temple")["items"] == []
+
+    run_archival(older_than_days=90, session_factory=db.factory)
+    result = search_complaints(db, "kachra")
+    assert _ids(result) == ["CMP-4"] and result["items"][0]["archived"] is True
+    assert search_complaints(db, "kachra", include_archived=False)["items"] == []
+
+
+def test_query_without_words_is_rejected(db):
+    with pytest.raises(ValueError):
+        search_complaints(db, "!!")
@@ -0,0 +1,77 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import select
+from app.db.models import Complaint, ComplaintStat, ComplaintStatus, User
+from app.services.complaint_stats import ComplaintStats, rebuild
+import app.services.complaint_stats as complaint_stats_module
+
+DAY_ONE = datetime(2026, 3, 1, 9, 30)
+DAY_TWO = datetime(2026, 3, 2, 18, 0)
+
+
+@pytest.fixture
+def db(db_sessions):
+    session = db_sessions()
+    session.add(User(id=1, login_id="LOGIN-A", name="Asha", mobile="9000000001", area="Alkapuri", ward_number="Ward 10"))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    # The commit hook applies deltas to the module singleton
+    fresh = ComplaintStats(refresh_seconds=3600, recent_days=7)
+    monkeypatch.setattr(complaint_stats_module, "complaint_stats", fresh)
+    return fresh
+
+
+def _file(db, stats, complaint_id, category, sub_issue, status, created_at):
+    db.add(Complaint(complaint_id=complaint_id, user_id=1, login_id="LOGIN-A", category=category,
+                     sub_issue=sub_issue, status=status, created_at=created_at))
+    stats.record_created(db, "Ward 10", category, sub_issue, status, created_at)
+    db.commit()
+
+
+def _table(db):
+    return {tuple(row[:-1]): row[-1] for row in db.execute(select(ComplaintStat.__table__))}
+
+
+def test_counters_follow_inserts_and_status_changes(db, stats):
+    _file(db, stats, "CMP-1", "garbage_cleanliness", "Garbage Not Collected", ComplaintStatus.PENDING, DAY_ONE)
+    _file(db, stats, "CMP-2", "garbage_cleanliness", "Garbage Not Collected", ComplaintStatus.PENDING, DAY_ONE)
+    _file(db, stats, "CMP-3", "electricity_issues", "Power Cut", ComplaintStatus.RESOLVED, DAY_TWO)
+
+    complaint = db.query(Complaint).filter(Complaint.complaint_id == "CMP-1").one()
+    stats.record_status_change(db, "Ward 10", complaint.category, complaint.sub_issue,
+                               complaint.status, ComplaintStatus.RESOLVED, complaint.created_at)
+    complaint.status = ComplaintStatus.RESOLVED
+    db.commit()
+
+    snapshot = stats.snapshot(today=DAY_TWO.date())
+    assert snapshot["total"] == 3
+    assert snapshot["by_status"] == {"pending": 1, "resolved": 2}
+    assert snapshot["by_ward_status"] == {"Ward 10": {"pending": 1, "resolved": 2}}
+    assert snapshot["by_sub_issue"]["garbage_cleanliness"] == {"Garbage Not Collected": 2}
+    assert snapshot["by_day"] == {"2026-03-01": 2, "2026-03-02": 1}
+
+    # Incremental counters match a full GROUP BY rebuild
+    incremental = {key: count for key, count in _table(db).items() if count}
+    rebuild(db)
+    db.commit()
+    assert _table(db) == incremental
+
+    # And a reload from the summary table reproduces the rollups
+    reloaded = ComplaintStats(recent_days=7)
+    reloaded.load(db)
+    assert reloaded.snapshot(today=DAY_TWO.date()) == snapshot
+
+
+def test_rolled_back_changes_are_not_counted(db, stats):
+    db.add(Complaint(complaint_id="CMP-1", user_id=1, login_id="LOGIN-A", category="water_supply",
+                     status=ComplaintStatus.PENDING, created_at=DAY_ONE))
+    stats.record_created(db, "Ward 10", "water_supply", None, ComplaintStatus.PENDING, DAY_ONE)
+    db.rollback()
+
+    assert stats.snapshot()["total"] == 0
+    assert _table(db) == {}
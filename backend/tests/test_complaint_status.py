@@ -0,0 +1,85 @@
+import pytest
+from datetime import datetime
+from app.db.models import Complaint, ComplaintStatus, User
+from app.services.complaint_stats import ComplaintStats, stat_key
+from app.services.complaint_status import apply_status_updates, parse_status
+from app.services.events import ComplaintStatusChanged, event_bus
+import app.services.complaint_stats as complaint_stats_module
+import app.services.complaint_status as complaint_status_module
+
+CREATED = datetime(2026, 3, 1, 9, 30)
+
+
+@pytest.fixture
+def session_factory(db_sessions, monkeypatch):
+    factory = db_sessions
+    db = factory()
+    db.add(User(id=1, login_id="LOGIN-A", name="Asha", mobile="9000000001", area="Alkapuri", ward_number="Ward 10"))
+    db.add_all([
+        Complaint(complaint_id=f"CMP-{i}", user_id=1, login_id="LOGIN-A", category="water_supply",
+                  sub_issue="No Water", status=ComplaintStatus.PENDING, created_at=CREATED)
+        for i in range(4)
+    ])
+    db.commit()
+    db.close()
+
+    stats = ComplaintStats()
+    stats.apply([(stat_key("Ward 10", "water_supply", "No Water", ComplaintStatus.PENDING, CREATED), 4)])
+    monkeypatch.setattr(complaint_stats_module, "complaint_stats", stats)
+    monkeypatch.setattr(complaint_status_module, "complaint_stats", stats)
+    return factory
+
+
+@pytest.fixture
+def changes():
+    received = []
+    event_bus.subscribe(ComplaintStatusChanged, received.append)
+    yield received
+    event_bus.unsubscribe(ComplaintStatusChanged, received.append)
+
+
+def test_parse_status_accepts_in_progress_and_aliases():
+    assert parse_status("in_progress") == ComplaintStatus.IN_PROGRESS
+    assert parse_status("In Progress") == ComplaintStatus.IN_PROGRESS
+    assert parse_status("completed") == ComplaintStatus.RESOLVED
+    assert parse_status("PENDING") == ComplaintStatus.PENDING
+    with pytest.raises(ValueError):
+        parse_status("escalated")
+
+
+def test_bulk_update_reports_each_id_and_publishes_changes(session_factory, changes):
+    results = apply_status_updates([
+        ("CMP-0", "in_progress"),
+        ("CMP-1", "completed"),
+        ("CMP-2", "resolved"),
+        ("CMP-3", "pending"),
+        ("CMP-404", "resolved"),
+        ("CMP-0", "bogus"),
+        ("CMP-2", "in_progress"),
+    ], session_factory=session_factory)
+
+    by_id = {result["complaint_id"]: result for result in results}
+    assert list(by_id) == ["CMP-0", "CMP-1", "CMP-2", "CMP-3", "CMP-404"]
+    assert by_id["CMP-0"]["result"] == "invalid_status"
+    assert by_id["CMP-1"]["result"] == "updated" and by_id["CMP-1"]["status"] == ComplaintStatus.RESOLVED
+    assert by_id["CMP-2"]["result"] == "updated" and by_id["CMP-2"]["status"] == ComplaintStatus.IN_PROGRESS
+    assert by_id["CMP-3"]["result"] == "unchanged"
+    assert by_id["CMP-404"]["result"] == "not_found"
+
+    db = session_factory()
+    statuses = dict(db.query(Complaint.complaint_id, Complaint.status).all())
+    db.close()
+    assert statuses == {
+        "CMP-0": ComplaintStatus.PENDING,
+        "CMP-1": ComplaintStatus.RESOLVED,
+        "CMP-2": ComplaintStatus.IN_PROGRESS,
+        "CMP-3": ComplaintStatus.PENDING,
+    }
+
+    assert sorted((e.complaint_id, e.new_status) for e in changes) == [
+        ("CMP-1", ComplaintStatus.RESOLVED), ("CMP-2", ComplaintStatus.IN_PROGRESS)
+    ]
+    assert all(e.ward == "Ward 10" and e.old_status == ComplaintStatus.PENDING for e in changes)
+
+    snapshot = complaint_stats_module.complaint_stats.snapshot()
+    assert snapshot["by_status"] == {"pending": 2, "resolved": 1, "in_progress": 1}
@@ -0,0 +1,67 @@
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.database import create_db_engine
+from app.db.migrations import _lock
+
+
+def _pragmas(engine, names):
+    with engine.connect() as conn:
+        return {name: conn.execute(text(f"PRAGMA {name}")).scalar() for name in names}
+
+
+def test_file_backed_sqlite_gets_wal_and_tuning_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'vmc.sqlite3'}")
+    try:
+        assert _pragmas(engine, ["journal_mode", "synchronous", "foreign_keys", "temp_store", "cache_size",
+                                 "mmap_size", "busy_timeout"]) == {
+            "journal_mode": "wal",
+            "synchronous": 1,  # NORMAL
+            "foreign_keys": 1,
+            "temp_store": 2,  # MEMORY
+            "cache_size": -64000,
+            "mmap_size": 268435456,
+            "busy_timeout": settings.DB_STATEMENT_TIMEOUT_MS or 5000,
+        }
+        # Every pooled connection is configured, not just the first
+        with engine.connect() as first, engine.connect() as second:
+            assert [conn.execute(text("PRAGMA synchronous")).scalar() for conn in (first, second)] == [1, 1]
+    finally:
+        engine.dispose()
+
+
+def test_in_memory_sqlite_keeps_its_journal():
+    engine = create_db_engine("sqlite://")
+    pragmas = _pragmas(engine, ["journal_mode", "foreign_keys"])
+    assert pragmas == {"journal_mode": "memory", "foreign_keys": 1}
+    engine.dispose()
+
+
+class FakeMySQL:
+    """Records the statements run; GET_LOCK answers with got_lock"""
+
+    def __init__(self, got_lock):
+        self.dialect = SimpleNamespace(name="mysql")
+        self.got_lock = got_lock
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement).split("(")[0])
+        return SimpleNamespace(scalar=lambda: self.got_lock)
+
+
+def test_mysql_migration_lock_is_checked_and_always_released():
+    conn = FakeMySQL(got_lock=1)
+    with pytest.raises(ZeroDivisionError):
+        with _lock(conn):
+            1 / 0
+    assert conn.statements == ["SELECT GET_LOCK", "SELECT RELEASE_LOCK"]
+
+    # Timed out (0) or failed (NULL): no migrations run without the lock
+    for got_lock in (0, None):
+        conn = FakeMySQL(got_lock)
+        with pytest.raises(RuntimeError):
+            with _lock(conn):
+                pytest.fail("ran without the lock")
+        assert conn.statements == ["SELECT GET_LOCK"]
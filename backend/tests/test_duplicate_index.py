@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from app.services.duplicate_index import ComplaintGeoIndex, haversine_meters
+
+NOW = datetime(2026, 1, 15, 10, 0, 0)
+LAT, LON = 22.3072, 73.1812  # Vadodara
+
+
+def make_index():
+    index = ComplaintGeoIndex(radius_meters=50, window_hours=48)
+    index.add("CMP-A", "sewage_potholes_roads", "Pothole on Road", LAT, LON, NOW)
+    return index
+
+def test_finds_nearby_report_of_same_sub_issue():
+    index = make_index()
+    # ~20 m north-east of the original report
+    lat, lon = LAT + 0.00013, LON + 0.00013
+    assert haversine_meters(LAT, LON, lat, lon) < 50
+    assert index.find_duplicate("sewage_potholes_roads", "Pothole on Road", lat, lon, NOW + timedelta(hours=3)) == "CMP-A"
+
+def test_ignores_far_away_other_issue_or_stale_reports():
+    index = make_index()
+    assert index.find_duplicate("sewage_potholes_roads", "Pothole on Road", LAT + 0.001, LON, NOW) is None
+    assert index.find_duplicate("sewage_potholes_roads", "Road Damage", LAT, LON, NOW) is None
+    assert index.find_duplicate("sewage_potholes_roads", "Pothole on Road", LAT, LON, NOW + timedelta(hours=49)) is None
+    assert index.find_duplicate("sewage_potholes_roads", "Pothole on Road", None, None, NOW) is None
+
+def test_matches_across_cell_and_time_bucket_boundaries():
+    index = ComplaintGeoIndex(radius_meters=50, window_hours=48)
+    cell = index.cell_degrees
+    # Place the original report just below a cell edge and query just above it
+    edge_lat = (index._row(LAT) + 1) * cell
+    index.add("CMP-B", "electricity_issues", "Exposed Wires", edge_lat - cell * 0.1, LON, NOW)
+    bucket_end = datetime.fromtimestamp((index._time_bucket(NOW.timestamp()) + 1) * index.window_seconds)
+    assert index.find_duplicate("electricity_issues", "Exposed Wires", edge_lat + cell * 0.1, LON, bucket_end + timedelta(minutes=5)) == "CMP-B"
+
+def test_remove_and_prune():
+    index = make_index()
+    index.remove("CMP-A")
+    assert index.find_duplicate("sewage_potholes_roads", "Pothole on Road", LAT, LON, NOW) is None
+
+    index = make_index()
+    index.prune(NOW + timedelta(days=10))
+    assert index._buckets == {}
+    assert index._locations == {}
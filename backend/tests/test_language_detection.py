@@ -0,0 +1,46 @@
+import pytest
+from app.services.conversation_router import ConversationRouter
+from app.services.conversation_state import ConversationState, conversation_manager
+from app.services.language_detection import detect_script, language_detector
+from app.services.translations import get_text
+
+
+@pytest.fixture(scope="module", autouse=True)
+def profiles():
+    if language_detector._factory is None:
+        language_detector.load()
+
+
+def test_first_message_language():
+    assert detect_script("मेरी गली में कचरा पड़ा है") == "hi"
+    assert detect_script("મારા વિસ્તારમાં લાઈટ નથી") == "gu"
+    assert detect_script("Pothole near 12 Station Road") is None
+    assert language_detector.detect_text("I want to report a broken street light") == "en"
+    # Too short or romanized: left to the language menu
+    for text in ("Hi", "Good morning", "namaste mujhe shikayat karni hai", "12345 678 90"):
+        assert language_detector.detect_text(text) is None
+
+
+def test_detected_language_skips_the_menu():
+    router = ConversationRouter()
+    phone = "919000000001"
+    conversation_manager.reset_session(phone)
+    reply = router.process_message(phone, "નમસ્તે, મારે ફરિયાદ કરવી છે")
+    session = conversation_manager.get_session(phone)
+    assert session["state"] == ConversationState.WELCOME_SELECTION.value and session["language"] == "gu"
+    assert reply["body"] == get_text("welcome_title", "gu")
+
+
+def test_chosen_language_is_remembered_for_the_next_conversation():
+    router = ConversationRouter()
+    phone = "919000000002"
+    conversation_manager.reset_session(phone)
+    language_detector.forget(phone)
+    reply = router.process_message(phone, "Hi")
+    assert conversation_manager.get_session(phone)["state"] == ConversationState.LANGUAGE_SELECTION.value
+    router.process_message(phone, "2")
+
+    reply = router.process_message(phone, "hi")
+    session = conversation_manager.get_session(phone)
+    assert session["state"] == ConversationState.WELCOME_SELECTION.value and session["language"] == "hi"
+    assert reply["body"] == get_text("welcome_title", "hi")
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import httpx
+import pytest
+from app.core.config import settings
+from app.db.models import Complaint, ComplaintStatus, NotificationOutbox, User
+from app.services.complaint_status import apply_status_updates
+from app.services.language_detection import language_detector
+from app.services.notification_outbox import FAILED, PENDING, SENT, SUPERSEDED, OutboxRelay, outbox_metrics, outbox_status
+from app.services.translations import get_text
+from app.services.whatsapp import WhatsAppSendError, WhatsAppService
+
+
+class FakeSender:
+    def __init__(self, fail_for=()):
+        self.fail_for = set(fail_for)
+        self.sent = []
+
+    async def __call__(self, to, text):
+        if to in self.fail_for:
+            return None
+        self.sent.append((to, text))
+        return {"messages": [{"id": "wamid.1"}]}
+
+
+@pytest.fixture
+def session_factory(db_sessions):
+    factory = db_sessions
+    db = factory()
+    db.add(User(id=1, login_id="LOGIN-A", name="Asha", mobile="9000000001", ward_number="Ward 10"))
+    db.add(User(id=2, login_id="LOGIN-B", name="Bhavin", mobile="9000000002", ward_number="Ward 3"))
+    db.add_all([
+        Complaint(complaint_id="CMP-A", user_id=1, login_id="LOGIN-A", category="garbage", status=ComplaintStatus.PENDING),
+        Complaint(complaint_id="CMP-B", user_id=2, login_id="LOGIN-B", category="garbage", status=ComplaintStatus.PENDING),
+    ])
+    db.commit()
+    db.close()
+    # Other tests chat from these numbers; notices default to English
+    for phone_number in ("919000000001", "919000000002"):
+        language_detector.forget(phone_number)
+    return factory
+
+
+def _outbox(factory):
+    db = factory()
+    try:
+        return {row.id: row for row in db.query(NotificationOutbox)}
+    finally:
+        db.close()
+
+
+def _make_due(factory):
+    """Skip the retry backoff"""
+    db = factory()
+    db.query(NotificationOutbox).filter(NotificationOutbox.state == PENDING).update(
+        {NotificationOutbox.next_attempt_at: NotificationOutbox.created_at}
+    )
+    db.commit()
+    db.close()
+
+
+def test_status_change_queues_notification_in_same_transaction(session_factory):
+    apply_status_updates([("CMP-A", "resolved"), ("CMP-B", "pending")], session_factory=session_factory)
+
+    rows = list(_outbox(session_factory).values())
+    # CMP-B was already pending, so only CMP-A's citizen is told
+    assert len(rows) == 1
+    assert (rows[0].subject, rows[0].recipient, rows[0].state) == ("CMP-A", "919000000001", PENDING)
+    assert "CMP-A" in rows[0].message and "resolved" in rows[0].message
+
+
+def test_notification_is_in_the_citizens_language(session_factory):
+    language_detector.remember("919000000001", "hi")
+    apply_status_updates([("CMP-A", "resolved"), ("CMP-B", "resolved")], session_factory=session_factory)
+    language_detector.forget("919000000001")
+
+    messages = {row.subject: row.message for row in _outbox(session_factory).values()}
+    assert messages["CMP-A"] == get_text(
+        "complaint_status_update", "hi", complaint_id="CMP-A", status=get_text("status_resolved", "hi")
+    )
+    # No language known for this citizen
+    assert messages["CMP-B"] == get_text(
+        "complaint_status_update", "en", complaint_id="CMP-B", status=get_text("status_resolved", "en")
+    )
+
+
+def test_relay_sends_once_and_supersedes_older_notices(session_factory):
+    apply_status_updates([("CMP-A", "in_progress"), ("CMP-B", "resolved")], session_factory=session_factory)
+    apply_status_updates([("CMP-A", "resolved")], session_factory=session_factory)
+    sender = FakeSender()
+    relay = OutboxRelay(session_factory=session_factory, sender=sender, batch_size=10)
+    sent_before = outbox_metrics["sent_total"]
+
+    assert asyncio.run(relay.drain_once()) == 3
+    # CMP-A's "in progress" notice is superseded by its "resolved" notice in the same batch
+    assert sorted(to for to, _ in sender.sent) == ["919000000001", "919000000002"]
+    assert all("resolved" in text for _, text in sender.sent)
+    states = sorted(row.state for row in _outbox(session_factory).values())
+    assert states == [SENT, SENT, SUPERSEDED]
+    assert outbox_metrics["sent_total"] == sent_before + 2
+
+    # Nothing left to deliver
+    assert asyncio.run(relay.drain_once()) == 0
+    assert len(sender.sent) == 2
+
+
+def test_failed_sends_are_retried_then_given_up(session_factory):
+    apply_status_updates([("CMP-A", "resolved")], session_factory=session_factory)
+    sender = FakeSender(fail_for={"919000000001"})
+    relay = OutboxRelay(session_factory=session_factory, sender=sender, max_attempts=2)
+
+    asyncio.run(relay.drain_once())
+    (row,) = _outbox(session_factory).values()
+    assert (row.state, row.attempts, row.claimed_by) == (PENDING, 1, None)
+    assert row.next_attempt_at > row.created_at and row.last_error
+    # Not due yet
+    assert asyncio.run(relay.drain_once()) == 0
+
+    _make_due(session_factory)
+    asyncio.run(relay.drain_once())
+    (row,) = _outbox(session_factory).values()
+    assert (row.state, row.attempts) == (FAILED, 2)
+
+    db = session_factory()
+    assert outbox_status(db)["counts"][FAILED] == 1
+    db.close()
+
+
+def test_retry_is_superseded_by_a_newer_notice(session_factory):
+    apply_status_updates([("CMP-A", "in_progress")], session_factory=session_factory)
+    sender = FakeSender(fail_for={"919000000001"})
+    relay = OutboxRelay(session_factory=session_factory, sender=sender)
+    asyncio.run(relay.drain_once())
+
+    # While "in progress" waits for its retry, the complaint is resolved and that notice goes out
+    apply_status_updates([("CMP-A", "resolved")], session_factory=session_factory)
+    sender.fail_for.clear()
+    assert asyncio.run(relay.drain_once()) == 1
+    _make_due(session_factory)
+    assert asyncio.run(relay.drain_once()) == 1
+
+    assert len(sender.sent) == 1 and "resolved" in sender.sent[0][1]
+    states = [row.state for _, row in sorted(_outbox(session_factory).items())]
+    assert states == [SUPERSEDED, SENT]
+
+
+def test_errors_no_retry_can_fix_fail_at_once(session_factory):
+    apply_status_updates([("CMP-A", "resolved")], session_factory=session_factory)
+
+    async def outside_window(to, text):
+        raise WhatsAppSendError(400, 131047, "Re-engagement message")
+
+    relay = OutboxRelay(session_factory=session_factory, sender=outside_window, max_attempts=5)
+    asyncio.run(relay.drain_once())
+    (row,) = _outbox(session_factory).values()
+    assert (row.state, row.attempts) == (FAILED, 1) and "131047" in row.last_error
+
+
+def test_notifications_use_the_configured_template(monkeypatch):
+    requests = []
+
+    def graph(request):
+        requests.append(json.loads(request.content))
+        if len(requests) == 1:
+            return httpx.Response(200, json={"messages": [{"id": "wamid.1"}]})
+        return httpx.Response(400, json={"error": {"code": 131047, "message": "Re-engagement message"}})
+
+    monkeypatch.setattr(settings, "NOTIFY_TEMPLATE_NAME", "complaint_update")
+    service = WhatsAppService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(graph))
+    assert asyncio.run(service.send_notification("919000000001", "Resolved"))
+    assert requests[0]["type"] == "template"
+    assert requests[0]["template"] == {
+        "name": "complaint_update",
+        "language": {"code": settings.NOTIFY_TEMPLATE_LANG},
+        "components": [{"type": "body", "parameters": [{"type": "text", "text": "Resolved"}]}],
+    }
+
+    monkeypatch.setattr(settings, "NOTIFY_TEMPLATE_NAME", "")
+    with pytest.raises(WhatsAppSendError) as refused:
+        asyncio.run(service.send_notification("919000000001", "Resolved"))
+    assert requests[1]["text"] == {"body": "Resolved"} and refused.value.permanent
+    asyncio.run(service.close())
+
+
+def test_claimed_rows_are_not_claimed_again_until_the_lease_expires(session_factory):
+    apply_status_updates([("CMP-A", "resolved")], session_factory=session_factory)
+    first = OutboxRelay(session_factory=session_factory, sender=FakeSender())
+    second = OutboxRelay(session_factory=session_factory, sender=FakeSender())
+
+    token, rows = first.claim_batch()
+    assert len(rows) == 1
+    assert second.claim_batch()[1] == []
@@ -0,0 +1,72 @@
+import os
+import pytest
+from app.core.config import settings
+from app.db.models import PropertyTax, TaxStatus
+from app.services import pdf_service
+from app.services.events import PropertyTaxUpdated, event_bus
+from app.services.pdf_service import cached_pdf_path, evict, generate_property_tax_pdf, pdf_cache_metrics, receipt_fields
+
+
+@pytest.fixture(autouse=True)
+def pdf_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_service, "_cache_bytes", None)
+    return tmp_path
+
+
+def _record(**overrides):
+    values = dict(property_id="PROP-001", owner_name="John Doe", address="123 Main Street", amount=15000.0,
+                  status=TaxStatus.PAID, year=2025, receipt_no="REC-2025-001", bill_no=None)
+    values.update(overrides)
+    return PropertyTax(**values)
+
+
+def test_unchanged_record_is_served_without_rendering(pdf_dir, monkeypatch):
+    misses, hits = pdf_cache_metrics["misses"], pdf_cache_metrics["hits"]
+    url = generate_property_tax_pdf(_record())
+    assert url.startswith("/pdfs/property_tax_PROP-001_") and url.endswith(".pdf")
+    assert (pdf_dir / os.path.basename(url)).read_bytes().startswith(b"%PDF")
+
+    def fail(*args):
+        raise AssertionError("rendered on a cache hit")
+    monkeypatch.setattr(pdf_service, "render_property_tax_pdf", fail)
+    assert generate_property_tax_pdf(_record()) == url
+    assert (pdf_cache_metrics["misses"], pdf_cache_metrics["hits"]) == (misses + 1, hits + 1)
+    # No temporary files are left behind
+    assert [p.name for p in pdf_dir.iterdir()] == [os.path.basename(url)]
+
+
+def test_changed_record_or_template_gets_a_new_file(monkeypatch):
+    paid = cached_pdf_path(receipt_fields(_record()))
+    due = cached_pdf_path(receipt_fields(_record(status=TaxStatus.DUE)))
+    assert paid != due and os.path.exists(paid)
+    monkeypatch.setattr(pdf_service, "TEMPLATE_VERSION", "test")
+    assert cached_pdf_path(receipt_fields(_record())) != paid
+
+
+def test_failed_render_leaves_no_file(pdf_dir, monkeypatch):
+    def broken(fields, path):
+        open(path, "wb").write(b"%PDF-partial")
+        raise RuntimeError("boom")
+    monkeypatch.setattr(pdf_service, "render_property_tax_pdf", broken)
+    with pytest.raises(RuntimeError):
+        cached_pdf_path(receipt_fields(_record()))
+    assert list(pdf_dir.iterdir()) == []
+
+
+def test_eviction_removes_least_recently_used_first(pdf_dir):
+    paths = [cached_pdf_path(receipt_fields(_record(property_id=f"PROP-{i}"))) for i in range(3)]
+    for age, path in zip((300, 100, 200), paths):
+        os.utime(path, (0, 1_000_000 - age))
+    size = os.path.getsize(paths[0])
+
+    # Over the bound, so files go until 90% of it (2.25 files) is left
+    assert evict(max_bytes=int(size * 2.5)) == 1
+    assert [os.path.exists(p) for p in paths] == [False, True, True]
+
+
+def test_property_tax_updates_drop_cached_receipts():
+    path = cached_pdf_path(receipt_fields(_record()))
+    other = cached_pdf_path(receipt_fields(_record(property_id="PROP-002")))
+    event_bus.publish(PropertyTaxUpdated(property_ids=("PROP-001",), updated_at=None))
+    assert not os.path.exists(path) and os.path.exists(other)
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import threading
+import pytest
+from app.core.config import settings
+from app.db.models import PropertyTax, TaxStatus
+from app.services import pdf_service
+from app.services.pdf_render_pool import PdfRenderBusy, PdfRenderPool, PdfRenderTimeout
+from app.services.pdf_service import receipt_fields
+
+
+@pytest.fixture(autouse=True)
+def pdf_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_service, "_cache_bytes", None)
+    return tmp_path
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """Hold thread renders until released, counting how many started"""
+    release = threading.Event()
+    started = []
+    render = pdf_service.render_property_tax_pdf
+
+    def slow_render(fields, path):
+        started.append(fields["property_id"])
+        release.wait(5)
+        render(fields, path)
+    monkeypatch.setattr(pdf_service, "render_property_tax_pdf", slow_render)
+    yield started, release
+    release.set()
+
+
+def _fields(property_id="PROP-001"):
+    return receipt_fields(PropertyTax(property_id=property_id, owner_name="John Doe", address="123 Main Street",
+                                      amount=15000.0, status=TaxStatus.PAID, year=2025, receipt_no="REC-1"))
+
+
+def test_concurrent_requests_share_one_render(gate):
+    started, release = gate
+    pool = PdfRenderPool(workers=0, max_pending=4, timeout=5)
+
+    async def scenario():
+        waiters = [asyncio.create_task(pool.render(_fields())) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*waiters)
+
+    paths = asyncio.run(scenario())
+    assert len(set(paths)) == 1 and os.path.exists(paths[0])
+    assert started == ["PROP-001"]
+    assert (pool.metrics["renders"], pool.metrics["shared"]) == (1, 4)
+    # Served from the cache afterwards
+    assert asyncio.run(pool.render(_fields())) == paths[0]
+    pool.shutdown()
+
+
+def test_pending_renders_are_bounded(gate):
+    started, release = gate
+    pool = PdfRenderPool(workers=0, max_pending=1, timeout=5)
+    future = pool.submit(_fields("PROP-001"))
+    with pytest.raises(PdfRenderBusy):
+        pool.submit(_fields("PROP-002"))
+    # Prefetch gives up quietly instead
+    pool.prefetch(_fields("PROP-002"))
+    assert pool.metrics["rejected"] == 2
+    release.set()
+    future.result(timeout=5)
+    pool.shutdown()
+
+
+def test_timed_out_render_still_lands_in_the_cache(gate):
+    started, release = gate
+    pool = PdfRenderPool(workers=0, max_pending=4, timeout=0.05)
+    with pytest.raises(PdfRenderTimeout):
+        asyncio.run(pool.render(_fields()))
+    future = pool.submit(_fields())
+    release.set()
+    path, _ = future.result(timeout=5)
+    assert os.path.exists(path) and started == ["PROP-001"]
+    pool.shutdown()
+
+
+def test_process_pool_renders_receipt():
+    pool = PdfRenderPool(workers=1, max_pending=4, timeout=60)
+    try:
+        path = asyncio.run(pool.render(_fields()))
+        with open(path, "rb") as f:
+            assert f.read(4) == b"%PDF"
+        assert pool.stats()["mode"] == "processes"
+    finally:
+        pool.shutdown()
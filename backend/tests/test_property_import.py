@@ -0,0 +1,71 @@
+import io
+import pytest
+from app.db.models import PropertyTax, TaxStatus
+from app.services.events import PropertyTaxUpdated, event_bus
+from app.services.property_import import import_property_file, validate_row
+
+ROLL = """Property ID,Owner Name,Address,Amount,Status,Year,Receipt No
+PROP-001,John Doe,"123 Main Street, Ward 1","15,000",Paid,2025,REC-2025-001
+prop-100,Asha Patel,"9 Lake Road, Ward 10",4200.50,due,2025,
+PROP-101,Bhavin Shah,"1 Station Road, Ward 3",abc,due,2025,
+PROP-102,,"2 Station Road, Ward 3",100,due,2025,
+PROP-103,Chetan Rao,"3 Station Road, Ward 3",100,overdue,2025,
+PROP-104,Dina Mehta,"4 Station Road, Ward 3",900,pending,2025,
+PROP-104,Dina Mehta,"4 Station Road, Ward 3",950,pending,2026,
+"""
+
+
+@pytest.fixture
+def session_factory(db_sessions):
+    factory = db_sessions
+    db = factory()
+    db.add(PropertyTax(property_id="PROP-001", owner_name="Old Owner", address="Old", amount=1.0,
+                       status=TaxStatus.DUE, year=2024))
+    db.commit()
+    db.close()
+    return factory
+
+
+@pytest.fixture
+def updates():
+    received = []
+    event_bus.subscribe(PropertyTaxUpdated, received.append)
+    yield received
+    event_bus.unsubscribe(PropertyTaxUpdated, received.append)
+
+
+def test_validate_row_normalizes_values():
+    row = validate_row({"property_id": " prop-9 ", "owner_name": "A", "address": "B",
+                        "amount": "₹1,200", "status": "PAID", "year": 2025.0, "receipt_no": ""})
+    assert row["property_id"] == "PROP-9"
+    assert row["amount"] == 1200.0
+    assert row["status"] == TaxStatus.PAID
+    assert row["year"] == 2025
+    assert row["receipt_no"] is None
+
+
+def test_csv_import_upserts_in_batches_and_reports_bad_rows(session_factory, updates):
+    report = import_property_file(io.BytesIO(ROLL.encode()), "roll.csv", batch_size=2, session_factory=session_factory)
+
+    assert report.rows_read == 7
+    # The repeated PROP-104 falls in one chunk, so only its last row is written
+    assert report.rows_upserted == 3
+    assert [(e["line"], e["property_id"]) for e in report.errors] == [(4, "PROP-101"), (5, "PROP-102"), (6, "PROP-103")]
+    assert report.as_dict()["rows_rejected"] == 3
+    # Every committed chunk announces its property IDs
+    assert sorted(pid for event in updates for pid in event.property_ids) == ["PROP-001", "PROP-100", "PROP-104"]
+
+    db = session_factory()
+    records = {p.property_id: p for p in db.query(PropertyTax)}
+    db.close()
+    assert set(records) == {"PROP-001", "PROP-100", "PROP-104"}
+    assert records["PROP-001"].owner_name == "John Doe"
+    assert records["PROP-001"].amount == 15000.0
+    assert records["PROP-001"].status == TaxStatus.PAID
+    assert records["PROP-100"].receipt_no is None
+    assert (records["PROP-104"].amount, records["PROP-104"].year) == (950.0, 2026)
+
+
+def test_missing_columns_are_rejected(session_factory):
+    with pytest.raises(ValueError, match="owner_name"):
+        import_property_file(io.BytesIO(b"property_id,amount\nPROP-1,10\n"), "roll.csv", session_factory=session_factory)
@@ -0,0 +1,24 @@
+from sqlalchemy import text
+from app.db.database import create_db_engine
+from app.db.migrations import MIGRATIONS, applied_versions, run_migrations
+from app.db.query_plans import find_sequential_scans
+
+
+def test_migrations_are_recorded_once():
+    engine = create_db_engine("sqlite://")
+    assert run_migrations(engine) == [m.version for m in MIGRATIONS]
+    assert run_migrations(engine) == []
+    with engine.begin() as conn:
+        assert set(applied_versions(conn)) == {m.version for m in MIGRATIONS}
+
+def test_hot_queries_use_indexes():
+    engine = create_db_engine("sqlite://")
+    run_migrations(engine)
+    assert find_sequential_scans(engine) == {}
+
+def test_missing_index_is_flagged():
+    engine = create_db_engine("sqlite://")
+    run_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_property_tax_receipt_no"))
+    assert find_sequential_scans(engine) == {"property tax by receipt_no": ["property_tax"]}
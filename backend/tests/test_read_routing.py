@@ -0,0 +1,73 @@
+import pytest
+from datetime import datetime
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.db.database import create_db_engine
+from app.db.migrations import run_migrations
+from app.db.models import Complaint, ComplaintStatus, User
+from app.db.routing import ReadRouter, read_router
+from app.services.events import ComplaintCreated, event_bus
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """A primary and a (never replicated) replica, so it is visible which one served a read"""
+    primary = create_db_engine(f"sqlite:///{tmp_path / 'primary.sqlite3'}")
+    replica_url = f"sqlite:///{tmp_path / 'replica.sqlite3'}"
+    run_migrations(primary)
+    run_migrations(create_db_engine(replica_url))
+    replica = create_db_engine(replica_url, read_only=True)
+
+    db = sessionmaker(bind=primary)()
+    db.add(User(id=1, login_id="LOGIN-A", name="Asha", mobile="9000000001", area="Alkapuri", ward_number="Ward 10"))
+    db.add(Complaint(complaint_id="CMP-1", user_id=1, login_id="LOGIN-A", category="water_supply",
+                     status=ComplaintStatus.PENDING))
+    db.commit()
+    db.close()
+    yield sessionmaker(bind=primary), sessionmaker(bind=replica)
+    primary.dispose()
+    replica.dispose()
+
+
+def _complaints(db, login_id):
+    try:
+        return [c for (c,) in db.query(Complaint.complaint_id).filter(Complaint.login_id == login_id)]
+    finally:
+        db.close()
+
+
+def test_reads_use_replica_unless_key_was_just_written(databases):
+    primary, replica = databases
+    router = ReadRouter(primary, replica, sticky_seconds=60)
+
+    assert _complaints(router.session("LOGIN-A"), "LOGIN-A") == []
+
+    router.mark_written("LOGIN-A")
+    assert _complaints(router.session("LOGIN-A"), "LOGIN-A") == ["CMP-1"]
+    # Other citizens and keyless dashboard reads still go to the replica
+    assert router.session("LOGIN-B").get_bind() is replica.kw["bind"]
+    assert router.session().get_bind() is replica.kw["bind"]
+
+
+def test_sticky_window_expires(databases):
+    primary, replica = databases
+    router = ReadRouter(primary, replica, sticky_seconds=0)
+    router.mark_written("LOGIN-A")
+    assert not router.recently_written("LOGIN-A")
+
+
+def test_replica_rejects_writes(databases):
+    _, replica = databases
+    db = replica()
+    db.add(User(login_id="LOGIN-X", name="X", mobile="9000000009"))
+    with pytest.raises(OperationalError):
+        db.commit()
+    db.close()
+
+
+def test_created_complaints_pin_their_login_to_the_primary():
+    event_bus.publish(ComplaintCreated(
+        complaint_id="CMP-2", login_id="LOGIN-PINNED", category="water_supply", sub_issue=None,
+        status=ComplaintStatus.PENDING, ward=None, latitude=None, longitude=None, created_at=datetime.utcnow()
+    ))
+    assert read_router.recently_written("LOGIN-PINNED")
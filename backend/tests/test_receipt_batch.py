@@ -0,0 +1,95 @@
+import io
+import zipfile
+import pypdf
+import pytest
+from app.core.config import settings
+from app.db.models import PropertyTax, TaxStatus
+from app.services import pdf_service, receipt_batch
+from app.services.pdf_service import cached_pdf_path, render_receipts_pdf
+from app.services.property_import import normalize_ward
+from app.services.receipt_batch import ChunkFailed, batch_jobs, iter_receipts, select_receipts, start_job
+
+
+@pytest.fixture(autouse=True)
+def pdf_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_service, "_cache_bytes", None)
+    return tmp_path
+
+
+@pytest.fixture
+def db(db_sessions):
+    session = db_sessions()
+    for i, (ward, status, year) in enumerate([
+        ("Ward 3", TaxStatus.DUE, 2025), ("Ward 3", TaxStatus.PAID, 2025),
+        ("Ward 3", TaxStatus.DUE, 2024), ("Ward 10", TaxStatus.DUE, 2025),
+    ]):
+        session.add(PropertyTax(property_id=f"PROP-{i:03d}", owner_name=f"Owner {i}", address=f"{i} Station Road",
+                                amount=100.0 + i, status=status, year=year, ward_number=ward))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_filters_select_matching_properties_in_order(db):
+    assert normalize_ward("3") == normalize_ward("ward 3") == "Ward 3"
+    assert [r["property_id"] for r in select_receipts(db, ward="3")] == ["PROP-000", "PROP-001", "PROP-002"]
+    assert [r["property_id"] for r in select_receipts(db, ward="Ward 3", year=2025, status=TaxStatus.DUE)] == ["PROP-000"]
+    assert select_receipts(db, ward="99") == []
+
+
+def test_zip_batch_reuses_cache_and_reports_progress(db):
+    receipts = select_receipts(db, ward="3")
+    cached = cached_pdf_path(receipts[0])
+    job = start_job(len(receipts), "zip", {"ward": "3"})
+
+    data = b"".join(iter_receipts("zip", receipts, job, workers=1, chunk_size=1))
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = sorted(archive.namelist())
+        assert names == ["property_tax_PROP-000.pdf", "property_tax_PROP-001.pdf", "property_tax_PROP-002.pdf"]
+        assert archive.read(names[0]) == open(cached, "rb").read()
+        assert all(archive.read(name).startswith(b"%PDF") for name in names)
+
+    progress = batch_jobs[job.job_id].as_dict()
+    assert (progress["state"], progress["cached"], progress["rendered"], progress["failed"]) == ("done", 1, 2, 0)
+    assert progress["progress"] == 1.0
+    # Rendered receipts landed in the PDF cache for the single-receipt endpoint
+    assert all(pdf_service.lookup(fields) for fields in receipts)
+
+
+def test_receipt_evicted_after_lookup_is_rendered(db, pdf_dir, monkeypatch):
+    receipts = select_receipts(db, ward="3")
+    # Every lookup hits, but the file is deleted before the zip reads it
+    monkeypatch.setattr(receipt_batch, "lookup", lambda fields: str(pdf_dir / "evicted.pdf"))
+    job = start_job(len(receipts), "zip", {"ward": "3"})
+
+    data = b"".join(iter_receipts("zip", receipts, job, workers=1, chunk_size=2))
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert len(archive.namelist()) == 3
+        assert all(archive.read(name).startswith(b"%PDF") for name in archive.namelist())
+    progress = batch_jobs[job.job_id].as_dict()
+    assert (progress["state"], progress["cached"], progress["rendered"]) == ("done", 0, 3)
+
+
+def test_failed_chunk_aborts_the_zip(db):
+    receipts = select_receipts(db, ward="3")
+    # Unformattable amount: the render fails in the worker
+    receipts[1]["amount"] = "n/a"
+    job = start_job(len(receipts), "zip", {"ward": "3"})
+
+    with pytest.raises(ChunkFailed):
+        b"".join(iter_receipts("zip", receipts, job, workers=1, chunk_size=1))
+    progress = batch_jobs[job.job_id].as_dict()
+    assert (progress["state"], progress["failed"]) == ("failed", 1)
+    assert "failed to render" in progress["error"]
+
+
+def test_merged_pdf_has_a_page_per_receipt(db):
+    receipts = select_receipts(db)
+    job = start_job(len(receipts), "pdf", {})
+    data = b"".join(iter_receipts("pdf", receipts, job, workers=2, chunk_size=3))
+    assert len(pypdf.PdfReader(io.BytesIO(data)).pages) == len(receipts) == 4
+    assert job.as_dict()["rendered"] == 4
+
+    single = pypdf.PdfReader(io.BytesIO(render_receipts_pdf(receipts[:2])))
+    assert len(single.pages) == 2
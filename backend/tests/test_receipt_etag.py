@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import PropertyTax
+from app.services import pdf_service
+from app.services.events import PropertyTaxUpdated, event_bus
+from app.services.receipt_validators import validator_index
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_service, "_cache_bytes", None)
+    validator_index.clear()
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_matching_etag_is_answered_without_db_or_render(client, monkeypatch):
+    first = client.get("/api/property-tax/pdf/prop-001")
+    assert first.status_code == 200 and first.content.startswith(b"%PDF")
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+    assert etag.startswith('"') and first.headers["cache-control"] == "private, no-cache"
+
+    def no_db():
+        raise AssertionError("database used for a conditional GET")
+    monkeypatch.setattr(main, "ReadSessionLocal", no_db)
+    for headers in ({"If-None-Match": etag}, {"If-None-Match": f'"other", W/{etag}'},
+                    {"If-Modified-Since": last_modified}):
+        again = client.get("/api/property-tax/pdf/PROP-001", headers=headers)
+        assert again.status_code == 304 and again.content == b""
+        assert again.headers["etag"] == etag
+
+
+def _add_to_amount(delta):
+    db = SessionLocal()
+    record = db.query(PropertyTax).filter(PropertyTax.property_id == "PROP-001").one()
+    record.amount += delta
+    db.commit()
+    db.close()
+    event_bus.publish(PropertyTaxUpdated(property_ids=("PROP-001",), updated_at=None))
+
+
+def test_changed_record_gets_a_new_etag(client):
+    etag = client.get("/api/property-tax/pdf/PROP-001").headers["etag"]
+    # The seeded record is shared with the rest of the suite; put it back afterwards
+    _add_to_amount(100)
+    try:
+        changed = client.get("/api/property-tax/pdf/PROP-001", headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.content.startswith(b"%PDF")
+        assert changed.headers["etag"] != etag
+        # A stale If-Modified-Since is ignored while If-None-Match is present
+        assert client.get("/api/property-tax/pdf/PROP-001",
+                          headers={"If-None-Match": etag, "If-Modified-Since": changed.headers["last-modified"]}
+                          ).status_code == 200
+    finally:
+        _add_to_amount(-100)
@@ -0,0 +1,42 @@
+import importlib
+import json
+import sys
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from app.core import serialization
+from app.db.models import ComplaintStatus
+
+ROW = {
+    "id": 7,
+    "status": ComplaintStatus.IN_PROGRESS,
+    "created_at": datetime(2026, 1, 1, 10, 0, 0, 123456),
+    "latitude": 22.3,
+    "description": "પાણી નથી",
+    "image_url": None,
+}
+
+
+def _starlette(content):
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def test_output_matches_fastapi_encoding_with_and_without_orjson(monkeypatch):
+    expected = _starlette(jsonable_encoder({"items": [ROW], "next_cursor": None}))
+    assert serialization.dumps({"items": [ROW], "next_cursor": None}) == expected
+
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    fallback = importlib.reload(serialization)
+    try:
+        assert fallback.orjson is None
+        assert fallback.dumps({"items": [ROW], "next_cursor": None}) == expected
+    finally:
+        monkeypatch.undo()
+        importlib.reload(serialization)
+
+
+def test_columnar_layout():
+    page = {"items": [dict(ROW, id=1), dict(ROW, id=2)], "next_cursor": "abc"}
+    body = json.loads(serialization.page_body(page, "columns", ["id", "status"]))
+    assert body == {"columns": {"id": [1, 2], "status": [ROW["status"].value] * 2}, "count": 2, "next_cursor": "abc"}
+    # An empty page still names its columns
+    assert json.loads(serialization.page_body({"items": [], "next_cursor": None}, "columns", ["id"]))["columns"] == {"id": []}
@@ -0,0 +1,81 @@
+import ast
+import json
+import os
+import shutil
+import pytest
+from app.core.config import settings
+from app.services import translations
+from app.services.translations import Catalog, CatalogError, get_text, get_words, reload_catalog
+
+SERVICES = os.path.join(os.path.dirname(translations.__file__))
+
+
+@pytest.fixture
+def locales(tmp_path, monkeypatch):
+    """A writable copy of the catalog, restored afterwards"""
+    directory = tmp_path / "locales"
+    shutil.copytree(settings.LOCALES_DIR, directory)
+    monkeypatch.setattr(settings, "LOCALES_DIR", str(directory))
+    yield directory
+    monkeypatch.undo()
+    reload_catalog()
+
+
+def _edit(directory, lang, **changes):
+    path = directory / f"{lang}.json"
+    messages = json.loads(path.read_text(encoding="utf-8"))
+    messages.update(changes)
+    path.write_text(json.dumps(messages, ensure_ascii=False), encoding="utf-8")
+    # Make sure the change is visible to an mtime check on coarse filesystems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_every_call_site_passes_the_placeholders_its_message_needs():
+    fields = {key: message.fields for key, message in translations.catalog.messages["en"].items()}
+    checked = 0
+    for name in os.listdir(SERVICES):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(SERVICES, name), encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "get_text" \
+                    and node.args and isinstance(node.args[0], ast.Constant):
+                key = node.args[0].value
+                assert key in fields, f"{name}: unknown message {key!r}"
+                assert {kw.arg for kw in node.keywords} >= fields[key], f"{name}: {key!r} needs {sorted(fields[key])}"
+                checked += 1
+    assert checked > 40
+
+
+def test_mismatched_placeholder_is_rejected_at_load(locales):
+    _edit(locales, "hi", ask_mobile="धन्यवाद, {naam}!")
+    with pytest.raises(CatalogError, match=r"hi\.ask_mobile: placeholders \['naam'\] differ"):
+        Catalog.load(str(locales))
+    _edit(locales, "hi", ask_mobile="धन्यवाद!", unknown_key="x")
+    with pytest.raises(CatalogError, match="hi.unknown_key: not in en.json"):
+        Catalog.load(str(locales))
+
+
+def test_changed_files_are_reloaded_and_bad_edits_keep_the_old_catalog(locales, monkeypatch):
+    reload_catalog()
+    monkeypatch.setattr(settings, "TRANSLATIONS_RELOAD_SECONDS", 0.001)
+    monkeypatch.setattr(translations, "_next_check", 0)
+
+    _edit(locales, "gu", terminate="આવજો!", ask_mobile="આભાર, {name}!")
+    assert get_text("terminate", "gu") == "આવજો!"
+    assert get_text("ask_mobile", "gu", name="Asha") == "આભાર, Asha!"
+
+    _edit(locales, "gu", terminate="{broken")
+    monkeypatch.setattr(translations, "_next_check", 0)
+    assert get_text("terminate", "gu") == "આવજો!"
+    with pytest.raises(CatalogError):
+        reload_catalog()
+
+
+def test_missing_translations_and_word_lists_fall_back_to_english():
+    assert get_text("no_complaints_found", "hi") == get_text("no_complaints_found", "en")
+    assert get_text("ask_description", "xx") == get_text("ask_description", "en")
+    assert get_text("not_a_key", "gu") == "not_a_key"
+    assert {"yes", "haan", "હા"} <= set(get_words("yes_words"))
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import httpx
+import pytest
+from app import main
+from app.services.whatsapp import WhatsAppService
+
+
+class FakeGraph:
+    """Local stand-in for the Graph API media and messages endpoints"""
+
+    def __init__(self, fail_uploads=False):
+        self.fail_uploads = fail_uploads
+        self.uploads = []
+        self.messages = []
+        self.deleted = set()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/media"):
+            body = request.read()
+            assert request.headers["content-type"].startswith("multipart/form-data")
+            assert b'name="messaging_product"' in body and b"%PDF" in body
+            if self.fail_uploads:
+                return httpx.Response(500, json={"error": {"message": "upload failed"}})
+            self.uploads.append(body)
+            return httpx.Response(200, json={"id": f"media-{len(self.uploads)}"})
+        payload = json.loads(request.content)
+        if payload["type"] == "document" and payload["document"]["id"] in self.deleted:
+            return httpx.Response(400, json={"error": {"code": 131053, "message": "Media not found"}})
+        self.messages.append(payload)
+        return httpx.Response(200, json={"messages": [{"id": f"wamid.{len(self.messages)}"}]})
+
+
+@pytest.fixture
+def graph():
+    return FakeGraph()
+
+
+@pytest.fixture
+def service(graph):
+    service = WhatsAppService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(graph.handler))
+    yield service
+    asyncio.run(service.close())
+
+
+def _pdf(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(b"%PDF-1.4 " + content)
+    return str(path)
+
+
+def test_unchanged_file_is_resent_by_media_id(service, graph, tmp_path):
+    path = _pdf(tmp_path, "a.pdf", b"receipt one")
+    for to in ("911111111111", "912222222222"):
+        assert asyncio.run(service.send_file_document(to, path, "property_tax_PROP-001.pdf", caption="Receipt"))
+    assert len(graph.uploads) == 1
+    assert [m["document"] for m in graph.messages] == [
+        {"id": "media-1", "filename": "property_tax_PROP-001.pdf", "caption": "Receipt"}
+    ] * 2
+
+    # Same bytes under another name share the media; new bytes are uploaded
+    asyncio.run(service.send_file_document("911111111111", _pdf(tmp_path, "b.pdf", b"receipt one")))
+    asyncio.run(service.send_file_document("911111111111", _pdf(tmp_path, "c.pdf", b"receipt two")))
+    assert len(graph.uploads) == 2
+    assert service.media_metrics == {"uploads": 2, "reused": 2, "reupload_after_failure": 0}
+
+
+def test_rejected_media_id_is_uploaded_again(service, graph, tmp_path):
+    path = _pdf(tmp_path, "a.pdf", b"receipt")
+    asyncio.run(service.send_file_document("911111111111", path))
+    graph.deleted.add("media-1")
+    assert asyncio.run(service.send_file_document("911111111111", path))
+    assert [m["document"]["id"] for m in graph.messages] == ["media-1", "media-2"]
+    assert service.media_metrics["reupload_after_failure"] == 1
+
+
+def test_receipt_falls_back_to_text_when_upload_fails(tmp_path, monkeypatch):
+    graph = FakeGraph(fail_uploads=True)
+    service = WhatsAppService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(graph.handler))
+    path = _pdf(tmp_path, "a.pdf", b"receipt")
+
+    async def render(fields):
+        return path
+    monkeypatch.setattr(main, "whatsapp_service", service)
+    monkeypatch.setattr(main.pdf_render_pool, "render", render)
+
+    response = {"type": "document", "body": "Property Tax Details", "receipt": {"property_id": "PROP-001"},
+                "filename": "property_tax_PROP-001.pdf", "fallback": "Receipt unavailable"}
+    asyncio.run(main.send_response("911111111111", response))
+    assert [m["text"]["body"] for m in graph.messages] == ["Property Tax Details\n\nReceipt unavailable"]
+    asyncio.run(service.close())